@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-row _parse_resort_json vs. columnar resorts_to_frame
+Builds synthetic payloads by cycling the resorts in the committed rendered-page
+fixture (with unique IDs/titles) and times both conversion paths.
+
+Usage:
+    python benchmarks/bench_resort_frame.py [--sizes 10000 50000] [--repeat 3]
+"""
+
+import sys
+import copy
+import time
+import argparse
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+import pandas as pd
+from next_data_stream import extract_next_data, iter_resorts
+from onthesnow_json_scraper import OnTheSnowJSONScraper, resorts_to_frame
+
+FIXTURE = REPO_ROOT / "onthesnow_california_page_rendered.html"
+
+
+def fixture_resorts():
+    """Resort JSON objects from the committed rendered-page fixture"""
+    html = FIXTURE.read_text(encoding='utf-8')
+    return [resort for _, resort in iter_resorts(extract_next_data(html))]
+
+
+def synthetic_resorts(count, base=None):
+    """`count` resort objects cycled from the fixture with unique uuid/title/slug"""
+    base = base or fixture_resorts()
+    resorts = []
+    for i in range(count):
+        resort = copy.deepcopy(base[i % len(base)])
+        resort['uuid'] = str(100000 + i)
+        resort['title'] = f"{resort['title']} {i}"
+        resort['slug'] = f"{resort['slug']}-{i}"
+        resorts.append(resort)
+    return resorts
+
+
+def per_row(scraper, resorts):
+    return pd.DataFrame([r for r in map(scraper._parse_resort_json, resorts) if r])
+
+
+def best_of(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 50000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    
+    scraper = OnTheSnowJSONScraper()
+    base = fixture_resorts()
+    
+    print(f"{'resorts':>10} {'per-row (s)':>12} {'columnar (s)':>13} {'speedup':>8}")
+    for size in args.sizes:
+        resorts = synthetic_resorts(size, base)
+        row_time, row_df = best_of(lambda: per_row(scraper, resorts), args.repeat)
+        col_time, col_df = best_of(lambda: resorts_to_frame(resorts), args.repeat)
+        pd.testing.assert_frame_equal(row_df, col_df)
+        print(f"{size:>10} {row_time:>12.4f} {col_time:>13.4f} {row_time / col_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: scrape -> enrich -> publish hot paths
+Times each stage on the committed rendered-page fixture and on payloads scaled to
+10x/100x/1000x its resorts, records peak memory (tracemalloc) and saves the results
+as JSON per git commit so a later run can be compared against them.
+
+Stages:
+    parse_json_data       OnTheSnowJSONScraper.parse_json_data (streaming extract + per-row dicts)
+    parse_json_records    parse_json_data + pd.DataFrame (the per-row route to a frame)
+    parse_json_frame      OnTheSnowJSONScraper.parse_json_frame (columnar, same frame)
+    parse_resort_json     OnTheSnowJSONScraper._parse_resort_json over pre-decoded resorts
+    parse_snow_data       OnTheSnowScraper.parse_snow_data (HTML table rows scaled)
+    add_resort_data       combined_scraper.add_resort_data
+    add_missing_major     combined_scraper.add_missing_major_resorts
+    prepare_data          GoogleSheetsUpdater.prepare_data
+
+Usage:
+    python benchmarks/run_benchmarks.py [--scales 1 10 100] [--stages parse_json_data ...]
+    python benchmarks/run_benchmarks.py --compare <commit or results file>
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import subprocess
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+# The pipeline modules log every parse at INFO; keep benchmark output readable
+os.environ.setdefault("GOOGLE_SHEETS_SPREADSHEET_ID", "benchmark")
+os.environ.setdefault("GOOGLE_CREDENTIALS", "{}")
+logging.disable(logging.WARNING)
+
+import pandas as pd
+from next_data_stream import extract_next_data, find_path, resorts_payload, iter_resorts
+from onthesnow_json_scraper import OnTheSnowJSONScraper
+from onthesnow_scraper import OnTheSnowScraper
+from combined_scraper import add_resort_data, add_missing_major_resorts, normalize_resort_name
+from google_sheets_updater import GoogleSheetsUpdater
+from bench_resort_frame import FIXTURE, synthetic_resorts
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+DEFAULT_SCALES = [1, 10, 100, 1000]
+_TBODY = re.compile(r'(<tbody[^>]*>)(.*?)(</tbody>)', re.DOTALL)
+
+
+def scaled_json_page(html, scale):
+    """Fixture page whose resorts payload holds `scale` times as many resorts, same categories"""
+    if scale == 1:
+        return html
+    json_text = extract_next_data(html)
+    categories = json.loads(resorts_payload(json_text))
+    pairs = list(iter_resorts(json_text))
+    
+    resorts = synthetic_resorts(len(pairs) * scale, [resort for _, resort in pairs])
+    for category in categories.values():
+        category['data'] = []
+    for i, resort in enumerate(resorts):
+        categories[pairs[i % len(pairs)][0]]['data'].append(resort)
+    for category in categories.values():
+        category.setdefault('pagination', {})['count'] = len(category['data'])
+    
+    start = find_path(json_text)
+    end = start + len(resorts_payload(json_text))
+    new_json = json_text[:start] + json.dumps(categories) + json_text[end:]
+    return html.replace(json_text, new_json, 1)
+
+
+def scaled_table_page(html, scale):
+    """Fixture page with the rows of every resort table repeated `scale` times"""
+    if scale == 1:
+        return html
+    return _TBODY.sub(lambda m: m.group(1) + m.group(2) * scale + m.group(3), html)
+
+
+def build_inputs(scale):
+    """Inputs for every stage at one scale; built once, outside the timings"""
+    html = FIXTURE.read_text(encoding='utf-8')
+    json_page = scaled_json_page(html, scale)
+    json_scraper = OnTheSnowJSONScraper()
+    
+    # Enrichment inputs tile the real fixture frame so names and IDs still match
+    frame = json_scraper.parse_json_frame(html)
+    frame['data_fetched_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    frame['source'] = 'OnTheSnow'
+    tiled = pd.concat([frame] * scale, ignore_index=True)
+    enriched = add_resort_data(tiled)
+    combined = add_missing_major_resorts(enriched)
+    
+    return {
+        'json_page': json_page,
+        'table_page': scaled_table_page(html, scale),
+        'resort_jsons': [resort for _, resort in iter_resorts(extract_next_data(json_page))],
+        'frame': tiled,
+        'enriched': enriched,
+        'combined': combined,
+    }
+
+
+def make_stages():
+    """Stage name -> (function of the inputs dict, input key used to count items)"""
+    json_scraper = OnTheSnowJSONScraper()
+    table_scraper = OnTheSnowScraper()
+    updater = GoogleSheetsUpdater()
+    
+    def enrich(df):
+        # Fresh pipeline runs start with a cold name cache
+        normalize_resort_name.cache_clear()
+        return add_resort_data(df)
+    
+    return {
+        'parse_json_data': (lambda i: json_scraper.parse_json_data(i['json_page']), 'resort_jsons'),
+        'parse_json_records': (lambda i: pd.DataFrame(json_scraper.parse_json_data(i['json_page'])), 'resort_jsons'),
+        'parse_json_frame': (lambda i: json_scraper.parse_json_frame(i['json_page']), 'resort_jsons'),
+        'parse_resort_json': (lambda i: [json_scraper._parse_resort_json(r) for r in i['resort_jsons']],
+                              'resort_jsons'),
+        'parse_snow_data': (lambda i: table_scraper.parse_snow_data(i['table_page']), None),
+        'add_resort_data': (lambda i: enrich(i['frame']), 'frame'),
+        'add_missing_major': (lambda i: add_missing_major_resorts(i['enriched']), 'enriched'),
+        'prepare_data': (lambda i: updater.prepare_data(i['combined']), 'combined'),
+    }
+
+
+def measure(func, inputs, repeat):
+    """Best wall time over `repeat` runs, then one traced run for peak memory"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(inputs)
+        times.append(time.perf_counter() - start)
+    
+    tracemalloc.start()
+    func(inputs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    return min(times), peak, result
+
+
+def git_commit():
+    """Short HEAD sha, with -dirty if the working tree has uncommitted changes"""
+    try:
+        sha = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=REPO_ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return f"{sha}-dirty" if dirty else sha
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def load_results(ref):
+    """Load a saved results file by path or by commit sha"""
+    path = Path(ref)
+    if not path.exists():
+        path = RESULTS_DIR / f"{ref}.json"
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def print_comparison(baseline, current):
+    """Print time and memory ratios of current vs. baseline (>1.00 means slower/larger)"""
+    old = {(r['stage'], r['scale']): r for r in baseline['results']}
+    print(f"\nComparison against {baseline['commit']} ({baseline['date']})")
+    print(f"{'stage':<20} {'scale':>6} {'old (ms)':>10} {'new (ms)':>10} {'time':>7} {'memory':>7}")
+    for r in current['results']:
+        before = old.get((r['stage'], r['scale']))
+        if before is None:
+            continue
+        time_ratio = r['seconds'] / before['seconds'] if before['seconds'] else float('nan')
+        mem_ratio = r['peak_kib'] / before['peak_kib'] if before['peak_kib'] else float('nan')
+        flag = "  <-- slower" if time_ratio > 1.2 else ""
+        print(f"{r['stage']:<20} {r['scale']:>5}x {before['seconds'] * 1000:>10.2f} "
+              f"{r['seconds'] * 1000:>10.2f} {time_ratio:>6.2f}x {mem_ratio:>6.2f}x{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scrape -> enrich -> publish hot paths")
+    parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES)
+    parser.add_argument('--stages', nargs='+', help="Only run these stages (default: all)")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per stage (best is kept)")
+    parser.add_argument('--compare', help="Commit sha or results file to compare against")
+    parser.add_argument('--no-save', action='store_true', help="Do not write a results file")
+    args = parser.parse_args()
+    
+    stages = make_stages()
+    selected = args.stages or list(stages)
+    unknown = set(selected) - set(stages)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+    
+    run = {
+        'commit': git_commit(),
+        'date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'results': [],
+    }
+    
+    print(f"{'stage':<20} {'scale':>6} {'items':>8} {'time (ms)':>10} {'peak (KiB)':>11}")
+    for scale in args.scales:
+        inputs = build_inputs(scale)
+        for name in selected:
+            func, count_key = stages[name]
+            seconds, peak, result = measure(func, inputs, args.repeat)
+            items = len(inputs[count_key]) if count_key else len(result)
+            run['results'].append({
+                'stage': name,
+                'scale': scale,
+                'items': items,
+                'seconds': round(seconds, 6),
+                'peak_kib': round(peak / 1024, 1),
+            })
+            print(f"{name:<20} {scale:>5}x {items:>8} {seconds * 1000:>10.2f} {peak / 1024:>11.1f}")
+    
+    if not args.no_save:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        path = RESULTS_DIR / f"{run['commit']}.json"
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(run, f, indent=2)
+        print(f"\nSaved results to {path.relative_to(REPO_ROOT)}")
+    
+    if args.compare:
+        print_comparison(load_results(args.compare), run)
+
+
+if __name__ == "__main__":
+    main()
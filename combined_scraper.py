@@ -5,40 +5,66 @@ Uses OnTheSnow as primary source, supplements with California Ski Country for an
 Adds coordinates from known resort locations
 """
 
+import os
+import re
 import pandas as pd
 import logging
 from datetime import datetime
-from onthesnow_json_scraper import OnTheSnowJSONScraper
+from functools import lru_cache
+from onthesnow_json_scraper import OnTheSnowJSONScraper, report_urls
+from fetch_cache import FetchCache, write_run_state
+from snapshot_store import SnapshotStore
+from map_artifact import write_map_artifact
+from resort_details import enrich_resort_details
+from metrics import METRICS
 
 # California resort coordinates and trail counts
 # Data compiled from resort websites and OnTheSnow
+# ots_id/slug are OnTheSnow's stable resort identifiers (omitted where OnTheSnow
+# has no separate California report for the resort)
 RESORT_DATA = {
     'Alpine Meadows': {'lat': 39.1666, 'lng': -120.2242, 'total_trails': 100, 'total_lifts': 13, 'region': 'Tahoe North'},
-    'Bear Mountain': {'lat': 34.2311, 'lng': -116.9097, 'total_trails': 27, 'total_lifts': 11, 'region': 'Southern California'},
-    'Mt. Baldy': {'lat': 34.2569, 'lng': -117.6467, 'total_trails': 26, 'total_lifts': 4, 'region': 'Southern California'},
-    'Bear Valley': {'lat': 38.4933, 'lng': -120.0086, 'total_trails': 67, 'total_lifts': 9, 'region': 'Northern California'},
-    'Boreal Mountain': {'lat': 39.3309, 'lng': -120.3500, 'total_trails': 33, 'total_lifts': 9, 'region': 'Tahoe North'},
-    'China Peak': {'lat': 37.3036, 'lng': -119.1883, 'total_trails': 45, 'total_lifts': 11, 'region': 'Central California'},
+    'Bear Mountain': {'ots_id': '43', 'slug': 'bear-mountain', 'lat': 34.2311, 'lng': -116.9097, 'total_trails': 27, 'total_lifts': 11, 'region': 'Southern California'},
+    'Mt. Baldy': {'ots_id': '267', 'slug': 'mt-baldy', 'lat': 34.2569, 'lng': -117.6467, 'total_trails': 26, 'total_lifts': 4, 'region': 'Southern California'},
+    'Bear Valley': {'ots_id': '34', 'slug': 'bear-valley', 'lat': 38.4933, 'lng': -120.0086, 'total_trails': 67, 'total_lifts': 9, 'region': 'Northern California'},
+    'Boreal Mountain': {'ots_id': '67', 'slug': 'boreal', 'lat': 39.3309, 'lng': -120.3500, 'total_trails': 33, 'total_lifts': 9, 'region': 'Tahoe North'},
+    'China Peak': {'ots_id': '361', 'slug': 'ski-china-peak', 'lat': 37.3036, 'lng': -119.1883, 'total_trails': 45, 'total_lifts': 11, 'region': 'Central California'},
     'Diamond Peak': {'lat': 39.2528, 'lng': -119.9133, 'total_trails': 30, 'total_lifts': 7, 'region': 'Tahoe North'},
-    'Dodge Ridge': {'lat': 38.1961, 'lng': -120.0347, 'total_trails': 67, 'total_lifts': 12, 'region': 'Central California'},
-    'Donner Ski Ranch': {'lat': 39.3169, 'lng': -120.3419, 'total_trails': 52, 'total_lifts': 6, 'region': 'Tahoe North'},
-    'Heavenly': {'lat': 38.9350, 'lng': -119.9400, 'total_trails': 97, 'total_lifts': 28, 'region': 'Tahoe South'},
-    'Homewood': {'lat': 39.0838, 'lng': -120.1669, 'total_trails': 64, 'total_lifts': 7, 'region': 'Tahoe North'},
-    'June Mountain': {'lat': 37.7764, 'lng': -119.0778, 'total_trails': 35, 'total_lifts': 7, 'region': 'Mammoth'},
-    'Kirkwood': {'lat': 38.6853, 'lng': -120.0658, 'total_trails': 86, 'total_lifts': 15, 'region': 'Tahoe South'},
-    'Mammoth Mountain': {'lat': 37.6308, 'lng': -119.0325, 'total_trails': 175, 'total_lifts': 28, 'region': 'Mammoth'},
-    'Mountain High': {'lat': 34.3803, 'lng': -117.6856, 'total_trails': 59, 'total_lifts': 14, 'region': 'Southern California'},
-    'Mt. Shasta': {'lat': 41.3592, 'lng': -122.2097, 'total_trails': 32, 'total_lifts': 3, 'region': 'Northern California'},
-    'Northstar California': {'lat': 39.2735, 'lng': -120.1211, 'total_trails': 100, 'total_lifts': 20, 'region': 'Tahoe North'},
-    'Palisades Tahoe': {'lat': 39.1969, 'lng': -120.2356, 'total_trails': 200, 'total_lifts': 30, 'region': 'Tahoe North'},
-    'Sierra-at-Tahoe': {'lat': 38.7951, 'lng': -120.0829, 'total_trails': 46, 'total_lifts': 14, 'region': 'Tahoe South'},
-    'Snow Summit': {'lat': 34.2322, 'lng': -116.8864, 'total_trails': 31, 'total_lifts': 12, 'region': 'Southern California'},
-    'Snow Valley': {'lat': 34.2411, 'lng': -117.0383, 'total_trails': 28, 'total_lifts': 13, 'region': 'Southern California'},
-    'Soda Springs': {'lat': 39.3195, 'lng': -120.3917, 'total_trails': 16, 'total_lifts': 5, 'region': 'Tahoe North'},
-    'Sugar Bowl': {'lat': 39.3022, 'lng': -120.3464, 'total_trails': 103, 'total_lifts': 13, 'region': 'Tahoe North'},
-    'Tahoe Donner': {'lat': 39.3225, 'lng': -120.3094, 'total_trails': 17, 'total_lifts': 4, 'region': 'Tahoe North'},
+    'Dodge Ridge': {'ots_id': '134', 'slug': 'dodge-ridge', 'lat': 38.1961, 'lng': -120.0347, 'total_trails': 67, 'total_lifts': 12, 'region': 'Central California'},
+    'Donner Ski Ranch': {'ots_id': '135', 'slug': 'donner-ski-ranch', 'lat': 39.3169, 'lng': -120.3419, 'total_trails': 52, 'total_lifts': 6, 'region': 'Tahoe North'},
+    'Heavenly': {'ots_id': '169', 'slug': 'heavenly-mountain-resort', 'lat': 38.9350, 'lng': -119.9400, 'total_trails': 97, 'total_lifts': 28, 'region': 'Tahoe South'},
+    'Homewood': {'ots_id': '179', 'slug': 'homewood-mountain-resort', 'lat': 39.0838, 'lng': -120.1669, 'total_trails': 64, 'total_lifts': 7, 'region': 'Tahoe North'},
+    'June Mountain': {'ots_id': '194', 'slug': 'june-mountain', 'lat': 37.7764, 'lng': -119.0778, 'total_trails': 35, 'total_lifts': 7, 'region': 'Mammoth'},
+    'Kirkwood': {'ots_id': '201', 'slug': 'kirkwood', 'lat': 38.6853, 'lng': -120.0658, 'total_trails': 86, 'total_lifts': 15, 'region': 'Tahoe South'},
+    'Mammoth Mountain': {'ots_id': '227', 'slug': 'mammoth-mountain-ski-area', 'lat': 37.6308, 'lng': -119.0325, 'total_trails': 175, 'total_lifts': 28, 'region': 'Mammoth'},
+    'Mountain High': {'ots_id': '261', 'slug': 'mountain-high', 'lat': 34.3803, 'lng': -117.6856, 'total_trails': 59, 'total_lifts': 14, 'region': 'Southern California'},
+    'Mt. Shasta': {'ots_id': '285', 'slug': 'mount-shasta-board-ski-park', 'lat': 41.3592, 'lng': -122.2097, 'total_trails': 32, 'total_lifts': 3, 'region': 'Northern California'},
+    'Northstar California': {'ots_id': '299', 'slug': 'northstar-california', 'lat': 39.2735, 'lng': -120.1211, 'total_trails': 100, 'total_lifts': 20, 'region': 'Tahoe North'},
+    'Palisades Tahoe': {'ots_id': '419', 'slug': 'palisades-tahoe', 'lat': 39.1969, 'lng': -120.2356, 'total_trails': 200, 'total_lifts': 30, 'region': 'Tahoe North'},
+    'Sierra-at-Tahoe': {'ots_id': '362', 'slug': 'sierra-at-tahoe', 'lat': 38.7951, 'lng': -120.0829, 'total_trails': 46, 'total_lifts': 14, 'region': 'Tahoe South'},
+    'Snow Summit': {'ots_id': '400', 'slug': 'snow-summit', 'lat': 34.2322, 'lng': -116.8864, 'total_trails': 31, 'total_lifts': 12, 'region': 'Southern California'},
+    'Snow Valley': {'ots_id': '402', 'slug': 'snow-valley', 'lat': 34.2411, 'lng': -117.0383, 'total_trails': 28, 'total_lifts': 13, 'region': 'Southern California'},
+    'Soda Springs': {'ots_id': '411', 'slug': 'soda-springs', 'lat': 39.3195, 'lng': -120.3917, 'total_trails': 16, 'total_lifts': 5, 'region': 'Tahoe North'},
+    'Sugar Bowl': {'ots_id': '432', 'slug': 'sugar-bowl-resort', 'lat': 39.3022, 'lng': -120.3464, 'total_trails': 103, 'total_lifts': 13, 'region': 'Tahoe North'},
+    'Tahoe Donner': {'ots_id': '451', 'slug': 'tahoe-donner', 'lat': 39.3225, 'lng': -120.3094, 'total_trails': 17, 'total_lifts': 4, 'region': 'Tahoe North'},
 }
 
+# Other names sources use for resorts in RESORT_DATA (only needed when
+# normalize_resort_name() doesn't already map them to the same key)
+RESORT_ALIASES = {
+    'Boreal Mountain': ['Boreal', 'Boreal Mountain Resort'],
+    'China Peak': ['Ski China Peak'],
+    'Mt. Shasta': ['Mt. Shasta Board & Ski Park'],
+    'Northstar California': ['Northstar'],
+    'Palisades Tahoe': ['Squaw Valley'],
+}
+
+# Combined output consumed by google_sheets_updater.py and uploaded as a CI artifact
+OUTPUT_FILE = "california_resorts_combined.csv"
+
+# Generic trailing words dropped when normalizing names ("Sugar Bowl Resort" -> "sugar bowl")
+NAME_SUFFIXES = ('ski and snowboard area', 'ski area', 'ski resort', 'mountain resort', 'resort', 'ski park')
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -51,29 +77,94 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=None)
+def normalize_resort_name(name):
+    """Normalize a resort name into a lookup key ("Mt. Shasta Ski Park" -> "mt shasta")"""
+    key = str(name).lower().replace('&', ' and ')
+    key = re.sub(r'\bmount\b', 'mt', key)
+    key = re.sub(r'[^a-z0-9]+', ' ', key).strip()
+    
+    stripped = True
+    while stripped:
+        stripped = False
+        for suffix in NAME_SUFFIXES:
+            if key.endswith(' ' + suffix):
+                key = key[:-len(suffix) - 1].rstrip()
+                stripped = True
+    return key
+
+
+def build_name_index(resort_data, aliases):
+    """Map normalized names and aliases to canonical RESORT_DATA names"""
+    index = {}
+    for canonical in resort_data:
+        for name in [canonical] + aliases.get(canonical, []):
+            key = normalize_resort_name(name)
+            if index.get(key, canonical) != canonical:
+                logger.warning(f"⚠️ Name key '{key}' maps to both {index[key]} and {canonical}")
+                continue
+            index[key] = canonical
+    return index
+
+
+def build_metadata_frame(resort_data):
+    """RESORT_DATA as a DataFrame indexed by canonical name, ready for joins"""
+    metadata = pd.DataFrame.from_dict(resort_data, orient='index')
+    return metadata.rename(columns={
+        'lat': 'latitude',
+        'lng': 'longitude',
+        'total_trails': 'total_trails_manual',
+        'total_lifts': 'total_lifts_manual',
+    })[['latitude', 'longitude', 'total_trails_manual', 'total_lifts_manual', 'region']]
+
+
+RESORT_NAME_INDEX = build_name_index(RESORT_DATA, RESORT_ALIASES)
+RESORT_ID_INDEX = {data['ots_id']: name for name, data in RESORT_DATA.items() if data.get('ots_id')}
+RESORT_METADATA = build_metadata_frame(RESORT_DATA)
+
+
+def resolve_resort_names(names):
+    """Vectorized name -> canonical RESORT_DATA name lookup (NaN where unmatched)"""
+    return names.map(normalize_resort_name).map(RESORT_NAME_INDEX)
+
+
+def resolve_resorts(df):
+    """
+    Canonical RESORT_DATA name for every row
+    
+    Rows are matched on OnTheSnow's resort_id; the name index is only
+    consulted for rows without an ID (placeholders, other sources).
+    """
+    has_id = df['resort_id'].notna() if 'resort_id' in df.columns else pd.Series(False, index=df.index)
+    canonical = df['resort_id'].map(RESORT_ID_INDEX) if 'resort_id' in df.columns \
+        else pd.Series(None, index=df.index, dtype=object)
+    
+    unresolved = canonical.isna()
+    if unresolved.any():
+        by_name = resolve_resort_names(df.loc[unresolved, 'name'])
+        # A row with an unknown ID may only match metadata that has no ID of its own
+        conflicting = has_id[unresolved] & by_name.map(lambda name: bool(RESORT_DATA.get(name, {}).get('ots_id')))
+        canonical[unresolved] = by_name.mask(conflicting)
+    return canonical
+
+
+def resort_keys(df):
+    """Dedup key per row: OnTheSnow resort_id, or the normalized name when there is none"""
+    names = 'name:' + df['name'].map(normalize_resort_name)
+    if 'resort_id' not in df.columns:
+        return names
+    return ('id:' + df['resort_id'].astype('string')).fillna(names)
+
+
+@METRICS.timed('enrich')
 def add_resort_data(df):
     """Add latitude, longitude, trail counts, and lift counts to resorts"""
     
-    def find_resort_data(name):
-        """Find complete resort data by name"""
-        name_clean = name.strip().lower()
-        
-        # Try exact match first
-        if name in RESORT_DATA:
-            data = RESORT_DATA[name]
-            return pd.Series([data['lat'], data['lng'], data['total_trails'], data['total_lifts']])
-        
-        # Try partial matching
-        for resort_name, data in RESORT_DATA.items():
-            if resort_name.lower() in name_clean or name_clean in resort_name.lower():
-                return pd.Series([data['lat'], data['lng'], data['total_trails'], data['total_lifts']])
-        
-        # No match found
-        logger.warning(f"⚠️ No resort data found for: {name}")
-        return pd.Series([None, None, None, None])
-    
-    # Add coordinates and trail/lift totals
-    df[['latitude', 'longitude', 'total_trails_manual', 'total_lifts_manual']] = df['name'].apply(find_resort_data)
+    # Resolve every row (by ID, else name) and attach metadata in one join
+    canonical = resolve_resorts(df)
+    metadata = RESORT_METADATA.reindex(canonical.to_numpy())
+    metadata.index = df.index
+    df[metadata.columns] = metadata
     
     # Fill in missing total_trails and total_lifts from manual data
     df['total_trails'] = df['total_trails'].fillna(df['total_trails_manual'])
@@ -94,11 +185,12 @@ def add_resort_data(df):
     valid_lifts = (df['total_lifts'].notna()) & (df['total_lifts'] > 0) & (df['open_lifts'].notna())
     df.loc[valid_lifts, 'lifts_open_pct'] = (df.loc[valid_lifts, 'open_lifts'] / df.loc[valid_lifts, 'total_lifts'] * 100).round(1)
     
-    # Log resorts without coordinates
-    missing = df[df['latitude'].isna()]
-    if len(missing) > 0:
-        logger.warning(f"Missing data for {len(missing)} resorts:")
-        for name in missing['name']:
+    # Report resorts the index couldn't resolve
+    unmatched = df.loc[canonical.isna(), 'name'].tolist()
+    METRICS.increment('unmatched_names', len(unmatched))
+    if unmatched:
+        logger.warning(f"⚠️ No resort data found for {len(unmatched)} resorts:")
+        for name in unmatched:
             logger.warning(f"  - {name}")
     else:
         logger.info(f"✅ Added complete data to all {len(df)} resorts")
@@ -106,6 +198,7 @@ def add_resort_data(df):
     return df
 
 
+@METRICS.timed('add_missing_resorts')
 def add_missing_major_resorts(df):
     """Add major resorts that aren't scraped yet but should appear on the map"""
     
@@ -126,30 +219,19 @@ def add_missing_major_resorts(df):
         'Bear Valley', 'China Peak', 'Dodge Ridge', 'Mt. Shasta'
     ]
     
-    existing_names = df['name'].str.lower().tolist()
-    
-    # Create a better normalized list for comparison
-    def normalize_name(name):
-        """Normalize resort name for comparison"""
-        return name.lower().replace(' ski area', '').replace(' resort', '').replace(' mountain', '').strip()
-    
-    existing_normalized = [normalize_name(name) for name in df['name'].tolist()]
+    # Canonical resorts already present, resolved the same way as add_resort_data
+    present = set(resolve_resorts(df).dropna())
     
     missing_resorts = []
     
     for resort_name in must_include:
-        # Normalize the resort name for comparison
-        resort_normalized = normalize_name(resort_name)
-        
-        # Check if this resort already exists
-        already_exists = resort_normalized in existing_normalized
-        
-        if not already_exists:
-            logger.info(f"  Checking {resort_name} -> normalized: '{resort_normalized}' (not found in {existing_normalized})")
+        if resort_name not in present:
             # Resort is missing - add it as placeholder
             if resort_name in RESORT_DATA:
                 data = RESORT_DATA[resort_name]
                 missing_resorts.append({
+                    'resort_id': data.get('ots_id'),
+                    'slug': data.get('slug'),
                     'name': resort_name,
                     'status': 'Closed',
                     'new_snow_24h': 0,
@@ -168,11 +250,13 @@ def add_missing_major_resorts(df):
                     'name_lower': resort_name.lower(),
                     'latitude': data['lat'],
                     'longitude': data['lng'],
+                    'region': data.get('region'),
                     'trails_open_pct': 0.0,
                     'lifts_open_pct': 0.0,
                 })
                 logger.info(f"  + Added placeholder for {resort_name} ({data['total_trails']} trails)")
     
+    METRICS.increment('placeholders_added', len(missing_resorts))
     if missing_resorts:
         missing_df = pd.DataFrame(missing_resorts)
         df = pd.concat([df, missing_df], ignore_index=True)
@@ -183,22 +267,37 @@ def add_missing_major_resorts(df):
     return df
 
 
-def combine_resort_data():
+def combine_resort_data(region_urls=None, driver_pool=None, fetch_cache=None):
     """
     Scrape California resort data from OnTheSnow
+    
+    Args:
+        region_urls: Optional list of OnTheSnow ski report URLs to scrape concurrently
+                     (defaults to ONTHESNOW_REGIONS, else the California report)
+        driver_pool: Optional DriverPool so Chrome fallbacks reuse warm sessions
+        fetch_cache: Optional FetchCache; if OnTheSnow is unchanged since the last
+                     published run, an empty frame with attrs['cache_hit'] is returned
     """
     logger.info("="*70)
     logger.info("CALIFORNIA SCRAPER - OnTheSnow")
     logger.info("="*70)
     
     all_resorts = []
+    if region_urls is None and os.environ.get("ONTHESNOW_REGIONS"):
+        # Comma-separated region slugs or report URLs, e.g. "california,nevada"
+        region_urls = report_urls(os.environ["ONTHESNOW_REGIONS"])
     
     # 1. Get OnTheSnow data (primary source) - using JSON parser for complete data
     logger.info("\n📊 Step 1: Scraping OnTheSnow (primary source)...")
     try:
-        ots_scraper = OnTheSnowJSONScraper(headless=True)
+        ots_scraper = OnTheSnowJSONScraper(headless=True, urls=region_urls, driver_pool=driver_pool,
+                                           fetch_cache=fetch_cache)
         ots_df = ots_scraper.scrape()
         
+        if ots_df.attrs.get('cache_hit'):
+            logger.info("♻️ Cache hit - skipping enrichment")
+            return ots_df
+        
         if not ots_df.empty:
             logger.info(f"✅ OnTheSnow: Found {len(ots_df)} resorts")
             all_resorts.append(ots_df)
@@ -206,7 +305,7 @@ def combine_resort_data():
         else:
             logger.warning("⚠️ OnTheSnow returned no data")
             ots_resort_names = set()
-            
+    
     except Exception as e:
         logger.error(f"❌ OnTheSnow scraper failed: {e}")
         ots_resort_names = set()
@@ -221,28 +320,22 @@ def combine_resort_data():
     
     combined_df = pd.concat(all_resorts, ignore_index=True)
     
-    # Remove duplicate resorts with better deduplication logic
-    # Handle A-Basin appearing as both "Arapahoe Basin" and "Arapahoe Basin Ski Area"
-    def normalize_name(name):
-        """Normalize resort names for duplicate detection"""
-        name = name.lower().strip()
-        # Remove common suffixes
-        name = name.replace(' ski area', '').replace(' ski resort', '')
-        name = name.replace(' resort', '').replace(' mountain resort', '')
-        name = name.replace(' mountain', '')
-        return name
-    
-    combined_df['name_normalized'] = combined_df['name'].apply(normalize_name)
+    # Remove duplicate resorts (same OnTheSnow ID, e.g. a resort listed in two
+    # region reports), keeping the first occurrence
+    combined_df = combined_df[~resort_keys(combined_df).duplicated(keep='first')]
     
-    # Remove duplicates, keeping OnTheSnow version (first occurrence)
-    combined_df = combined_df.drop_duplicates(subset=['name_normalized'], keep='first')
-    combined_df = combined_df.drop(columns=['name_normalized'])
+    # 4. Fill mid-mountain depth and surface conditions from resort detail pages
+    logger.info("\n🔎 Enriching resorts from their detail pages...")
+    try:
+        combined_df = enrich_resort_details(combined_df)
+    except Exception as e:
+        logger.warning(f"⚠️ Resort detail enrichment failed: {e}")
     
-    # 4. Add coordinates, trail counts, and calculate percentages
+    # 5. Add coordinates, trail counts, and calculate percentages
     logger.info("\n📍 Adding resort data (coordinates, trail counts, percentages)...")
     combined_df = add_resort_data(combined_df)
     
-    # 5. Add missing major resorts (not yet scraped but should be shown)
+    # 6. Add missing major resorts (not yet scraped but should be shown)
     logger.info("\n➕ Checking for missing major resorts...")
     combined_df = add_missing_major_resorts(combined_df)
     
@@ -260,18 +353,44 @@ def combine_resort_data():
     return combined_df
 
 
+def save_combined_data(df, output_file=OUTPUT_FILE):
+    """Write the combined data to CSV and the map artifact, append it to history and record the run state"""
+    # Written to a temp file first: the conditions API reloads the CSV as soon as it changes
+    with METRICS.timer('csv_write'):
+        df.to_csv(f"{output_file}.tmp", index=False)
+        os.replace(f"{output_file}.tmp", output_file)
+    logger.info(f"\n✅ Saved combined data to {output_file}")
+    
+    try:
+        write_map_artifact(df)
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to write map data artifact: {e}")
+    
+    # History is best-effort: a failed append must not block the CSV/Sheets update
+    try:
+        SnapshotStore().append(df)
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to append snapshot to history: {e}")
+    write_run_state(cache_hit=False, resorts=len(df))
+
+
 def main():
     """Test the combined scraper"""
-    df = combine_resort_data()
+    # Set FORCE_REFRESH=1 to ignore the fetch cache and always rebuild the data
+    fetch_cache = None if os.environ.get("FORCE_REFRESH") == "1" else FetchCache()
+    df = combine_resort_data(fetch_cache=fetch_cache)
+    
+    if df.attrs.get('cache_hit'):
+        write_run_state(cache_hit=True)
+        logger.info("✅ Data unchanged since last published run - keeping existing CSV")
+        return
     
     if df.empty:
         logger.error("No data collected")
         return
     
     # Save combined data
-    output_file = "california_resorts_combined.csv"
-    df.to_csv(output_file, index=False)
-    logger.info(f"\n✅ Saved combined data to {output_file}")
+    save_combined_data(df)
     
     # Display results
     print("\n" + "="*70)
@@ -286,5 +405,8 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        METRICS.write('scrape')
 
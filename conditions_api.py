@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Local Conditions API
+Serves the latest combined resort data over HTTP straight from memory, so consumers
+do not have to go through the published Google Sheets CSV.
+
+Routes (all JSON, optional ?status=open|closed filter):
+    /resorts                    every resort
+    /resorts/{id}               one resort by OnTheSnow ID or slug
+    /regions/{region}           resorts in a region, e.g. /regions/tahoe-north
+
+Every response body (plain and gzip) and its ETag is built once per data load, so a
+request is a dict lookup. If-None-Match gets a 304. When the combined CSV changes the
+new data is loaded in the background and swapped in with a single reference
+assignment; requests in flight keep the data they started with. The pipeline daemon
+(run_all_updates.py --daemon --api-port) publishes each scraped DataFrame directly
+instead of watching the CSV.
+
+Usage:
+    python conditions_api.py [--port 8080] [--csv california_resorts_combined.csv]
+"""
+
+import os
+import re
+import sys
+import gzip
+import json
+import time
+import hashlib
+import logging
+import argparse
+import threading
+import pandas as pd
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8080
+DEFAULT_CSV = "california_resorts_combined.csv"
+# Responses smaller than this are not worth compressing
+GZIP_MIN_BYTES = 512
+# Internal helper column that is not part of the API
+HIDDEN_COLUMNS = ['name_lower']
+
+
+def region_slug(region):
+    """URL form of a region name: 'Tahoe North' -> 'tahoe-north'"""
+    return re.sub(r'[^a-z0-9]+', '-', str(region).lower()).strip('-')
+
+
+def _etag(body):
+    return '"' + hashlib.sha256(body).hexdigest()[:20] + '"'
+
+
+def _json_bytes(data):
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+class Response:
+    """Prebuilt response: body, gzip body (if worthwhile) and ETag"""
+    
+    __slots__ = ('body', 'gzip_body', 'etag')
+    
+    def __init__(self, body):
+        self.body = body
+        self.etag = _etag(body)
+        self.gzip_body = gzip.compress(body, compresslevel=6, mtime=0) if len(body) >= GZIP_MIN_BYTES else None
+
+
+class Snapshot:
+    """Immutable set of prebuilt responses for one version of the data"""
+    
+    def __init__(self, df, source=None):
+        df = df.drop(columns=[c for c in HIDDEN_COLUMNS if c in df.columns])
+        # to_json turns NaN into null and numpy types into plain JSON numbers
+        records = json.loads(df.to_json(orient='records', date_format='iso'))
+        updated = str(df['data_fetched_at'].dropna().max()) if 'data_fetched_at' in df.columns and len(df) else None
+        
+        self.source = source
+        self.updated = updated
+        self.count = len(records)
+        self.statuses = sorted({'open', 'closed'} | {str(r.get('status') or 'Unknown').lower() for r in records})
+        self.responses = {}
+        
+        def add_list(path, items):
+            self.responses[(path, None)] = Response(_json_bytes(
+                {'updated': updated, 'count': len(items), 'resorts': items}))
+            for status in self.statuses:
+                matching = [r for r in items if str(r.get('status') or 'Unknown').lower() == status]
+                self.responses[(path, status)] = Response(_json_bytes(
+                    {'updated': updated, 'count': len(matching), 'resorts': matching}))
+        
+        add_list('/resorts', records)
+        
+        regions = {}
+        for record in records:
+            if record.get('region'):
+                regions.setdefault(region_slug(record['region']), []).append(record)
+        for slug, items in regions.items():
+            add_list(f'/regions/{slug}', items)
+        
+        for record in records:
+            body = Response(_json_bytes({'updated': updated, 'resort': record}))
+            for key in (record.get('resort_id'), record.get('slug')):
+                if key is not None and key != '':
+                    self.responses.setdefault((f'/resorts/{str(key).lower()}', None), body)
+    
+    def lookup(self, path, status=None):
+        """Prebuilt response for a route, or None"""
+        if status is not None and path.startswith('/resorts/'):
+            # A single resort ignores the status filter
+            status = None
+        return self.responses.get((path, status))
+
+
+def load_csv(path):
+    """Read the combined CSV with IDs kept as text ('169', not 169.0)"""
+    return pd.read_csv(path, dtype={'resort_id': 'string', 'slug': 'string'})
+
+
+class ConditionsHandler(BaseHTTPRequestHandler):
+    """GET/HEAD handler serving the server's current Snapshot"""
+    
+    protocol_version = 'HTTP/1.1'
+    server_version = 'SnowConditions/1.0'
+    # Headers and body go out as separate writes; without TCP_NODELAY keep-alive
+    # clients wait ~40 ms on delayed ACKs
+    disable_nagle_algorithm = True
+    
+    def do_GET(self):
+        self._respond(send_body=True)
+    
+    def do_HEAD(self):
+        self._respond(send_body=False)
+    
+    def _respond(self, send_body):
+        snapshot = self.server.snapshot  # one read: a reload mid-request cannot mix versions
+        url = urlsplit(self.path)
+        path = url.path.rstrip('/').lower() or '/'
+        status = parse_qs(url.query).get('status', [None])[0]
+        status = status.lower() if status else None
+        
+        if snapshot is None:
+            return self._send_error(503, "No data loaded yet", send_body)
+        
+        response = snapshot.lookup(path, status)
+        if response is None:
+            if status is not None and snapshot.lookup(path) is not None:
+                return self._send_error(400, f"Unknown status '{status}' (one of: {', '.join(snapshot.statuses)})",
+                                        send_body)
+            return self._send_error(404, f"Not found: {url.path}", send_body)
+        
+        if self._etag_matches(response.etag):
+            self.send_response(304)
+            self.send_header('ETag', response.etag)
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            return
+        
+        body = response.body
+        use_gzip = response.gzip_body is not None and 'gzip' in self.headers.get('Accept-Encoding', '')
+        if use_gzip:
+            body = response.gzip_body
+        
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', response.etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+        if use_gzip:
+            self.send_header('Content-Encoding', 'gzip')
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+    
+    def _etag_matches(self, etag):
+        header = self.headers.get('If-None-Match')
+        if not header:
+            return False
+        tags = [tag.strip() for tag in header.split(',')]
+        return '*' in tags or etag in tags or f"W/{etag}" in tags
+    
+    def _send_error(self, code, message, send_body):
+        body = _json_bytes({'error': message})
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+class ConditionsServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the current Snapshot"""
+    
+    daemon_threads = True
+    
+    def __init__(self, address, handler=ConditionsHandler):
+        super().__init__(address, handler)
+        self.snapshot = None
+    
+    def publish(self, df, source=None):
+        """Build responses for new data off to the side, then swap them in atomically"""
+        snapshot = Snapshot(df, source)
+        self.snapshot = snapshot
+        logger.info(f"📡 Serving {snapshot.count} resorts (updated {snapshot.updated}, "
+                    f"{len(snapshot.responses)} prebuilt responses)")
+        return snapshot
+    
+    def watch(self, path, interval=5.0, stop=None):
+        """
+        Reload `path` whenever its modification time changes (run in a thread)
+        
+        A file that fails to load keeps the previous data in service.
+        """
+        stop = stop or threading.Event()
+        last_mtime = None
+        while not stop.is_set():
+            try:
+                mtime = os.stat(path).st_mtime_ns
+                if mtime != last_mtime:
+                    self.publish(load_csv(path), source=path)
+                    last_mtime = mtime
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"⚠️ Failed to reload {path}: {e}")
+            stop.wait(interval)
+
+
+def start_server(port=DEFAULT_PORT, host='127.0.0.1', csv_path=DEFAULT_CSV, watch_interval=5.0):
+    """
+    Start the API in background threads
+    
+    Args:
+        csv_path: Combined CSV to serve and reload when it changes, or None when the
+                  caller publishes DataFrames itself (publish())
+    
+    Returns:
+        ConditionsServer: call shutdown() to stop it
+    """
+    server = ConditionsServer((host, port))
+    threading.Thread(target=server.serve_forever, name='conditions-api', daemon=True).start()
+    if csv_path is not None:
+        threading.Thread(target=server.watch, args=(csv_path, watch_interval), name='conditions-watch',
+                         daemon=True).start()
+    logger.info(f"📡 Conditions API listening on http://{host}:{server.server_address[1]}")
+    return server
+
+
+def main(argv=None):
+    """Serve the combined CSV until interrupted"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Serve the latest resort conditions over HTTP")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--host', default='127.0.0.1', help="Interface to bind (0.0.0.0 for all)")
+    parser.add_argument('--csv', default=DEFAULT_CSV, help="Combined data file to serve and watch")
+    parser.add_argument('--watch-interval', type=float, default=5.0, help="Seconds between file checks")
+    args = parser.parse_args(argv)
+    
+    server = start_server(args.port, args.host, args.csv, args.watch_interval)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
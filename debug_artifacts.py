@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Debug Page Store
+Keeps rendered OnTheSnow pages for debugging as gzip files named by the SHA-256 of
+their content, so an identical page is only stored once however often it is captured.
+
+    debug_pages/3f2a9c...e1.html.gz      # one file per distinct page
+    debug_pages/captures.json            # digest -> region label, reason, first/last captured
+
+Capture mode (DEBUG_CAPTURE):
+    on-failure  only pages that failed to parse (default)
+    always      every fetched page
+
+Retention is bounded by age (DEBUG_MAX_AGE_DAYS, default 14) and total size
+(DEBUG_MAX_MB, default 50); the least recently captured pages are removed first.
+The .html.gz files can be fed straight to replay_archive.py.
+"""
+
+import os
+import gzip
+import json
+import time
+import logging
+from datetime import datetime
+from fetch_cache import payload_hash
+
+logger = logging.getLogger(__name__)
+
+DEBUG_DIR = os.environ.get("DEBUG_PAGES_DIR", "debug_pages")
+CAPTURE_MODES = ('on-failure', 'always')
+CAPTURES_FILE = "captures.json"
+PAGE_SUFFIX = ".html.gz"
+
+
+class DebugPageStore:
+    """Content-addressed, gzip-compressed store of rendered pages with bounded retention"""
+    
+    def __init__(self, root=None, mode=None, max_bytes=None, max_age_days=None):
+        self.root = root or DEBUG_DIR
+        self.mode = (mode or os.environ.get("DEBUG_CAPTURE", "on-failure")).lower()
+        if self.mode not in CAPTURE_MODES:
+            logger.warning(f"Unknown DEBUG_CAPTURE '{self.mode}', using on-failure")
+            self.mode = 'on-failure'
+        if max_bytes is None:
+            max_bytes = float(os.environ.get("DEBUG_MAX_MB", "50")) * 1024 * 1024
+        self.max_bytes = max_bytes
+        self.max_age_days = float(os.environ.get("DEBUG_MAX_AGE_DAYS", "14")) if max_age_days is None else max_age_days
+    
+    def _path(self, digest):
+        return os.path.join(self.root, f"{digest}{PAGE_SUFFIX}")
+    
+    def _load_captures(self):
+        try:
+            with open(os.path.join(self.root, CAPTURES_FILE), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_captures(self, captures):
+        path = os.path.join(self.root, CAPTURES_FILE)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(captures, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+    
+    def should_capture(self, failed=False):
+        """True if a page should be kept in the current mode (failures always are)"""
+        return failed or self.mode == 'always'
+    
+    def capture(self, html, label, failed=False, reason=None):
+        """
+        Store a page if the capture mode asks for it; errors are logged, never raised
+        
+        Args:
+            html: Page source as str or bytes
+            label: What the page is, e.g. the region slug
+            failed: The page could not be parsed (forces a capture)
+            reason: Short note stored with the capture (defaults to 'parse-failure'/'sample')
+        
+        Returns:
+            str: path of the stored page, or None if nothing was captured
+        """
+        if not html or not self.should_capture(failed):
+            return None
+        
+        data = html.encode('utf-8') if isinstance(html, str) else html
+        digest = payload_hash(data)
+        path = self._path(digest)
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            if os.path.exists(path):
+                # Identical page already stored: only refresh its age
+                os.utime(path)
+            else:
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(gzip.compress(data, mtime=0))
+                os.replace(tmp_path, path)
+            
+            now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            captures = self._load_captures()
+            entry = captures.setdefault(digest, {'first_captured': now, 'count': 0})
+            entry.update({
+                'label': label,
+                'reason': reason or ('parse-failure' if failed else 'sample'),
+                'last_captured': now,
+                'count': entry['count'] + 1,
+            })
+            self._save_captures(captures)
+            self.prune(captures)
+        except OSError as e:
+            logger.warning(f"⚠️ Failed to store debug page for {label}: {e}")
+            return None
+        
+        logger.info(f"Saved {label} page to {path} ({len(data) / 1024:.0f} KB uncompressed)")
+        return path
+    
+    def prune(self, captures=None):
+        """
+        Remove pages older than max_age_days, then the oldest until under max_bytes
+        
+        Returns:
+            int: number of pages removed
+        """
+        if not os.path.isdir(self.root):
+            return 0
+        
+        pages = []
+        for name in os.listdir(self.root):
+            if name.endswith(PAGE_SUFFIX):
+                stat = os.stat(os.path.join(self.root, name))
+                pages.append((stat.st_mtime, stat.st_size, name))
+        pages.sort()
+        
+        cutoff = time.time() - self.max_age_days * 86400
+        total = sum(size for _, size, _ in pages)
+        removed = []
+        for mtime, size, name in pages:
+            if mtime >= cutoff and total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.root, name))
+            total -= size
+            removed.append(name[:-len(PAGE_SUFFIX)])
+        
+        if removed:
+            captures = self._load_captures() if captures is None else captures
+            for digest in removed:
+                captures.pop(digest, None)
+            self._save_captures(captures)
+            logger.info(f"Pruned {len(removed)} debug pages ({total / 1024:.0f} KB kept)")
+        return len(removed)
+
+
+# Shared by both scrapers
+DEBUG_PAGES = DebugPageStore()
@@ -11,6 +11,12 @@ const MAPBOX_TOKEN = 'pk.eyJ1IjoiZXZud2xnIiwiYSI6ImNtaTIzYTFnYzFneG8yaXB4NDg3M3R
 // 4. Click Publish and copy the URL
 const DATA_URL = 'https://docs.google.com/spreadsheets/d/e/2PACX-1vQPDR89F-3N-HKuQDKU8fRdQLpNncVHgm0yeq_DuLhIFNgpPYoul2xH6_joAgOeQRs3IujzHse2H7Y7/pub?output=csv';
 
+// Precomputed GeoJSON written by the Python pipeline (map_artifact.py)
+// Loaded first; the Google Sheets CSV above is only used if it is unavailable
+const MAP_DATA_URL = 'data/resorts.geojson';
+// Version manifest polled on refresh; lists the delta files for recent versions
+const MAP_MANIFEST_URL = 'data/manifest.json';
+
 // Map configuration
 const MAP_CONFIG = {
     // California ski resort bounds (calculated from actual resort locations)
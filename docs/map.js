@@ -1,5 +1,5 @@
 // California Snow Conditions - Mapbox Map
-// Loads data from Google Sheets and renders interactive resort markers
+// Loads the precomputed GeoJSON (falling back to the Google Sheets CSV) and renders interactive resort markers
 
 // Configuration
 mapboxgl.accessToken = MAPBOX_TOKEN;
@@ -37,6 +37,7 @@ const REGIONS = {
 let map;
 let resortData = [];
 let markers = [];
+let dataVersion = null; // GeoJSON version on screen (null when showing CSV data)
 let currentFilter = 'all'; // 'all' or 'open'
 let currentRegion = 'all';
 
@@ -46,8 +47,8 @@ document.addEventListener('DOMContentLoaded', () => {
     loadData();
     setupEventListeners();
     
-    // Auto-refresh data every 5 minutes
-    setInterval(loadData, 5 * 60 * 1000);
+    // Auto-refresh data every 5 minutes (polls the manifest, applies deltas)
+    setInterval(refreshData, REFRESH_INTERVAL);
 });
 
 function initMap() {
@@ -144,21 +145,22 @@ function setRegion(region) {
 
 async function loadData() {
     try {
-        console.log('Fetching data from Google Sheets...');
+        resortData = await loadGeoJSON();
         
-        const response = await fetch(DATA_URL);
-        const csvText = await response.text();
-        
-        // Parse CSV
-        resortData = parseCSV(csvText);
+        if (!resortData) {
+            console.log('Fetching data from Google Sheets...');
+            
+            const response = await fetch(DATA_URL);
+            const csvText = await response.text();
+            
+            // Parse CSV
+            resortData = parseCSV(csvText);
+        }
         console.log(`Loaded ${resortData.length} resorts`);
         
         // Update last update time
         if (resortData.length > 0) {
-            const lastUpdate = resortData[0]['Last Updated'] || 'Unknown';
-            // Format: "2025-11-16 11:46" → "Nov 16, 11:46am"
-            const formatted = formatTimestamp(lastUpdate);
-            document.getElementById('lastUpdate').textContent = `Updated ${formatted}`;
+            showLastUpdate(resortData[0]['Last Updated'] || 'Unknown');
         }
         
         // Render markers
@@ -174,6 +176,142 @@ async function loadData() {
     }
 }
 
+async function loadGeoJSON() {
+    // Precomputed data from the pipeline; returns null so the caller can fall back to CSV
+    try {
+        const [collection, manifest] = await Promise.all([
+            fetchJSON(MAP_DATA_URL),
+            fetchJSON(MAP_MANIFEST_URL).catch(() => null)
+        ]);
+        
+        dataVersion = collection.version ?? null;
+        // The manifest is rewritten every run, so its time is the latest check
+        const updated = (manifest && manifest.version === dataVersion) ? manifest.updated : collection.updated;
+        return collection.features.map(feature => featureToResort(feature, updated));
+    } catch (error) {
+        console.warn('GeoJSON unavailable, falling back to CSV:', error);
+        dataVersion = null;
+        return null;
+    }
+}
+
+async function fetchJSON(url) {
+    const response = await fetch(url, { cache: 'no-cache' });
+    if (!response.ok) {
+        throw new Error(`HTTP ${response.status} for ${url}`);
+    }
+    return response.json();
+}
+
+async function refreshData() {
+    // CSV data has no versions - reload everything
+    if (dataVersion === null) {
+        return loadData();
+    }
+    
+    try {
+        const manifest = await fetchJSON(MAP_MANIFEST_URL);
+        showLastUpdate(manifest.updated);
+        
+        if (manifest.version === dataVersion) {
+            return;
+        }
+        
+        // Deltas must cover every version since ours, otherwise reload the full file
+        const needed = manifest.deltas.filter(d => d.version > dataVersion);
+        if (needed.length !== manifest.version - dataVersion) {
+            console.log(`Version ${dataVersion} is too old for deltas, reloading`);
+            return loadData();
+        }
+        
+        const manifestUrl = new URL(MAP_MANIFEST_URL, window.location.href);
+        for (const entry of needed) {
+            const delta = await fetchJSON(new URL(entry.file, manifestUrl));
+            applyDelta(delta, manifest.updated);
+            dataVersion = delta.version;
+        }
+        console.log(`Updated to data version ${dataVersion}`);
+    } catch (error) {
+        console.warn('Incremental refresh failed, reloading:', error);
+        return loadData();
+    }
+}
+
+function applyDelta(delta, updated) {
+    // Replace only the markers of resorts that changed
+    const removed = new Set(delta.remove);
+    const changed = new Map();
+    delta.upsert.forEach(feature => {
+        const resort = featureToResort(feature, updated);
+        changed.set(resort.key, resort);
+    });
+    
+    resortData = resortData
+        .filter(r => !removed.has(r.key) && !changed.has(r.key))
+        .concat(Array.from(changed.values()));
+    
+    markers = markers.filter(marker => {
+        const key = marker._resort.key;
+        if (removed.has(key) || changed.has(key)) {
+            marker.remove();
+            return false;
+        }
+        return true;
+    });
+    
+    changed.forEach(resort => {
+        if (passesFilter(resort)) {
+            const marker = createMarker(resort);
+            if (marker) markers.push(marker);
+        }
+    });
+    
+    console.log(`Applied delta ${delta.version}: ${changed.size} changed, ${removed.size} removed`);
+}
+
+function resortKey(p) {
+    // Same key as map_artifact.feature_key(): OnTheSnow ID, else slug, else name
+    if (p.id !== null && p.id !== undefined) return String(p.id);
+    if (p.sl) return `slug:${p.sl}`;
+    return `name:${p.n}`;
+}
+
+function featureToResort(feature, updated) {
+    // Map short GeoJSON keys (see map_artifact.py) onto the CSV column names used below
+    const p = feature.properties;
+    const [lng, lat] = feature.geometry.coordinates;
+    
+    return {
+        'Resort Name': p.n || '',
+        'Latitude': lat,
+        'Longitude': lng,
+        'Status': p.s,
+        '24h Snowfall (in)': p.s24,
+        '48h Snowfall (in)': p.s48,
+        'Base Depth (in)': p.b,
+        'Mid-Mtn Depth (in)': p.m,
+        'Surface Conditions': p.sc || '',
+        'Total Trails': p.tt,
+        'Open Trails': p.to,
+        'Trails Open %': p.tp,
+        'Total Lifts': p.lt,
+        'Open Lifts': p.lo,
+        'Lifts Open %': p.lp,
+        'Data Source': p.src || '',
+        'Last Updated': updated || '',
+        // Key for delta updates and precomputed marker style
+        key: resortKey(p),
+        markerColor: p.c,
+        markerSize: p.sz
+    };
+}
+
+function showLastUpdate(lastUpdate) {
+    // Format: "2025-11-16 11:46" → "Nov 16, 11:46am"
+    const formatted = formatTimestamp(lastUpdate);
+    document.getElementById('lastUpdate').textContent = `Updated ${formatted}`;
+}
+
 function parseCSV(csv) {
     const lines = csv.trim().split('\n');
     const headers = lines[0].split(',');
@@ -222,119 +360,12 @@ function renderMarkers() {
     markers = [];
     
     // Filter resorts based on current filter
-    let filteredResorts = resortData;
-    if (currentFilter === 'open') {
-        filteredResorts = resortData.filter(r => r.Status === 'Open');
-    }
+    const filteredResorts = resortData.filter(passesFilter);
     
     // Create markers for each resort
     filteredResorts.forEach(resort => {
-        const lat = parseFloat(resort.Latitude);
-        const lng = parseFloat(resort.Longitude);
-        
-        if (isNaN(lat) || isNaN(lng)) {
-            console.warn(`Invalid coordinates for ${resort['Resort Name']}`);
-            return;
-        }
-        
-        // Calculate marker size based on total trails and zoom level
-        const totalTrails = parseFloat(resort['Total Trails']) || 0;
-        const zoom = map.getZoom();
-        const size = calculateMarkerSize(totalTrails, zoom);
-        
-        // Calculate marker color based on trails open percentage
-        const trailsOpenPct = parseFloat(resort['Trails Open %']) || 0;
-        const color = getColorForPercentage(trailsOpenPct, resort.Status);
-        
-        // Calculate stroke color based on status
-        const isOpen = resort.Status === 'Open';
-        const strokeColor = isOpen ? STROKE_COLORS.open : STROKE_COLORS.closed;
-        
-        // Create marker element with fixed positioning
-        const el = document.createElement('div');
-        el.className = 'custom-marker';
-        
-        // Convert hex color to rgba for opacity
-        const rgbaColor = hexToRgba(color, MARKER_OPACITY);
-        
-        el.style.width = `${size}px`;
-        el.style.height = `${size}px`;
-        el.style.borderRadius = '50%';
-        el.style.backgroundColor = rgbaColor;  // Use rgba for opacity
-        el.style.border = `2px solid ${strokeColor}`;
-        el.style.boxShadow = '0 2px 8px rgba(0,0,0,0.3)';
-        el.style.cursor = 'pointer';
-        
-        // Store original size for hover effect
-        el.dataset.originalSize = size;
-        
-        // Create popup first (before event listeners reference it)
-        const popup = new mapboxgl.Popup({
-            offset: 25,
-            closeButton: true,
-            closeOnClick: false,
-            maxWidth: '320px'
-        }).setHTML(createPopupHTML(resort));
-        
-        // Track if popup is pinned (clicked)
-        let isPinned = false;
-        
-        // Hover effects - show popup on hover
-        el.addEventListener('mouseenter', () => {
-            const newSize = size * 1.2;
-            el.style.width = `${newSize}px`;
-            el.style.height = `${newSize}px`;
-            el.style.boxShadow = '0 4px 16px rgba(0,0,0,0.5)';
-            
-            // Show popup on hover if not already pinned
-            if (!isPinned) {
-                popup.addTo(map);
-            }
-        });
-        
-        el.addEventListener('mouseleave', () => {
-            el.style.width = `${size}px`;
-            el.style.height = `${size}px`;
-            el.style.boxShadow = '0 3px 12px rgba(0,0,0,0.4)';
-            
-            // Hide popup on mouse leave if not pinned
-            if (!isPinned) {
-                popup.remove();
-            }
-        });
-        
-        // Click to pin/unpin popup
-        el.addEventListener('click', (e) => {
-            e.stopPropagation();
-            
-            // Close all other popups and unpin them
-            markers.forEach(m => {
-                if (m !== marker) {
-                    m.getPopup().remove();
-                    const markerEl = m.getElement();
-                    markerEl._isPinned = false;
-                }
-            });
-            
-            // Toggle this popup's pinned state
-            isPinned = !isPinned;
-            el._isPinned = isPinned;
-            
-            if (isPinned) {
-                popup.addTo(map);
-            }
-        });
-        
-        // Create and add marker with anchor set to center
-        const marker = new mapboxgl.Marker({
-            element: el,
-            anchor: 'center'  // This prevents the diagonal movement!
-        })
-            .setLngLat([lng, lat])
-            .setPopup(popup)
-            .addTo(map);
-        
-        markers.push(marker);
+        const marker = createMarker(resort);
+        if (marker) markers.push(marker);
     });
     
     console.log(`Rendered ${markers.length} markers`);
@@ -362,6 +393,137 @@ function renderMarkers() {
     }
 }
 
+function passesFilter(resort) {
+    return currentFilter !== 'open' || resort.Status === 'Open';
+}
+
+function createMarker(resort) {
+    // Build one resort marker with its popup; returns null if it has no coordinates
+    const lat = parseFloat(resort.Latitude);
+    const lng = parseFloat(resort.Longitude);
+    
+    if (isNaN(lat) || isNaN(lng)) {
+        console.warn(`Invalid coordinates for ${resort['Resort Name']}`);
+        return null;
+    }
+    
+    // Marker size based on total trails and zoom level
+    const zoom = map.getZoom();
+    const size = markerSizeFor(resort, zoom);
+    
+    // Marker color based on trails open percentage (precomputed for GeoJSON data)
+    const trailsOpenPct = parseFloat(resort['Trails Open %']) || 0;
+    const color = resort.markerColor || getColorForPercentage(trailsOpenPct, resort.Status);
+    
+    // Calculate stroke color based on status
+    const isOpen = resort.Status === 'Open';
+    const strokeColor = isOpen ? STROKE_COLORS.open : STROKE_COLORS.closed;
+    
+    // Create marker element with fixed positioning
+    const el = document.createElement('div');
+    el.className = 'custom-marker';
+    
+    // Convert hex color to rgba for opacity
+    const rgbaColor = hexToRgba(color, MARKER_OPACITY);
+    
+    el.style.width = `${size}px`;
+    el.style.height = `${size}px`;
+    el.style.borderRadius = '50%';
+    el.style.backgroundColor = rgbaColor;  // Use rgba for opacity
+    el.style.border = `2px solid ${strokeColor}`;
+    el.style.boxShadow = '0 2px 8px rgba(0,0,0,0.3)';
+    el.style.cursor = 'pointer';
+    
+    // Store original size for hover effect
+    el.dataset.originalSize = size;
+    
+    // Create popup first (before event listeners reference it)
+    const popup = new mapboxgl.Popup({
+        offset: 25,
+        closeButton: true,
+        closeOnClick: false,
+        maxWidth: '320px'
+    }).setHTML(createPopupHTML(resort));
+    
+    // Track if popup is pinned (clicked)
+    let isPinned = false;
+    
+    // Hover effects - show popup on hover
+    el.addEventListener('mouseenter', () => {
+        const newSize = size * 1.2;
+        el.style.width = `${newSize}px`;
+        el.style.height = `${newSize}px`;
+        el.style.boxShadow = '0 4px 16px rgba(0,0,0,0.5)';
+        
+        // Show popup on hover if not already pinned
+        if (!isPinned) {
+            popup.addTo(map);
+        }
+    });
+    
+    el.addEventListener('mouseleave', () => {
+        el.style.width = `${size}px`;
+        el.style.height = `${size}px`;
+        el.style.boxShadow = '0 3px 12px rgba(0,0,0,0.4)';
+        
+        // Hide popup on mouse leave if not pinned
+        if (!isPinned) {
+            popup.remove();
+        }
+    });
+    
+    // Click to pin/unpin popup
+    el.addEventListener('click', (e) => {
+        e.stopPropagation();
+        
+        // Close all other popups and unpin them
+        markers.forEach(m => {
+            if (m !== marker) {
+                m.getPopup().remove();
+                const markerEl = m.getElement();
+                markerEl._isPinned = false;
+            }
+        });
+        
+        // Toggle this popup's pinned state
+        isPinned = !isPinned;
+        el._isPinned = isPinned;
+        
+        if (isPinned) {
+            popup.addTo(map);
+        }
+    });
+    
+    // Create and add marker with anchor set to center
+    const marker = new mapboxgl.Marker({
+        element: el,
+        anchor: 'center'  // This prevents the diagonal movement!
+    })
+        .setLngLat([lng, lat])
+        .setPopup(popup)
+        .addTo(map);
+    
+    // Remember the resort for zoom resizing and delta updates
+    marker._resort = resort;
+    return marker;
+}
+
+function markerScale(zoom = null) {
+    // Mobile and zoom multipliers applied to a precomputed desktop marker size
+    let scale = window.innerWidth < 768 ? 0.75 : 1;
+    if (zoom !== null) {
+        scale *= Math.max(1, Math.min(2, (zoom - 6) / 3));
+    }
+    return scale;
+}
+
+function markerSizeFor(resort, zoom = null) {
+    if (resort.markerSize) {
+        return resort.markerSize * markerScale(zoom);
+    }
+    return calculateMarkerSize(parseFloat(resort['Total Trails']) || 0, zoom);
+}
+
 function calculateMarkerSize(totalTrails, zoom = null) {
     // Size markers based on resort size (total trails)
     // Use smaller sizes on mobile
@@ -390,18 +552,11 @@ function updateMarkerSizes() {
     // Update all marker sizes based on current zoom level
     const zoom = map.getZoom();
     
-    markers.forEach((marker, index) => {
-        const resort = resortData.filter(r => {
-            if (currentFilter === 'open') {
-                return r.Status && r.Status.toLowerCase() === 'open';
-            }
-            return true;
-        })[index];
-        
+    markers.forEach(marker => {
+        const resort = marker._resort;
         if (!resort) return;
         
-        const totalTrails = parseFloat(resort['Total Trails']) || 0;
-        const newSize = calculateMarkerSize(totalTrails, zoom);
+        const newSize = markerSizeFor(resort, zoom);
         
         const el = marker.getElement();
         el.style.width = `${newSize}px`;
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Chrome Driver Pool
+Keeps warm headless Chrome sessions so a long-running process or a multi-region run
+does not pay the browser launch cost for every page.
+Drivers are reset between pages and recycled after N uses or after a crash.
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import WebDriverException
+from metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+
+
+def create_chrome_driver(headless=True):
+    """Launch a Chrome driver configured for CI/cloud environments"""
+    chrome_options = Options()
+    
+    if headless:
+        chrome_options.add_argument("--headless")
+    
+    # Essential options for CI/cloud environments
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_argument(f"--user-agent={USER_AGENT}")
+    
+    with METRICS.timer('driver_init'):
+        return webdriver.Chrome(options=chrome_options)
+
+
+class DriverPool:
+    """Pool of reusable Chrome drivers with reset, recycling and hit statistics"""
+    
+    def __init__(self, size=2, headless=True, max_uses=25, factory=None):
+        """
+        Args:
+            size: Maximum number of drivers alive at once
+            headless: Launch Chrome headless
+            max_uses: Pages served by a driver before it is quit and replaced
+            factory: Callable returning a new driver (defaults to create_chrome_driver)
+        """
+        self.size = size
+        self.max_uses = max_uses
+        self.factory = factory or (lambda: create_chrome_driver(headless))
+        self._idle = []
+        self._uses = {}
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+        self._closed = False
+        self.counters = {
+            'acquired': 0,
+            'hits': 0,
+            'launches': 0,
+            'recycled': 0,
+            'crashed': 0,
+        }
+    
+    def acquire(self):
+        """Take a warm driver from the pool, launching one if none is idle"""
+        if self._closed:
+            raise RuntimeError("DriverPool is closed")
+        
+        self._slots.acquire()
+        try:
+            with self._lock:
+                self.counters['acquired'] += 1
+                driver = self._idle.pop() if self._idle else None
+                if driver is not None:
+                    self.counters['hits'] += 1
+            
+            if driver is None:
+                driver = self.factory()
+                with self._lock:
+                    self.counters['launches'] += 1
+                    self._uses[id(driver)] = 0
+                logger.info("Chrome driver launched for pool")
+            
+            return driver
+        except Exception:
+            self._slots.release()
+            raise
+    
+    def release(self, driver, broken=False):
+        """Return a driver to the pool, resetting it or quitting it if worn out or broken"""
+        try:
+            with self._lock:
+                uses = self._uses.get(id(driver), 0) + 1
+                self._uses[id(driver)] = uses
+            
+            if broken:
+                with self._lock:
+                    self.counters['crashed'] += 1
+                self._discard(driver, "crashed")
+            elif self._closed or uses >= self.max_uses:
+                self._discard(driver, f"served {uses} pages")
+            elif self._reset(driver):
+                with self._lock:
+                    self._idle.append(driver)
+            else:
+                with self._lock:
+                    self.counters['crashed'] += 1
+                self._discard(driver, "reset failed")
+        finally:
+            self._slots.release()
+    
+    @contextmanager
+    def driver(self):
+        """Context manager yielding a pooled driver; WebDriver errors retire it"""
+        driver = self.acquire()
+        try:
+            yield driver
+        except WebDriverException:
+            self.release(driver, broken=True)
+            raise
+        except BaseException:
+            self.release(driver)
+            raise
+        else:
+            self.release(driver)
+    
+    def _reset(self, driver):
+        """Clear state left by the previous page; returns False if the session is dead"""
+        try:
+            driver.execute_script(
+                "try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}"
+            )
+            driver.delete_all_cookies()
+            driver.get("about:blank")
+            return True
+        except WebDriverException as e:
+            logger.warning(f"Failed to reset pooled driver: {e}")
+            return False
+    
+    def _discard(self, driver, reason):
+        with self._lock:
+            self._uses.pop(id(driver), None)
+            self.counters['recycled'] += 1
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.warning(f"Error closing pooled driver: {e}")
+        logger.info(f"Recycled pooled Chrome driver ({reason})")
+    
+    def stats(self):
+        """Return pool counters plus the warm-hit rate"""
+        with self._lock:
+            stats = dict(self.counters)
+            stats['idle'] = len(self._idle)
+        stats['hit_rate'] = round(stats['hits'] / stats['acquired'], 3) if stats['acquired'] else 0.0
+        return stats
+    
+    def close(self):
+        """Quit all idle drivers; drivers still in use are quit when released"""
+        self._closed = True
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            self._discard(driver, "pool closed")
+        logger.info(f"Driver pool closed: {self.stats()}")
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
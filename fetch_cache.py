@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Fetch Cache
+Remembers HTTP validators (ETag / Last-Modified) and a hash of the resorts payload
+for each OnTheSnow page, so unchanged reports can skip parsing, enrichment and upload.
+
+Entries are recorded as unpublished when scraped and only count as a cache hit once
+the Google Sheets upload for that data has succeeded (mark_published).
+"""
+
+import os
+import json
+import hashlib
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+FETCH_CACHE_FILE = ".onthesnow_fetch_cache.json"
+RUN_STATE_FILE = "last_run_state.json"
+
+
+def payload_hash(payload):
+    """SHA-256 hex digest of a str/bytes payload"""
+    if isinstance(payload, str):
+        payload = payload.encode('utf-8')
+    return hashlib.sha256(payload).hexdigest()
+
+
+def write_json_atomic(path, data):
+    """Write data as indented JSON via a temp file, so readers never see a partial file"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def read_json(path):
+    """Load a JSON state file, or {} if it is missing or unreadable"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable {path}: {e}")
+        return {}
+
+
+class FetchCache:
+    """Per-URL validators and payload hashes persisted between runs"""
+    
+    def __init__(self, path=FETCH_CACHE_FILE):
+        self.path = path
+        self.entries = read_json(path)
+    
+    def conditional_headers(self, url):
+        """Headers for a conditional GET, only if the cached copy was published"""
+        entry = self.entries.get(url)
+        if not entry or not entry.get('published'):
+            return {}
+        
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+    
+    def is_unchanged(self, url, digest):
+        """True if this payload hash matches the last published one for the URL"""
+        entry = self.entries.get(url)
+        return bool(entry and entry.get('published') and digest and entry.get('payload_hash') == digest)
+    
+    def record(self, url, digest, etag=None, last_modified=None):
+        """Remember a freshly scraped page (unpublished until mark_published)"""
+        self.entries[url] = {
+            'etag': etag,
+            'last_modified': last_modified,
+            'payload_hash': digest,
+            'fetched_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'published': False,
+        }
+    
+    def mark_published(self):
+        """Mark every recorded page as successfully uploaded and persist"""
+        for entry in self.entries.values():
+            entry['published'] = True
+        self.save()
+    
+    def save(self):
+        """Persist the cache atomically"""
+        write_json_atomic(self.path, self.entries)
+
+
+def write_run_state(cache_hit, **details):
+    """Record the outcome of the scrape step for later pipeline stages"""
+    state = {
+        'cache_hit': bool(cache_hit),
+        'finished_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    state.update(details)
+    write_json_atomic(RUN_STATE_FILE, state)
+    return state
+
+
+def read_run_state():
+    """Return the state written by the last scrape step ({} if none)"""
+    return read_json(RUN_STATE_FILE)
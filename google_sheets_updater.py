@@ -11,9 +11,10 @@ import pandas as pd
 from datetime import datetime
 from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from sheets_client import build_sheets_service, execute_with_backoff, get_credentials, save_token
+from metrics import METRICS
+from fetch_cache import FetchCache, read_run_state, read_json, write_json_atomic
 
 # Load environment variables
 load_dotenv()
@@ -36,14 +37,105 @@ CREDENTIALS_JSON = os.environ.get("GOOGLE_CREDENTIALS")  # JSON string from GitH
 # Google Sheets API scopes
 SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
 
+# Last grid written to each sheet, used to send only the cells that changed
+SHEET_STATE_FILE = ".sheets_publish_state.json"
+
+
+def diff_grid(old, new):
+    """
+    Compare two grids (lists of rows) cell by cell
+    
+    Cells that only exist in the old grid are diffed against '' so leftover rows and
+    columns get blanked. Changed cells are grouped into runs within a row, and runs
+    covering the same columns in consecutive rows are merged into one rectangle.
+    
+    Returns:
+        list: (start_row, start_col, rows) blocks, 0-based, rows being lists of values
+    """
+    height = max(len(old), len(new))
+    width = max((len(row) for row in old + new), default=0)
+    
+    def cell(grid, r, c):
+        if r < len(grid) and c < len(grid[r]):
+            return grid[r][c]
+        return ''
+    
+    blocks = []
+    open_blocks = {}
+    for r in range(height):
+        runs = []
+        c = 0
+        while c < width:
+            if cell(old, r, c) == cell(new, r, c):
+                c += 1
+                continue
+            start = c
+            while c < width and cell(old, r, c) != cell(new, r, c):
+                c += 1
+            runs.append((start, c))
+        
+        still_open = {}
+        for start, end in runs:
+            values = [cell(new, r, c) for c in range(start, end)]
+            block = open_blocks.get((start, end))
+            if block is not None and block[0] + len(block[2]) == r:
+                block[2].append(values)
+            else:
+                block = [r, start, [values]]
+                blocks.append(block)
+            still_open[(start, end)] = block
+        open_blocks = still_open
+    
+    return [tuple(block) for block in blocks]
+
+
+def cell_data(value):
+    """Convert a grid value to Sheets CellData (RAW semantics, '' clears the cell)"""
+    if value is None or value == '':
+        return {}
+    if isinstance(value, bool):
+        return {'userEnteredValue': {'boolValue': value}}
+    if isinstance(value, (int, float)):
+        return {'userEnteredValue': {'numberValue': value}}
+    return {'userEnteredValue': {'stringValue': str(value)}}
+
+
+def update_cells_request(sheet_id, start_row, start_col, rows, end_row=None, end_col=None):
+    """
+    Build an updateCells request writing rows at (start_row, start_col)
+    
+    Cells inside the range but outside rows are cleared, so an open-ended range
+    (end_row=None) also wipes whatever was below the written block.
+    """
+    grid_range = {
+        'sheetId': sheet_id,
+        'startRowIndex': start_row,
+        'startColumnIndex': start_col,
+        'endColumnIndex': end_col if end_col is not None else start_col + len(rows[0]),
+    }
+    if end_row is not None:
+        grid_range['endRowIndex'] = end_row
+    
+    return {
+        'updateCells': {
+            'range': grid_range,
+            'rows': [{'values': [cell_data(value) for value in row]} for row in rows],
+            'fields': 'userEnteredValue'
+        }
+    }
+
 
 class GoogleSheetsUpdater:
     """Handles updating Google Sheets with California resort data"""
     
-    def __init__(self, spreadsheet_id=None, credentials_json=None):
+    def __init__(self, spreadsheet_id=None, credentials_json=None, state_file=SHEET_STATE_FILE, full_write=False):
         self.spreadsheet_id = spreadsheet_id or SPREADSHEET_ID
         self.credentials_json = credentials_json or CREDENTIALS_JSON
         self.service = None
+        self.credentials = None
+        self.state_file = state_file
+        # Set to ignore the saved grid, e.g. after the sheet was edited by hand
+        self.full_write = full_write
         
         if not self.spreadsheet_id:
             raise ValueError("GOOGLE_SHEETS_SPREADSHEET_ID not set")
@@ -88,26 +180,26 @@ class GoogleSheetsUpdater:
             else:
                 credentials_dict = self.credentials_json
             
-            # Create credentials
-            credentials = service_account.Credentials.from_service_account_info(
-                credentials_dict,
-                scopes=SCOPES
-            )
+            # Create credentials (reused, with their token, across updaters in this process)
+            self.credentials = get_credentials(credentials_dict, SCOPES)
             
-            # Build the service
-            self.service = build('sheets', 'v4', credentials=credentials)
+            # Build the service from the cached discovery document
+            self.service = build_sheets_service(self.credentials)
             logger.info("✅ Successfully authenticated with Google Sheets API")
             return True
-            
+        
         except Exception as e:
             logger.error(f"❌ Failed to authenticate: {e}")
             raise
     
-    def prepare_data(self, csv_file):
-        """Read and prepare data from CSV file"""
+    def prepare_data(self, data):
+        """Prepare sheet rows from a combined-data DataFrame or a path to its CSV file"""
         try:
-            logger.info(f"Reading data from {csv_file}...")
-            df = pd.read_csv(csv_file)
+            if isinstance(data, pd.DataFrame):
+                df = data
+            else:
+                logger.info(f"Reading data from {data}...")
+                df = pd.read_csv(data)
             
             # Select and rename columns for Google Sheets
             # Include all useful data for Datawrapper Symbol Map
@@ -148,116 +240,191 @@ class GoogleSheetsUpdater:
             
             logger.info(f"✅ Prepared data: {len(values)-1} resorts")
             return values
-            
+        
         except Exception as e:
             logger.error(f"❌ Failed to prepare data: {e}")
             raise
     
-    def update_sheet(self, values, sheet_name='Sheet1'):
-        """Update Google Sheet with new data"""
+    def load_last_grid(self, sheet_name='Sheet1'):
+        """Return the grid last written to this sheet, or None if unknown or full_write is set"""
+        if self.full_write:
+            return None
+        state = read_json(self.state_file).get(f'{self.spreadsheet_id}/{sheet_name}')
+        return state.get('values') if state else None
+    
+    def load_formatted_header(self, sheet_name='Sheet1'):
+        """Return the header row the sheet was last formatted for, or None"""
+        if self.full_write:
+            return None
+        state = read_json(self.state_file).get(f'{self.spreadsheet_id}/{sheet_name}')
+        return state.get('formatted_header') if state else None
+    
+    def save_last_grid(self, values, sheet_name='Sheet1', sheet_id=None, formatted=False):
+        """Remember the grid now in the sheet for the next diff"""
+        state = read_json(self.state_file)
+        key = f'{self.spreadsheet_id}/{sheet_name}'
+        previous = state.get(key, {})
+        state[key] = {
+            'values': values,
+            'sheet_id': sheet_id if sheet_id is not None else previous.get('sheet_id'),
+            'formatted_header': values[0] if formatted else previous.get('formatted_header'),
+            'written_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        write_json_atomic(self.state_file, state)
+    
+    def lookup_sheet_id(self, sheet_name='Sheet1'):
+        """
+        Numeric sheetId of a sheet by name (updateCells and formatting need the ID)
+        
+        The ID is kept in SHEET_STATE_FILE, so the spreadsheet is only queried when no
+        state is saved for the sheet.
+        """
+        state = read_json(self.state_file).get(f'{self.spreadsheet_id}/{sheet_name}')
+        if state and state.get('sheet_id') is not None and not self.full_write:
+            return state['sheet_id']
+        
+        result = execute_with_backoff(self.service.spreadsheets().get(
+            spreadsheetId=self.spreadsheet_id,
+            fields='sheets.properties(sheetId,title)'
+        ))
+        for sheet in result.get('sheets', []):
+            if sheet['properties']['title'] == sheet_name:
+                return sheet['properties']['sheetId']
+        raise ValueError(f"No sheet named '{sheet_name}' in spreadsheet {self.spreadsheet_id}")
+    
+    def publish(self, values, sheet_name='Sheet1'):
+        """
+        Write the data and any needed formatting in a single batchUpdate round trip
+        
+        Only the cells that changed since the last successful write (kept in
+        SHEET_STATE_FILE) are sent. Without a saved grid (first run, other spreadsheet,
+        or full_write) the whole grid is written and everything below or to the right
+        of it is cleared in the same request. The header formatting is added only when
+        the header row differs from the one the sheet was last formatted for.
+        
+        Returns:
+            dict: batchUpdate response, or None if nothing needed sending
+        """
         try:
             if not self.service:
                 raise ValueError("Not authenticated. Call authenticate() first.")
             
-            logger.info(f"Updating sheet {self.spreadsheet_id}...")
-            
-            # Clear existing data
-            range_name = f'{sheet_name}!A:Z'
-            logger.info(f"Clearing range {range_name}...")
-            
-            self.service.spreadsheets().values().clear(
-                spreadsheetId=self.spreadsheet_id,
-                range=range_name
-            ).execute()
+            sheet_id = self.lookup_sheet_id(sheet_name)
+            previous = self.load_last_grid(sheet_name)
+            if previous is None:
+                logger.info(f"No previous grid for {sheet_name} - writing all {len(values)} rows...")
+                # Open-ended range: rows below the grid and columns up to Z are cleared too
+                requests = [update_cells_request(sheet_id, 0, 0, values, end_col=26)]
+            else:
+                blocks = diff_grid(previous, values)
+                changed = sum(len(rows) * len(rows[0]) for _, _, rows in blocks)
+                logger.info(f"Writing {changed} changed cells in {len(blocks)} ranges...")
+                requests = [
+                    update_cells_request(sheet_id, row, col, rows, end_row=row + len(rows))
+                    for row, col, rows in blocks
+                ]
             
-            # Write new data
-            logger.info(f"Writing {len(values)} rows...")
+            formatted = values[0] != self.load_formatted_header(sheet_name)
+            if formatted:
+                logger.info("Header layout changed - including formatting")
+                requests += self.format_requests(sheet_id)
             
-            body = {
-                'values': values
-            }
+            if not requests:
+                logger.info("✅ Sheet already up to date - nothing to send")
+                return None
             
-            result = self.service.spreadsheets().values().update(
+            result = execute_with_backoff(self.service.spreadsheets().batchUpdate(
                 spreadsheetId=self.spreadsheet_id,
-                range=f'{sheet_name}!A1',
-                valueInputOption='RAW',
-                body=body
-            ).execute()
-            
-            updated_cells = result.get('updatedCells', 0)
-            logger.info(f"✅ Successfully updated {updated_cells} cells")
+                body={'requests': requests}
+            ))
             
+            self.save_last_grid(values, sheet_name, sheet_id=sheet_id, formatted=formatted)
+            logger.info(f"✅ Published {len(requests)} requests in one batchUpdate")
             return result
-            
+        
         except HttpError as e:
-            logger.error(f"❌ HTTP Error updating sheet: {e}")
+            logger.error(f"❌ HTTP Error publishing sheet: {e}")
             raise
         except Exception as e:
-            logger.error(f"❌ Failed to update sheet: {e}")
+            logger.error(f"❌ Failed to publish sheet: {e}")
             raise
     
-    def format_sheet(self, sheet_name='Sheet1'):
-        """Apply formatting to make the sheet look nice"""
-        try:
-            logger.info("Applying formatting...")
-            
-            requests = [
-                # Freeze header row
-                {
-                    'updateSheetProperties': {
-                        'properties': {
-                            'sheetId': 0,
-                            'gridProperties': {
-                                'frozenRowCount': 1
-                            }
-                        },
-                        'fields': 'gridProperties.frozenRowCount'
-                    }
-                },
-                # Bold header row
-                {
-                    'repeatCell': {
-                        'range': {
-                            'sheetId': 0,
-                            'startRowIndex': 0,
-                            'endRowIndex': 1
-                        },
-                        'cell': {
-                            'userEnteredFormat': {
-                                'textFormat': {
-                                    'bold': True
-                                }
+    def format_requests(self, sheet_id):
+        """batchUpdate requests for the frozen bold header and column widths"""
+        return [
+            # Freeze header row
+            {
+                'updateSheetProperties': {
+                    'properties': {
+                        'sheetId': sheet_id,
+                        'gridProperties': {
+                            'frozenRowCount': 1
+                        }
+                    },
+                    'fields': 'gridProperties.frozenRowCount'
+                }
+            },
+            # Bold header row
+            {
+                'repeatCell': {
+                    'range': {
+                        'sheetId': sheet_id,
+                        'startRowIndex': 0,
+                        'endRowIndex': 1
+                    },
+                    'cell': {
+                        'userEnteredFormat': {
+                            'textFormat': {
+                                'bold': True
                             }
-                        },
-                        'fields': 'userEnteredFormat.textFormat.bold'
-                    }
-                },
-                # Auto-resize columns
-                {
-                    'autoResizeDimensions': {
-                        'dimensions': {
-                            'sheetId': 0,
-                            'dimension': 'COLUMNS',
-                            'startIndex': 0,
-                            'endIndex': 9
                         }
+                    },
+                    'fields': 'userEnteredFormat.textFormat.bold'
+                }
+            },
+            # Auto-resize columns
+            {
+                'autoResizeDimensions': {
+                    'dimensions': {
+                        'sheetId': sheet_id,
+                        'dimension': 'COLUMNS',
+                        'startIndex': 0,
+                        'endIndex': 9
                     }
                 }
-            ]
-            
-            body = {
-                'requests': requests
             }
-            
-            self.service.spreadsheets().batchUpdate(
-                spreadsheetId=self.spreadsheet_id,
-                body=body
-            ).execute()
-            
-            logger.info("✅ Formatting applied")
-            
-        except Exception as e:
-            logger.warning(f"⚠️ Failed to apply formatting (non-critical): {e}")
+        ]
+
+
+def upload_resort_data(data):
+    """
+    Authenticate and publish the data to the sheet
+    
+    Args:
+        data: Combined resort DataFrame, or path to california_resorts_combined.csv
+    
+    Returns:
+        GoogleSheetsUpdater: the updater used (for its spreadsheet_id)
+    """
+    # Initialize updater (FORCE_REFRESH=1 also rewrites every cell)
+    updater = GoogleSheetsUpdater(full_write=os.environ.get("FORCE_REFRESH") == "1")
+    
+    # Authenticate
+    updater.authenticate()
+    
+    # Prepare data
+    values = updater.prepare_data(data)
+    
+    # Write changed cells (and formatting, if the header changed) in one request
+    updater.publish(values)
+    
+    # Let the next run reuse the access token if SHEETS_TOKEN_CACHE is set
+    save_token(updater.credentials)
+    
+    # Only now may unchanged future scrapes short-circuit
+    FetchCache().mark_published()
+    
+    return updater
 
 
 def main():
@@ -267,11 +434,10 @@ def main():
     logger.info("="*70)
     
     try:
-        # Initialize updater
-        updater = GoogleSheetsUpdater()
-        
-        # Authenticate
-        updater.authenticate()
+        # Skip the upload entirely when the scrape step found nothing new
+        if read_run_state().get('cache_hit'):
+            logger.info("♻️ Scrape was a cache hit - sheet already up to date, skipping upload")
+            return
         
         # Read data from combined scraper output
         csv_file = 'california_resorts_combined.csv'
@@ -280,25 +446,21 @@ def main():
             logger.info("Run combined_scraper.py first to generate the data")
             return
         
-        # Prepare data
-        values = updater.prepare_data(csv_file)
-        
-        # Update sheet
-        updater.update_sheet(values)
-        
-        # Apply formatting
-        updater.format_sheet()
+        updater = upload_resort_data(csv_file)
         
         logger.info("="*70)
         logger.info("✅ GOOGLE SHEETS UPDATE COMPLETE!")
         logger.info("="*70)
         logger.info(f"Spreadsheet: https://docs.google.com/spreadsheets/d/{updater.spreadsheet_id}")
-        
+    
     except Exception as e:
         logger.error(f"❌ Failed to update Google Sheets: {e}")
         raise
 
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        METRICS.write('upload')
 
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Map Data Artifact
+Writes the combined resort data as a compact GeoJSON file for the docs/ map, so the
+map does not have to download and parse the published Google Sheets CSV or compute
+marker styles in the browser. GitHub Pages gzips JSON responses itself, so no
+precompressed copies are written.
+
+Feature properties use short keys and typed values:
+    id  OnTheSnow resort ID       sl  slug                 n   resort name
+    s   status                    s24 24h snowfall (in)    s48 48h snowfall (in)
+    b   base depth (in)           m   mid-mountain depth   sc  surface conditions
+    tt  total trails              to  open trails          tp  trails open %
+    lt  total lifts               lo  open lifts           lp  lifts open %
+    src data source               c   marker fill color    sz  marker size (px, desktop, zoom <= 6)
+
+The color and size rules mirror COLOR_SCALE / MARKER_SIZE in docs/config.js and
+getColorForPercentage / calculateMarkerSize in docs/map.js; keep them in sync.
+
+Versioning for the map's auto-refresh:
+    manifest.json       {"version": 42, "updated": ..., "full": "resorts.geojson", "deltas": [...]}
+    delta-42.json       {"version": 42, "from": 41, "upsert": [features], "remove": [keys]}
+The version only moves when a resort's data changes. resorts.geojson always holds the
+full current data; only the last DELTA_WINDOW deltas are kept, so a client further
+behind than that reloads the full file.
+"""
+
+import os
+import json
+import logging
+import pandas as pd
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger(__name__)
+
+MAP_DATA_DIR = os.path.join("docs", "data")
+MAP_DATA_FILE = "resorts.geojson"
+MANIFEST_FILE = "manifest.json"
+# Deltas kept for polling clients; older clients reload the full file
+DELTA_WINDOW = 12
+
+# Mirrors docs/config.js
+COLOR_SCALE = {
+    'closed': '#D5D8DC',
+    'veryLow': '#5398DC',
+    'low': '#8E7FDB',
+    'medium': '#C67BC4',
+    'high': '#E74C8D',
+}
+MARKER_SIZE = {'min': 12, 'max': 36}
+# Trail counts mapped to the smallest/largest marker (docs/map.js calculateMarkerSize)
+MIN_TRAILS = 7
+MAX_TRAILS = 277
+
+
+def marker_color(trails_open_pct, status):
+    """Fill color for a resort, same thresholds as getColorForPercentage in map.js"""
+    if status == 'Closed' or trails_open_pct == 0:
+        return COLOR_SCALE['closed']
+    if trails_open_pct < 10:
+        return COLOR_SCALE['veryLow']
+    if trails_open_pct < 35:
+        return COLOR_SCALE['low']
+    if trails_open_pct < 75:
+        return COLOR_SCALE['medium']
+    return COLOR_SCALE['high']
+
+
+def marker_size(total_trails):
+    """
+    Desktop marker size at zoom <= 6 (calculateMarkerSize without mobile/zoom scaling)
+    
+    The browser multiplies this by its mobile and zoom factors, which scale the
+    min/max bounds linearly, so the result matches calculateMarkerSize exactly.
+    """
+    low, high = MARKER_SIZE['min'], MARKER_SIZE['max']
+    if total_trails <= 0:
+        return float(low)
+    normalized = (total_trails - MIN_TRAILS) / (MAX_TRAILS - MIN_TRAILS)
+    return round(max(low, min(high, low + normalized * (high - low))), 2)
+
+
+def _number(value, digits=1):
+    """Typed number for JSON: int when whole, rounded float otherwise, None if missing"""
+    number = pd.to_numeric(value, errors='coerce')
+    if pd.isna(number):
+        return None
+    number = round(float(number), digits)
+    return int(number) if number.is_integer() else number
+
+
+def _text(value):
+    if value is None or pd.isna(value) or value == '':
+        return None
+    return str(value)
+
+
+def build_geojson(df, updated_at=None):
+    """
+    Build the map FeatureCollection from a combined resort DataFrame
+    
+    Resorts without coordinates are left out, as the map cannot place them.
+    
+    Returns:
+        dict: GeoJSON FeatureCollection with an 'updated' timestamp
+    """
+    updated_at = updated_at or datetime.now(ZoneInfo('America/Denver')).strftime('%Y-%m-%d %H:%M')
+    
+    def column(name, default=None):
+        return df[name] if name in df.columns else pd.Series(default, index=df.index)
+    
+    features = []
+    for row in pd.DataFrame({
+        'id': column('resort_id'),
+        'sl': column('slug'),
+        'n': column('name'),
+        's': column('status', 'Unknown'),
+        'lat': column('latitude'),
+        'lng': column('longitude'),
+        's24': column('new_snow_24h', 0),
+        's48': column('new_snow_48h', 0),
+        'b': column('base_depth', 0),
+        'm': column('mid_mtn_depth', 0),
+        'sc': column('surface_conditions'),
+        'tt': column('total_trails', 0),
+        'to': column('open_trails', 0),
+        'tp': column('trails_open_pct', 0),
+        'lt': column('total_lifts', 0),
+        'lo': column('open_lifts', 0),
+        'lp': column('lifts_open_pct', 0),
+        'src': column('source'),
+    }).itertuples(index=False):
+        lat, lng = _number(row.lat, 5), _number(row.lng, 5)
+        if lat is None or lng is None:
+            continue
+        
+        total_trails = _number(row.tt) or 0
+        trails_pct = _number(row.tp) or 0
+        status = _text(row.s) or 'Unknown'
+        
+        features.append({
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [lng, lat]},
+            'properties': {
+                'id': _number(row.id, 0),
+                'sl': _text(row.sl),
+                'n': _text(row.n),
+                's': status,
+                's24': _number(row.s24) or 0,
+                's48': _number(row.s48) or 0,
+                'b': _number(row.b) or 0,
+                'm': _number(row.m) or 0,
+                'sc': _text(row.sc),
+                'tt': total_trails,
+                'to': _number(row.to) or 0,
+                'tp': trails_pct,
+                'lt': _number(row.lt) or 0,
+                'lo': _number(row.lo) or 0,
+                'lp': _number(row.lp) or 0,
+                'src': _text(row.src),
+                'c': marker_color(trails_pct, status),
+                'sz': marker_size(total_trails),
+            },
+        })
+    
+    return {'type': 'FeatureCollection', 'updated': updated_at, 'features': features}
+
+
+def feature_key(properties):
+    """Stable resort key shared with map.js resortKey(): OnTheSnow ID, else slug, else name"""
+    if properties.get('id') is not None:
+        return str(properties['id'])
+    if properties.get('sl'):
+        return f"slug:{properties['sl']}"
+    return f"name:{properties.get('n')}"
+
+
+def diff_features(previous, current):
+    """
+    Resorts added or changed since the previous features, and keys that disappeared
+    
+    Returns:
+        tuple: (upsert list of features, remove list of keys)
+    """
+    old = {feature_key(f['properties']): f for f in previous}
+    new = {feature_key(f['properties']): f for f in current}
+    upsert = [feature for key, feature in new.items() if old.get(key) != feature]
+    remove = [key for key in old if key not in new]
+    return upsert, remove
+
+
+def _read_json_file(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _compact_json(data):
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _write_bytes_atomic(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def write_map_artifact(df, output_dir=MAP_DATA_DIR, updated_at=None, delta_window=DELTA_WINDOW):
+    """
+    Write resorts.geojson, a delta file and manifest.json
+    
+    The full file and a delta are only written when some resort changed; the
+    manifest is rewritten every run so its 'updated' time stays current.
+    
+    Returns:
+        dict: file name -> size in bytes for each file written
+    """
+    geojson = build_geojson(df, updated_at)
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, MAP_DATA_FILE)
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    
+    manifest = _read_json_file(manifest_path) or {}
+    previous = _read_json_file(path) if manifest.get('version') else None
+    version = manifest.get('version', 0)
+    deltas = manifest.get('deltas', [])
+    
+    if previous is None or previous.get('version') != version:
+        # First run or out-of-sync files: start a new delta chain from a full file
+        upsert, remove = None, None
+        deltas = []
+    else:
+        upsert, remove = diff_features(previous['features'], geojson['features'])
+    
+    files = {}
+    if upsert is None or upsert or remove:
+        version += 1
+        geojson['version'] = version
+        files[path] = _compact_json(geojson)
+        
+        if upsert is not None:
+            delta_file = f"delta-{version}.json"
+            files[os.path.join(output_dir, delta_file)] = _compact_json({
+                'version': version,
+                'from': version - 1,
+                'updated': geojson['updated'],
+                'upsert': upsert,
+                'remove': remove,
+            })
+            deltas.append({'version': version, 'file': delta_file, 'changed': len(upsert) + len(remove)})
+    
+    # Drop deltas that fell out of the window (and any left from an old chain)
+    deltas = deltas[-delta_window:]
+    keep = {d['file'] for d in deltas} | {os.path.basename(p) for p in files}
+    for name in os.listdir(output_dir):
+        if name.startswith('delta-') and name.endswith('.json') and name not in keep:
+            os.remove(os.path.join(output_dir, name))
+    
+    files[manifest_path] = _compact_json({
+        'version': version,
+        'updated': geojson['updated'],
+        'full': MAP_DATA_FILE,
+        'deltas': deltas,
+    })
+    
+    for file_path, data in files.items():
+        _write_bytes_atomic(file_path, data)
+    
+    sizes = {os.path.basename(p): len(data) for p, data in files.items()}
+    logger.info(f"✅ Map data version {version} ({len(geojson['features'])} resorts): {sizes}")
+    return sizes
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Pipeline Metrics
+Collects per-stage durations, values (e.g. HTML size) and counters during a run and
+writes them as JSON lines (appended, one event per line) and as a Prometheus textfile
+(overwritten, values of the last run) for node_exporter's textfile collector.
+
+Usage:
+    from metrics import METRICS
+    with METRICS.timer('page_load', mode='http'):
+        ...
+    METRICS.increment('resorts_parsed', len(df))
+    METRICS.write('pipeline')
+"""
+
+import os
+import json
+import functools
+import time
+import uuid
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+METRICS_DIR = os.environ.get("METRICS_DIR", ".")
+METRICS_JSONL_FILE = "metrics.jsonl"
+METRIC_PREFIX = "snow"
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _series(name, labels):
+    if not labels:
+        return name
+    body = ','.join(f'{key}="{_escape_label(value)}"' for key, value in sorted(labels.items()))
+    return f"{name}{{{body}}}"
+
+
+class Metrics:
+    """Thread-safe in-memory metrics for one pipeline run"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        """Start a new run (new run_id, no recorded events)"""
+        with self._lock:
+            self.run_id = uuid.uuid4().hex[:12]
+            self.events = []
+    
+    def _record(self, kind, name, value, labels):
+        event = {
+            'run_id': self.run_id,
+            'ts': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+            'kind': kind,
+            'name': name,
+            'value': value,
+            'labels': labels,
+        }
+        with self._lock:
+            self.events.append(event)
+    
+    def record_duration(self, name, seconds, **labels):
+        """Record a stage duration measured elsewhere"""
+        self._record('duration', name, round(seconds, 6), labels)
+    
+    @contextmanager
+    def timer(self, name, **labels):
+        """Time the enclosed block as stage `name`; failed blocks get status="error" """
+        start = time.perf_counter()
+        status = 'ok'
+        try:
+            yield
+        except BaseException:
+            status = 'error'
+            raise
+        finally:
+            self.record_duration(name, time.perf_counter() - start, status=status, **labels)
+    
+    def timed(self, name, **labels):
+        """Decorator form of timer()"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(name, **labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+    
+    def observe(self, name, value, **labels):
+        """Record a value such as a payload size (the last value per series is exported)"""
+        self._record('value', name, value, labels)
+    
+    def increment(self, name, amount=1, **labels):
+        """Add to a per-run counter"""
+        self._record('counter', name, amount, labels)
+    
+    def summary(self):
+        """
+        Aggregate the run's events per series
+        
+        Returns:
+            dict: (kind, name, labels tuple) -> {'sum', 'count', 'last'}
+        """
+        with self._lock:
+            events = list(self.events)
+        
+        series = {}
+        for event in events:
+            key = (event['kind'], event['name'], tuple(sorted(event['labels'].items())))
+            entry = series.setdefault(key, {'sum': 0, 'count': 0, 'last': None})
+            entry['sum'] += event['value']
+            entry['count'] += 1
+            entry['last'] = event['value']
+        return series
+    
+    def write_jsonl(self, path, job=None):
+        """Append every event of this run to a JSON-lines file"""
+        with self._lock:
+            events = list(self.events)
+        with open(path, 'a', encoding='utf-8') as f:
+            for event in events:
+                f.write(json.dumps(dict(event, job=job), sort_keys=True) + '\n')
+    
+    def prometheus_text(self, job):
+        """Render the run as Prometheus text exposition format (all gauges)"""
+        durations, calls, values, counters = [], [], [], {}
+        for (kind, name, labels), entry in sorted(self.summary().items()):
+            labels = dict(labels, job=job)
+            if kind == 'duration':
+                durations.append(f"{_series(f'{METRIC_PREFIX}_stage_duration_seconds', dict(labels, stage=name))} {entry['sum']:.6f}")
+                calls.append(f"{_series(f'{METRIC_PREFIX}_stage_calls', dict(labels, stage=name))} {entry['count']}")
+            elif kind == 'value':
+                values.append((name, f"{_series(f'{METRIC_PREFIX}_{name}', labels)} {entry['last']}"))
+            else:
+                counters.setdefault(name, []).append(f"{_series(f'{METRIC_PREFIX}_{name}', labels)} {entry['sum']}")
+        
+        lines = []
+        if durations:
+            lines += [f"# HELP {METRIC_PREFIX}_stage_duration_seconds Time spent in each stage during the last run",
+                      f"# TYPE {METRIC_PREFIX}_stage_duration_seconds gauge"] + durations
+            lines += [f"# HELP {METRIC_PREFIX}_stage_calls Number of times each stage ran during the last run",
+                      f"# TYPE {METRIC_PREFIX}_stage_calls gauge"] + calls
+        for name in sorted({name for name, _ in values}):
+            lines += [f"# TYPE {METRIC_PREFIX}_{name} gauge"] + [line for n, line in values if n == name]
+        for name, series_lines in sorted(counters.items()):
+            lines += [f"# TYPE {METRIC_PREFIX}_{name} gauge"] + series_lines
+        lines += [f"# TYPE {METRIC_PREFIX}_last_run_timestamp_seconds gauge",
+                  f"{_series(f'{METRIC_PREFIX}_last_run_timestamp_seconds', {'job': job})} {time.time():.0f}"]
+        return '\n'.join(lines) + '\n'
+    
+    def write_prometheus(self, path, job):
+        """Write the Prometheus textfile atomically (node_exporter may read it any time)"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus_text(job))
+        os.replace(tmp_path, path)
+    
+    def write(self, job, directory=None):
+        """
+        Write both outputs for this run; failures are logged, never raised
+        
+        Args:
+            job: Job label and textfile name, e.g. 'pipeline' -> snow_pipeline.prom
+            directory: Output directory (defaults to METRICS_DIR)
+        """
+        directory = directory or METRICS_DIR
+        try:
+            os.makedirs(directory, exist_ok=True)
+            self.write_jsonl(os.path.join(directory, METRICS_JSONL_FILE), job)
+            self.write_prometheus(os.path.join(directory, f"{METRIC_PREFIX}_{job}.prom"), job)
+            logger.info(f"📈 Wrote {len(self.events)} metric events for run {self.run_id}")
+        except OSError as e:
+            logger.warning(f"⚠️ Failed to write metrics: {e}")
+
+
+# Shared by every module in the process
+METRICS = Metrics()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Streaming __NEXT_DATA__ Extractor
+Locates the Next.js JSON payload with plain string/byte searches (no regex over the page)
+and decodes only the props.pageProps.resorts subtree, one resort object at a time.
+Everything outside that path is skipped without being turned into Python objects.
+"""
+
+import re
+import json
+
+NEXT_DATA_ID = 'id="__NEXT_DATA__"'
+SCRIPT_END = '</script>'
+RESORTS_PATH = ('props', 'pageProps', 'resorts')
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"|[{}\[\]]', re.DOTALL)
+_SCALAR = re.compile(r'[^,}\]\s]+')
+
+
+def extract_next_data(html):
+    """
+    Return the raw __NEXT_DATA__ JSON text from a page
+    
+    Args:
+        html: Page source as str or UTF-8 bytes
+    
+    Returns:
+        str: JSON text of the script tag, or None if the tag is missing
+    """
+    if isinstance(html, (bytes, bytearray, memoryview)):
+        html = bytes(html)
+        marker, close, end_tag = NEXT_DATA_ID.encode(), b'>', SCRIPT_END.encode()
+    else:
+        marker, close, end_tag = NEXT_DATA_ID, '>', SCRIPT_END
+    
+    tag_pos = html.find(marker)
+    if tag_pos == -1:
+        return None
+    start = html.find(close, tag_pos)
+    end = html.find(end_tag, start)
+    if start == -1 or end == -1:
+        return None
+    
+    text = html[start + 1:end]
+    return text.decode('utf-8') if isinstance(text, bytes) else text
+
+
+def _skip_ws(s, i):
+    return _WHITESPACE.match(s, i).end()
+
+
+def _char(s, i):
+    """s[i], or ValueError if the JSON text ends first (empty or truncated payload)"""
+    if i >= len(s):
+        raise ValueError(f"Unexpected end of JSON at offset {i}")
+    return s[i]
+
+
+def _skip_value(s, i):
+    """Return the index just past the JSON value starting at s[i]"""
+    first = _char(s, i)
+    if first not in '{[':
+        match = (_STRING if first == '"' else _SCALAR).match(s, i)
+        if match is None:
+            raise ValueError(f"Unterminated JSON value at offset {i}")
+        return match.end()
+    
+    depth = 0
+    for match in _TOKEN.finditer(s, i):
+        token = match.group()
+        if token[0] == '"':
+            continue
+        if token in '{[':
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return match.end()
+    raise ValueError(f"Unterminated JSON container at offset {i}")
+
+
+def _next_member(s, i):
+    """
+    Read the next object member starting after '{' or after a previous value
+    
+    Returns:
+        tuple: (key, value_start), or (None, index after the closing brace)
+    """
+    i = _skip_ws(s, i)
+    if _char(s, i) == ',':
+        i = _skip_ws(s, i + 1)
+    if _char(s, i) == '}':
+        return None, i + 1
+    
+    key_match = _STRING.match(s, i)
+    if key_match is None:
+        raise ValueError(f"Expected object key at offset {i}")
+    key = json.loads(key_match.group())
+    i = _skip_ws(s, key_match.end())
+    if _char(s, i) != ':':
+        raise ValueError(f"Expected ':' at offset {i}")
+    return key, _skip_ws(s, i + 1)
+
+
+def _find_member(s, i, key):
+    """Return the value offset of `key` in the object at s[i], or None"""
+    if _char(s, i) != '{':
+        return None
+    pos = i + 1
+    while True:
+        name, pos = _next_member(s, pos)
+        if name is None:
+            return None
+        if name == key:
+            return pos
+        pos = _skip_value(s, pos)
+
+
+def find_path(json_text, path=RESORTS_PATH):
+    """
+    Return the offset of the value at `path` (a tuple of keys)
+    
+    Raises KeyError if a key is missing and ValueError if the JSON is malformed or
+    ends early (empty or truncated __NEXT_DATA__).
+    """
+    pos = _skip_ws(json_text, 0)
+    for key in path:
+        pos = _find_member(json_text, pos, key)
+        if pos is None:
+            raise KeyError(f"'{'.'.join(path)}' not found in __NEXT_DATA__ (missing '{key}')")
+    return pos
+
+
+def resorts_payload(json_text):
+    """Return the raw JSON text of props.pageProps.resorts without decoding it"""
+    start = find_path(json_text)
+    return json_text[start:_skip_value(json_text, start)]
+
+
+def iter_resorts(json_text):
+    """
+    Yield (category_key, resort_json) for every resort in props.pageProps.resorts
+    
+    The resorts subtree is a dict of status categories ('1' = open, '2' = closed, ...)
+    each holding a 'data' list; only those list items are decoded.
+    """
+    s = json_text
+    pos = find_path(s)
+    if _char(s, pos) != '{':
+        raise ValueError("props.pageProps.resorts is not an object")
+    
+    pos += 1
+    while True:
+        category, pos = _next_member(s, pos)
+        if category is None:
+            return
+        if _char(s, pos) != '{':
+            pos = _skip_value(s, pos)
+            continue
+        
+        pos += 1
+        while True:
+            key, pos = _next_member(s, pos)
+            if key is None:
+                break
+            if key != 'data' or _char(s, pos) != '[':
+                pos = _skip_value(s, pos)
+                continue
+            
+            pos += 1
+            while True:
+                pos = _skip_ws(s, pos)
+                if _char(s, pos) == ',':
+                    pos = _skip_ws(s, pos + 1)
+                if _char(s, pos) == ']':
+                    pos += 1
+                    break
+                resort_json, pos = _decoder.raw_decode(s, pos)
+                yield category, resort_json
@@ -6,18 +6,23 @@ This gets ALL resort data including trails/lifts that the table scraper misses
 """
 
 import os
+import numpy as np
 import pandas as pd
 import logging
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from bs4 import BeautifulSoup
-import time
-import re
-import json
+from driver_pool import create_chrome_driver, USER_AGENT
+from page_readiness import wait_for_ready, NEXT_DATA_READY
+from next_data_stream import extract_next_data, iter_resorts, resorts_payload, NEXT_DATA_ID
+from fetch_cache import payload_hash
+from metrics import METRICS
+from debug_artifacts import DEBUG_PAGES
+from parse_strategies import parse_page, StrategyCache
 
 # Setup logging
 logging.basicConfig(
@@ -30,59 +35,266 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+def region_url(region):
+    """Build the OnTheSnow ski report URL for a region slug (e.g. 'nevada')"""
+    return f"https://www.onthesnow.com/{region}/skireport.html"
+
+
+def report_urls(regions):
+    """
+    Ski report URLs for region slugs or full URLs
+    
+    Args:
+        regions: List, or comma-separated string, of slugs ('nevada') or report URLs
+    
+    Returns:
+        list: report URLs in the given order, duplicates removed
+    """
+    if isinstance(regions, str):
+        regions = regions.split(',')
+    urls = []
+    for region in regions:
+        region = region.strip()
+        if not region:
+            continue
+        url = region if region.startswith('http') else region_url(region.strip('/').lower())
+        if url not in urls:
+            urls.append(url)
+    return urls
+
+
+def url_region(url):
+    """Extract the region slug from an OnTheSnow ski report URL"""
+    return urlparse(url).path.strip('/').split('/')[0] or 'unknown'
+
+
+DEFAULT_URL = region_url('california')
+
+# Returned by fetch_page_http when the server answers 304 Not Modified
+NOT_MODIFIED = object()
+
+# Shared keep-alive session for plain HTTP fetches (created on first use). Its
+# connection pool holds HTTP_POOL_SIZE connections per host; thread pools that
+# fetch through it (regions, resort detail pages) should not be larger.
+_http_session = None
+HTTP_POOL_SIZE = 8
+
+
+def get_http_session():
+    """Return the shared pooled HTTP session, creating it on first use"""
+    global _http_session
+    if _http_session is None:
+        session = requests.Session()
+        retries = Retry(
+            total=2,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET"]
+        )
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=retries)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({
+            "User-Agent": USER_AGENT,
+            "Accept": "text/html,application/xhtml+xml",
+            "Accept-Language": "en-US,en;q=0.9",
+        })
+        _http_session = session
+    return _http_session
+
+
+def has_next_data(html):
+    """Check whether the page contains the __NEXT_DATA__ script tag"""
+    return bool(html) and NEXT_DATA_ID in html
+
+
+def resorts_digest(html):
+    """Hash of the raw resorts payload in a page, or None if it cannot be located"""
+    json_text = extract_next_data(html)
+    if json_text is None:
+        return None
+    try:
+        return payload_hash(resorts_payload(json_text))
+    except Exception:
+        # The digest only lets unchanged pages skip work; a payload that cannot be
+        # decoded is a cache miss and the parse fallbacks decide what to do with it
+        return None
+
+
+# openFlag values counted as open: 1=Open, 5=Weekends Only (everything else is Closed)
+OPEN_FLAGS = (1, 5)
+CM_PER_INCH = 2.54
+
+# surfaceType codes as rendered in the ski report table ("Variable Conditions" under
+# the base depth). Only codes seen on a saved page are listed; others map to ''.
+SURFACE_TYPES = {
+    4: 'Machine Groomed',
+    15: 'Variable Conditions',
+    16: 'Wet Snow',
+}
+
+
+def surface_label(surface_type):
+    """Surface conditions text for a surfaceType code ('' if unknown)"""
+    return SURFACE_TYPES.get(surface_type, '')
+
+
+def resorts_to_frame(resort_jsons):
+    """
+    Convert a list of resort JSON objects into a typed DataFrame in one pass
+    
+    Equivalent to building a DataFrame from _parse_resort_json() dicts. Each resort
+    contributes one tuple of raw fields; unit conversion and status mapping are then
+    done on whole columns and the DataFrame is constructed once (inserting columns
+    one by one, or formatting "open/total" through pandas string ops, costs more than
+    the conversion itself).
+    """
+    rows = []
+    for resort_json in resort_jsons:
+        try:
+            name = resort_json.get('title')
+            if not name:
+                continue
+            snow = resort_json.get('snow') or {}
+            lifts = resort_json.get('lifts') or {}
+            runs = resort_json.get('runs') or {}
+            resort_id = resort_json.get('uuid')
+            middle = snow.get('middle') or 0
+            rows.append((
+                str(resort_id) if resort_id is not None else None,
+                resort_json.get('slug'),
+                name,
+                (resort_json.get('status') or {}).get('openFlag', 2),
+                resort_json.get('updatedAt'),
+                surface_label(resort_json.get('surfaceType')),
+                snow.get('base') or middle,
+                middle,
+                snow.get('last24') or 0,
+                snow.get('last48') or 0,
+                int(lifts.get('open') or 0),
+                int(lifts.get('total') or 0),
+                int(runs.get('open') or 0),
+                int(runs.get('total') or 0),
+            ))
+        except (AttributeError, TypeError, ValueError) as e:
+            logger.warning(f"Error parsing resort JSON: {e}")
+    
+    (ids, slugs, names, flags, updated, surfaces, base, middle, last24, last48,
+     open_lifts, total_lifts, open_trails, total_trails) = zip(*rows) if rows else [()] * 14
+    
+    def inches(values):
+        # np.rint rounds half to even, matching Python's round()
+        return np.rint(np.asarray(values, dtype=float) / CM_PER_INCH).astype(np.int64)
+    
+    def counts(values):
+        return np.asarray(values, dtype=np.int64)
+    
+    is_open = np.isin(flags, OPEN_FLAGS)
+    return pd.DataFrame({
+        'resort_id': ids,
+        'slug': slugs,
+        'name': names,
+        'status': np.where(is_open, 'Open', 'Closed'),
+        'new_snow_24h': inches(last24),
+        'new_snow_48h': inches(last48),
+        'base_depth': inches(base),
+        'trails_open': [f"{o}/{t}" for o, t in zip(open_trails, total_trails)],
+        'lifts_open': [f"{o}/{t}" for o, t in zip(open_lifts, total_lifts)],
+        'open_lifts': counts(open_lifts),
+        'total_lifts': counts(total_lifts),
+        'open_trails': counts(open_trails),
+        'total_trails': counts(total_trails),
+        # Mid-mountain depth from the listing; resort_details.py fills gaps per resort
+        'mid_mtn_depth': inches(middle),
+        # When OnTheSnow last updated the resort's report (resort_details cache key)
+        'updated_at': updated,
+        # The site only shows a surface for open resorts
+        'surface_conditions': np.where(is_open, surfaces, '').astype(object),
+    })
+
+
 class OnTheSnowJSONScraper:
     """Scrapes snow conditions from OnTheSnow.com using embedded JSON data"""
     
-    def __init__(self, headless=True):
-        self.url = "https://www.onthesnow.com/california/skireport.html"
+    def __init__(self, headless=True, use_http=True, url=None, urls=None, max_workers=4,
+                 http_timeout=20, ready_timeout=15, driver_pool=None, fetch_cache=None,
+                 strategy_cache=None):
+        # One or more region ski report URLs; they are fetched concurrently
+        self.urls = list(urls) if urls else [url or DEFAULT_URL]
+        self.url = self.urls[0]
         self.headless = headless
+        self.use_http = use_http
+        self.max_workers = max_workers
+        self.http_timeout = http_timeout
+        self.ready_timeout = ready_timeout
+        self.ready_timings = []
         self.driver = None
+        self.driver_pool = driver_pool  # Optional DriverPool shared across scrapes
+        self.fetch_modes = {}
+        self.fetch_cache = fetch_cache  # Optional FetchCache for conditional fetches
+        self.validators = {}
+        self.cache_hit = False
+        self.strategy_cache = strategy_cache  # StrategyCache; scrape() loads the default one
     
     def setup_driver(self):
         """Configure Chrome driver for Selenium"""
-        chrome_options = Options()
-        
-        if self.headless:
-            chrome_options.add_argument("--headless")
-        
-        # Essential options for CI/cloud environments
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36")
-        
-        # Initialize driver
         try:
-            self.driver = webdriver.Chrome(options=chrome_options)
+            self.driver = create_chrome_driver(self.headless)
             logger.info("Chrome driver initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize Chrome driver: {e}")
             raise
     
-    def fetch_page(self):
+    def fetch_page_http(self, url=None, conditional=False):
+        """
+        Fetch the server-rendered HTML over plain HTTP (no browser)
+        
+        With conditional=True and a fetch cache, the cached ETag/Last-Modified are
+        sent and NOT_MODIFIED is returned on a 304 response.
+        """
+        url = url or self.url
+        headers = self.fetch_cache.conditional_headers(url) if conditional and self.fetch_cache else {}
+        logger.info(f"Fetching {url} over HTTP{' (conditional)' if headers else ''}")
+        with METRICS.timer('page_load', mode='http'):
+            response = get_http_session().get(url, headers=headers, timeout=self.http_timeout)
+        
+        if response.status_code == 304:
+            logger.info(f"{url} not modified since last published run")
+            return NOT_MODIFIED
+        response.raise_for_status()
+        self.validators[url] = (response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        
+        # requests assumes ISO-8859-1 for text/html without a charset
+        if 'charset' not in response.headers.get('Content-Type', '').lower():
+            response.encoding = 'utf-8'
+        
+        html = response.text
+        METRICS.observe('html_bytes', len(html), mode='http', region=url_region(url))
+        logger.info(f"Retrieved {len(html)} bytes of HTML over HTTP")
+        return html
+    
+    def fetch_page(self, url=None, driver=None):
         """Load the page and wait for data to render"""
+        url = url or self.url
+        driver = driver or self.driver
         try:
-            logger.info(f"Loading {self.url}")
-            self.driver.get(self.url)
+            logger.info(f"Loading {url}")
+            with METRICS.timer('page_load', mode='selenium'):
+                driver.get(url)
             
-            # Wait for the page to load
+            # Wait until the data we parse is present (not a fixed sleep)
             logger.info("Waiting for page to load...")
-            wait = WebDriverWait(self.driver, 30)
-            
-            # Wait for body
-            wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            logger.info("Page body loaded")
-            
-            # Give extra time for dynamic content
-            time.sleep(5)
+            ready, seconds = wait_for_ready(driver, NEXT_DATA_READY, timeout=self.ready_timeout)
+            self.ready_timings.append({'url': url, 'ready': ready, 'seconds': round(seconds, 3)})
             
             # Get the rendered HTML
-            html = self.driver.page_source
+            html = driver.page_source
+            METRICS.observe('html_bytes', len(html), mode='selenium', region=url_region(url))
             logger.info(f"Retrieved {len(html)} bytes of HTML")
             
             return html
-            
+        
         except Exception as e:
             logger.error(f"Error fetching page: {e}")
             raise
@@ -90,44 +302,56 @@ class OnTheSnowJSONScraper:
     def parse_json_data(self, html):
         """Extract resort data from __NEXT_DATA__ JSON"""
         try:
-            # Find the __NEXT_DATA__ script tag
-            match = re.search(r'<script id="__NEXT_DATA__" type="application/json">(.*?)</script>', html, re.DOTALL)
+            # Find the __NEXT_DATA__ script tag (plain substring search, no page-wide regex)
+            json_text = extract_next_data(html)
             
-            if not match:
+            if json_text is None:
                 logger.error("Could not find __NEXT_DATA__ in HTML")
                 return []
             
-            # Parse JSON
-            data = json.loads(match.group(1))
-            resorts_data = data['props']['pageProps']['resorts']
-            
-            logger.info(f"Found {len(resorts_data)} status categories in JSON")
-            
-            # resorts_data is a dict with keys '1', '2', '3', etc. representing different status tables
-            # '1' = Open resorts
-            # '2' = Closed resorts (opening soon)
-            # etc.
-            
+            # props.pageProps.resorts is a dict with keys '1', '2', '3', etc. representing
+            # different status tables ('1' = Open, '2' = Closed/opening soon, ...).
+            # Resorts are decoded one at a time; the rest of the payload is skipped.
             all_resorts = []
+            category_counts = {}
             
-            for category_key, category_data in resorts_data.items():
-                resorts_list = category_data.get('data', [])
-                logger.info(f"Category '{category_key}': {len(resorts_list)} resorts")
-                
-                for resort_json in resorts_list:
-                    resort = self._parse_resort_json(resort_json)
-                    if resort:
-                        all_resorts.append(resort)
+            for category_key, resort_json in iter_resorts(json_text):
+                category_counts[category_key] = category_counts.get(category_key, 0) + 1
+                resort = self._parse_resort_json(resort_json)
+                if resort:
+                    all_resorts.append(resort)
+            
+            logger.info(f"Found {len(category_counts)} non-empty status categories in JSON")
+            for category_key, count in category_counts.items():
+                logger.info(f"Category '{category_key}': {count} resorts")
             
             logger.info(f"Extracted {len(all_resorts)} total resorts from JSON")
             return all_resorts
-            
+        
         except Exception as e:
             logger.error(f"Error parsing JSON data: {e}")
             import traceback
             traceback.print_exc()
             return []
     
+    def parse_json_frame(self, html):
+        """Extract resort data from __NEXT_DATA__ JSON straight into a DataFrame"""
+        json_text = extract_next_data(html)
+        if json_text is None:
+            logger.error("Could not find __NEXT_DATA__ in HTML")
+            return pd.DataFrame()
+        
+        try:
+            with METRICS.timer('json_parse'):
+                df = resorts_to_frame(resort_json for _, resort_json in iter_resorts(json_text))
+        except Exception as e:
+            logger.error(f"Error parsing JSON data: {e}")
+            return pd.DataFrame()
+        
+        METRICS.increment('resorts_parsed', len(df))
+        logger.info(f"Extracted {len(df)} total resorts from JSON")
+        return df
+    
     def _parse_resort_json(self, resort_json):
         """Parse individual resort from JSON structure"""
         try:
@@ -158,6 +382,10 @@ class OnTheSnowJSONScraper:
             if new_snow_48h:
                 new_snow_48h = round(new_snow_48h / 2.54)  # Convert cm to inches
             
+            mid_mtn_depth = snow.get('middle') or 0
+            if mid_mtn_depth:
+                mid_mtn_depth = round(mid_mtn_depth / 2.54)  # Convert cm to inches
+            
             # Lifts data
             lifts = resort_json.get('lifts', {})
             open_lifts = lifts.get('open', 0)
@@ -170,7 +398,12 @@ class OnTheSnowJSONScraper:
             total_trails = runs.get('total', 0)
             trails_open = f"{open_trails}/{total_trails}"
             
+            # OnTheSnow's stable identifiers, used as join keys downstream
+            resort_id = resort_json.get('uuid')
+            
             resort = {
+                'resort_id': str(resort_id) if resort_id is not None else None,
+                'slug': resort_json.get('slug'),
                 'name': name,
                 'status': status,
                 'new_snow_24h': int(new_snow_24h),
@@ -182,51 +415,190 @@ class OnTheSnowJSONScraper:
                 'total_lifts': int(total_lifts),
                 'open_trails': int(open_trails),
                 'total_trails': int(total_trails),
+                'mid_mtn_depth': int(mid_mtn_depth),
+                'updated_at': resort_json.get('updatedAt'),
+                'surface_conditions': surface_label(resort_json.get('surfaceType')) if status == 'Open' else '',
             }
             
             return resort
-            
+        
         except Exception as e:
             logger.warning(f"Error parsing resort JSON: {e}")
             return None
     
+    def _try_http(self, url, conditional=True):
+        """Fetch one page over HTTP; return None if Chrome is needed instead"""
+        try:
+            html = self.fetch_page_http(url, conditional=conditional)
+            if html is NOT_MODIFIED or has_next_data(html):
+                return html
+            logger.warning(f"__NEXT_DATA__ missing from HTTP response for {url}, falling back to Chrome")
+        except requests.RequestException as e:
+            logger.warning(f"HTTP fetch of {url} failed ({e}), falling back to Chrome")
+        return None
+    
+    def _fetch_browser(self, url):
+        """Load one page in Chrome, using the shared pool when one is configured"""
+        if self.driver_pool is None:
+            if self.driver is None:
+                self.setup_driver()
+            return self.fetch_page(url)
+        
+        with self.driver_pool.driver() as driver:
+            return self.fetch_page(url, driver=driver)
+    
+    def fetch_all(self):
+        """
+        Fetch every region page, concurrently over HTTP where possible
+        
+        Pages whose HTTP response lacks __NEXT_DATA__ are then loaded in Chrome:
+        concurrently across the driver pool if one is configured, otherwise one
+        at a time through a single driver.
+        
+        Returns:
+            dict: url -> HTML (or NOT_MODIFIED), in the order of self.urls
+        """
+        pages = {}
+        
+        if self.use_http:
+            workers = max(1, min(self.max_workers, len(self.urls), HTTP_POOL_SIZE))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for url, html in zip(self.urls, executor.map(self._try_http, self.urls)):
+                    if html is not None:
+                        pages[url] = html
+                        self.fetch_modes[url] = 'http-304' if html is NOT_MODIFIED else 'http'
+        
+        browser_urls = [url for url in self.urls if url not in pages]
+        if browser_urls:
+            workers = min(self.driver_pool.size, len(browser_urls)) if self.driver_pool else 1
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for url, html in zip(browser_urls, executor.map(self._fetch_browser, browser_urls)):
+                    pages[url] = html
+                    self.fetch_modes[url] = 'selenium'
+        
+        return {url: pages[url] for url in self.urls}
+    
+    def fetch_html(self, url=None):
+        """Fetch a single page over HTTP, falling back to Chrome if the JSON is missing"""
+        url = url or self.url
+        html = self._try_http(url, conditional=False) if self.use_http else None
+        if html is not None:
+            self.fetch_modes[url] = 'http'
+            return html
+        
+        self.fetch_modes[url] = 'selenium'
+        return self._fetch_browser(url)
+    
+    def _check_fetch_cache(self, pages):
+        """
+        Compare fetched pages with the fetch cache and record the new state
+        
+        Returns:
+            dict: url -> HTML for every region, or None if no region changed
+                  since the last published run
+        """
+        digests = {}
+        unchanged = 0
+        for url, html in pages.items():
+            if html is NOT_MODIFIED:
+                unchanged += 1
+                continue
+            digests[url] = resorts_digest(html)
+            if self.fetch_cache.is_unchanged(url, digests[url]):
+                unchanged += 1
+        
+        if unchanged == len(pages):
+            return None
+        
+        # Something changed: regions that answered 304 still need their HTML
+        for url, html in pages.items():
+            if html is NOT_MODIFIED:
+                pages[url] = self.fetch_html(url)
+                digests[url] = resorts_digest(pages[url])
+        
+        for url in pages:
+            etag, last_modified = self.validators.get(url, (None, None))
+            self.fetch_cache.record(url, digests[url], etag=etag, last_modified=last_modified)
+        
+        return pages
+    
+    def build_frame(self, html, url=None):
+        """Parse one region page into a DataFrame tagged with its region"""
+        url = url or self.url
+        region = url_region(url)
+        
+        try:
+            # Cached winning strategy for this page layout first (JSON normally)
+            df, strategy, tried = parse_page(html, self.strategy_cache)
+        except Exception as e:
+            DEBUG_PAGES.capture(html, region, failed=True, reason=f"{type(e).__name__}: {e}")
+            raise
+        
+        # Keep the page for debugging (always when a strategy found nothing)
+        if df.empty:
+            DEBUG_PAGES.capture(html, region, failed=True)
+        elif len(tried) > 1:
+            DEBUG_PAGES.capture(html, region, failed=True, reason=f"parsed by fallback '{strategy}'")
+        else:
+            DEBUG_PAGES.capture(html, region)
+        
+        if df.empty:
+            logger.warning(f"No resort data found for {region}! Check the page saved in {DEBUG_PAGES.root}/")
+            return pd.DataFrame()
+        
+        # Add metadata
+        df['data_fetched_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        df['source'] = 'OnTheSnow'
+        df['report_region'] = region
+        
+        logger.info(f"Successfully processed {len(df)} resorts for {region} "
+                    f"(fetched via {self.fetch_modes.get(url)}, parsed with {strategy})")
+        
+        return df
+    
     def scrape(self):
-        """Main scraping method"""
+        """Main scraping method - returns one frame covering every region URL"""
         try:
-            self.setup_driver()
-            html = self.fetch_page()
+            pages = self.fetch_all()
             
-            # Save HTML for debugging
-            with open('onthesnow_california_page_rendered.html', 'w', encoding='utf-8') as f:
-                f.write(html)
-            logger.info("Saved rendered HTML to onthesnow_california_page_rendered.html")
+            if self.fetch_cache is not None:
+                pages = self._check_fetch_cache(pages)
+                if pages is None:
+                    self.cache_hit = True
+                    logger.info("♻️ OnTheSnow data unchanged since last published run - skipping parse")
+                    df = pd.DataFrame()
+                    df.attrs['cache_hit'] = True
+                    return df
             
-            resorts = self.parse_json_data(html)
+            # Winning parse strategy per page layout, shared by all regions of the run
+            if self.strategy_cache is None:
+                self.strategy_cache = StrategyCache()
+            frames = [self.build_frame(html, url) for url, html in pages.items()]
+            frames = [df for df in frames if not df.empty]
+            self.strategy_cache.save()
             
-            if not resorts:
-                logger.warning("No resort data found! Check HTML file for structure")
+            if not frames:
                 return pd.DataFrame()
             
-            # Convert to DataFrame
-            df = pd.DataFrame(resorts)
-            
-            # Add metadata
-            df['data_fetched_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            df['source'] = 'OnTheSnow'
+            df = pd.concat(frames, ignore_index=True)
+            if len(frames) > 1:
+                logger.info(f"Combined {len(df)} resorts from {len(frames)} regions")
             
-            logger.info(f"Successfully processed {len(df)} resorts")
+            if self.fetch_cache is not None:
+                self.fetch_cache.save()
             
             return df
-            
+        
         finally:
             self.cleanup()
     
     def cleanup(self):
-        """Clean up resources"""
+        """Clean up resources (pooled drivers stay warm in their pool)"""
         if self.driver:
             try:
                 self.driver.quit()
                 logger.info("Chrome driver closed")
+                self.driver = None
             except Exception as e:
                 logger.warning(f"Error closing driver: {e}")
 
@@ -260,7 +632,7 @@ def main():
         logger.info(f"\n🎿 {len(open_resorts)} resorts currently OPEN:")
         for _, resort in open_resorts.iterrows():
             logger.info(f"  - {resort['name']}: {resort['lifts_open']} lifts, {resort['trails_open']} trails")
-        
+    
     except Exception as e:
         logger.error(f"Scraping failed: {e}")
         import traceback
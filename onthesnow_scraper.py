@@ -9,14 +9,12 @@ import os
 import pandas as pd
 import logging
 from datetime import datetime
-from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
-import time
+from bs4 import BeautifulSoup, SoupStrainer
+from driver_pool import create_chrome_driver
+from page_readiness import wait_for_ready, RESORT_TABLE_READY
+from metrics import METRICS
+from debug_artifacts import DEBUG_PAGES
 import re
 
 # Setup logging
@@ -30,55 +28,80 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+try:
+    import lxml.html as lxml_html
+    from lxml import etree
+except ImportError:
+    lxml_html = None
+
+SOUP_PARSER = 'lxml' if lxml_html is not None else 'html.parser'
+
+
+def _resort_class(css_class):
+    return bool(css_class) and 'resort' in css_class.lower()
+
+
+RESORT_DIV_STRAINER = SoupStrainer('div', class_=_resort_class)
+
+if lxml_html is not None:
+    # Same matches as the BeautifulSoup class filters (substring of the class attribute)
+    TABLES = etree.XPath('//table')
+    TABLE_ROWS = etree.XPath('.//tr')
+    ROW_CELLS = etree.XPath('.//td | .//th')
+    NAME_SPAN = etree.XPath('.//span[contains(@class, "styles_h4")]')
+    H4_SPAN = etree.XPath('.//span[contains(@class, "h4")]')
+
+
+def _stripped_text(element):
+    """BeautifulSoup get_text(strip=True) for an lxml element (comments excluded)"""
+    return ''.join(text.strip() for text in element.itertext())
+
+
+def _direct_text(element):
+    """Text directly inside an element, not in its children (comment text included, as in bs4)"""
+    parts = [element.text or '']
+    for child in element:
+        if isinstance(child, etree._Comment):
+            parts.append(child.text or '')
+        parts.append(child.tail or '')
+    return ''.join(parts)
+
+
 class OnTheSnowScraper:
     """Scrapes snow conditions from OnTheSnow.com for California"""
     
-    def __init__(self, headless=True):
+    def __init__(self, headless=True, ready_timeout=15, driver_pool=None):
         self.url = "https://www.onthesnow.com/california/skireport.html"
         self.headless = headless
+        self.ready_timeout = ready_timeout
+        self.ready_timings = []
         self.driver = None
+        self.driver_pool = driver_pool  # Optional DriverPool shared across scrapes
     
     def setup_driver(self):
         """Configure Chrome driver for Selenium"""
-        chrome_options = Options()
-        
-        if self.headless:
-            chrome_options.add_argument("--headless")
-        
-        # Essential options for CI/cloud environments
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36")
-        
-        # Initialize driver
         try:
-            self.driver = webdriver.Chrome(options=chrome_options)
+            self.driver = create_chrome_driver(self.headless)
             logger.info("Chrome driver initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize Chrome driver: {e}")
             raise
     
-    def fetch_page(self):
+    def fetch_page(self, driver=None):
         """Load the page and wait for data to render"""
+        driver = driver or self.driver
         try:
             logger.info(f"Loading {self.url}")
-            self.driver.get(self.url)
+            with METRICS.timer('page_load', mode='selenium', scraper='table'):
+                driver.get(self.url)
             
-            # Wait for the page to load
+            # Wait until the data we parse is present (not a fixed sleep)
             logger.info("Waiting for page to load...")
-            wait = WebDriverWait(self.driver, 30)
-            
-            # Wait for body
-            wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            logger.info("Page body loaded")
-            
-            # Give extra time for dynamic content
-            time.sleep(5)
+            ready, seconds = wait_for_ready(driver, RESORT_TABLE_READY, timeout=self.ready_timeout)
+            self.ready_timings.append({'url': self.url, 'ready': ready, 'seconds': round(seconds, 3)})
             
             # Get the rendered HTML
-            html = self.driver.page_source
+            html = driver.page_source
             logger.info(f"Retrieved {len(html)} bytes of HTML")
             
             return html
@@ -89,17 +112,77 @@ class OnTheSnowScraper:
     
     def parse_snow_data(self, html):
         """Parse the HTML to extract resort data"""
-        soup = BeautifulSoup(html, 'html.parser')
-        
-        resorts = []
-        
         # OnTheSnow typically uses tables for resort data
         # Look for table rows with resort information
         
         # Strategy 1: Find table with resort data
+        resorts = self.parse_tables(html)
+        
+        # Strategy 2: Look for div-based layout (if no tables)
+        if not resorts:
+            logger.info("No table data found, looking for div structure")
+            resorts = self.parse_divs(html)
+        
+        logger.info(f"Extracted {len(resorts)} resorts")
+        
+        return resorts
+    
+    def parse_tables(self, html):
+        """Resort dicts from the page's resort tables"""
+        if lxml_html is not None:
+            return self._parse_tables_lxml(html)
+        return self._parse_tables_soup(html)
+    
+    def parse_divs(self, html):
+        """Resort dicts from divs whose class mentions 'resort'"""
+        # OnTheSnow might use divs with specific classes; only those subtrees are built
+        resort_divs = BeautifulSoup(html, SOUP_PARSER, parse_only=RESORT_DIV_STRAINER).find_all(
+            'div', class_=_resort_class)
+        
+        resorts = []
+        for div in resort_divs:
+            resort_data = self._extract_resort_from_div(div)
+            if resort_data:
+                resorts.append(resort_data)
+        return resorts
+    
+    def frame_from_resorts(self, resorts):
+        """Cleaned DataFrame (numeric snow, open/total counts) from resort dicts"""
+        if not resorts:
+            return pd.DataFrame()
+        return self._clean_data(pd.DataFrame(resorts))
+    
+    def _parse_tables_lxml(self, html):
+        """Resorts from the page tables, parsed by libxml2 with precompiled XPath selectors"""
+        try:
+            doc = lxml_html.document_fromstring(html)
+        except (etree.ParserError, ValueError):
+            return []
+        
+        tables = TABLES(doc)
+        logger.info(f"Found {len(tables)} tables")
+        
+        resorts = []
+        for table in tables:
+            rows = TABLE_ROWS(table)
+            logger.info(f"Table has {len(rows)} rows")
+            
+            for row in rows:
+                cells = ROW_CELLS(row)
+                if len(cells) >= 3:  # Enough data for a resort
+                    resort_data = self._extract_resort_from_lxml_row(cells)
+                    if resort_data:
+                        resorts.append(resort_data)
+        return resorts
+    
+    def _parse_tables_soup(self, html):
+        """Resorts from the page tables with BeautifulSoup (used when lxml is not installed)"""
+        soup = BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer('table'))
+        
         tables = soup.find_all('table')
         logger.info(f"Found {len(tables)} tables")
         
+        resorts = []
         for table in tables:
             rows = table.find_all('tr')
             logger.info(f"Table has {len(rows)} rows")
@@ -110,20 +193,6 @@ class OnTheSnowScraper:
                     resort_data = self._extract_resort_from_row(cells, row)
                     if resort_data:
                         resorts.append(resort_data)
-        
-        # Strategy 2: Look for div-based layout (if no tables)
-        if not resorts:
-            logger.info("No table data found, looking for div structure")
-            # OnTheSnow might use divs with specific classes
-            resort_divs = soup.find_all('div', class_=lambda x: x and 'resort' in x.lower())
-            
-            for div in resort_divs:
-                resort_data = self._extract_resort_from_div(div)
-                if resort_data:
-                    resorts.append(resort_data)
-        
-        logger.info(f"Extracted {len(resorts)} resorts")
-        
         return resorts
     
     def _extract_resort_from_row(self, cells, row):
@@ -133,92 +202,121 @@ class OnTheSnowScraper:
                 return None
             
             # First cell contains resort name
-            first_cell = cells[0]
-            
             # Find the resort name span (class="h4 styles_h4__x3zzi")
-            name_span = first_cell.find('span', class_=lambda x: x and 'h4' in x and 'styles_h4' in x)
+            name_span = cells[0].find('span', class_=lambda x: x and 'h4' in x and 'styles_h4' in x)
             if not name_span:
                 return None
             
-            name = name_span.get_text(strip=True)
-            
-            # Filter out header rows
-            if not name or len(name) < 3:
-                return None
-            if name.lower() in ['resort', 'name', 'location', 'open', 'closed', 'resort name']:
-                return None
+            columns = None
+            if len(cells) >= 6:
+                columns = []
+                for cell in cells[1:6]:
+                    span = cell.find('span', class_=lambda x: x and 'h4' in x)
+                    if span is None:
+                        columns.append(None)
+                        continue
+                    # Get only direct text, not from child elements
+                    direct_text = ''.join([str(c) for c in span.contents if isinstance(c, str)])
+                    columns.append((direct_text, span.get_text(strip=True)))
             
-            resort = {'name': name}
+            return self._build_resort(name_span.get_text(strip=True), columns)
             
-            # Check table type by counting cells
-            # Open table: 6 cols (name, 24h, 3day, base, trails, lifts)
-            # Closed table: 2 cols (name, opening date)
+        except Exception as e:
+            logger.debug(f"Error parsing row: {e}")
+            return None
+    
+    def _extract_resort_from_lxml_row(self, cells):
+        """Same as _extract_resort_from_row, for lxml elements"""
+        try:
+            name_spans = NAME_SPAN(cells[0])
+            if not name_spans:
+                return None
             
+            columns = None
             if len(cells) >= 6:
-                # OPEN RESORT - has full data
-                resort['status'] = 'Open'
-                
-                # Column 1: 24h snowfall
-                snow_24h_span = cells[1].find('span', class_=lambda x: x and 'h4' in x)
-                resort['new_snow_24h'] = self._parse_measurement(snow_24h_span.get_text(strip=True)) if snow_24h_span else 0
-                
-                # Column 2: 3-day forecast (use as 48h)
-                snow_forecast_span = cells[2].find('span', class_=lambda x: x and 'h4' in x)
-                resort['new_snow_48h'] = self._parse_measurement(snow_forecast_span.get_text(strip=True)) if snow_forecast_span else 0
-                
-                # Column 3: Base depth
-                base_span = cells[3].find('span', class_=lambda x: x and 'h4' in x)
-                resort['base_depth'] = self._parse_measurement(base_span.get_text(strip=True)) if base_span else 0
-                
-                # Column 4: Trails open (format: "4/140")
-                # Cell structure: <span class="h4">4/140<div class="small">3% Open</div></span>
-                # We only want "4/140", not the nested div text
-                trails_span = cells[4].find('span', class_=lambda x: x and 'h4' in x)
-                if trails_span:
-                    # Get only direct text, not from child elements
-                    # Use .contents to filter out nested divs
-                    direct_text = ''.join([str(c) for c in trails_span.contents if isinstance(c, str)])
-                    trails_text = direct_text.strip().rstrip('-')
-                    # If empty, try the first text node
-                    if not trails_text or '/' not in trails_text:
-                        all_text = trails_span.get_text(strip=True)
-                        # Extract just the X/Y part before any letters
-                        match = re.match(r'(\d+/\d+)', all_text)
-                        trails_text = match.group(1) if match else '0/0'
-                else:
-                    trails_text = '0/0'
-                resort['trails_open'] = trails_text
-                
-                # Column 5: Lifts open (format: "4/21")
-                lifts_span = cells[5].find('span', class_=lambda x: x and 'h4' in x)
-                if lifts_span:
-                    # Get only direct text, not from child elements
-                    direct_text = ''.join([str(c) for c in lifts_span.contents if isinstance(c, str)])
-                    lifts_text = direct_text.strip().rstrip('-')
-                    # If empty, extract X/Y pattern
-                    if not lifts_text or '/' not in lifts_text:
-                        all_text = lifts_span.get_text(strip=True)
-                        match = re.match(r'(\d+/\d+)', all_text)
-                        lifts_text = match.group(1) if match else '0/0'
-                else:
-                    lifts_text = '0/0'
-                resort['lifts_open'] = lifts_text
-                
-            else:
-                # CLOSED RESORT - just name and opening date
-                resort['status'] = 'Closed'
-                resort['new_snow_24h'] = 0
-                resort['new_snow_48h'] = 0
-                resort['base_depth'] = 0
-                resort['trails_open'] = '0/0'
-                resort['lifts_open'] = '0/0'
+                columns = []
+                for cell in cells[1:6]:
+                    spans = H4_SPAN(cell)
+                    if not spans:
+                        columns.append(None)
+                        continue
+                    columns.append((_direct_text(spans[0]), _stripped_text(spans[0])))
             
-            return resort
+            return self._build_resort(_stripped_text(name_spans[0]), columns)
             
         except Exception as e:
             logger.debug(f"Error parsing row: {e}")
             return None
     
+    def _build_resort(self, name, columns):
+        """
+        Build a resort record from a table row's text
+        
+        Args:
+            name: Text of the resort name span
+            columns: (direct text, full text) of the h4 span in each of the five data
+                     cells (None where a cell has none), or None for closed-resort rows
+        
+        Returns:
+            dict or None: resort data, None for header rows
+        """
+        # Filter out header rows
+        if not name or len(name) < 3:
+            return None
+        if name.lower() in ['resort', 'name', 'location', 'open', 'closed', 'resort name']:
+            return None
+        
+        resort = {'name': name}
+        
+        # Check table type by counting cells
+        # Open table: 6 cols (name, 24h, 3day, base, trails, lifts)
+        # Closed table: 2 cols (name, opening date)
+        
+        if columns is not None:
+            # OPEN RESORT - has full data
+            resort['status'] = 'Open'
+            snow_24h, snow_forecast, base, trails, lifts = columns
+            
+            # Column 1: 24h snowfall
+            resort['new_snow_24h'] = self._parse_measurement(snow_24h[1]) if snow_24h else 0
+            
+            # Column 2: 3-day forecast (use as 48h)
+            resort['new_snow_48h'] = self._parse_measurement(snow_forecast[1]) if snow_forecast else 0
+            
+            # Column 3: Base depth
+            resort['base_depth'] = self._parse_measurement(base[1]) if base else 0
+            
+            # Column 4: Trails open (format: "4/140")
+            # Cell structure: <span class="h4">4/140<div class="small">3% Open</div></span>
+            # We only want "4/140", not the nested div text
+            resort['trails_open'] = self._parse_count(trails)
+            
+            # Column 5: Lifts open (format: "4/21")
+            resort['lifts_open'] = self._parse_count(lifts)
+            
+        else:
+            # CLOSED RESORT - just name and opening date
+            resort['status'] = 'Closed'
+            resort['new_snow_24h'] = 0
+            resort['new_snow_48h'] = 0
+            resort['base_depth'] = 0
+            resort['trails_open'] = '0/0'
+            resort['lifts_open'] = '0/0'
+        
+        return resort
+    
+    def _parse_count(self, texts):
+        """'open/total' from a span's (direct text, full text), e.g. '4/140'"""
+        if not texts:
+            return '0/0'
+        direct_text, all_text = texts
+        count_text = direct_text.strip().rstrip('-')
+        # If empty, extract just the X/Y part before any letters
+        if not count_text or '/' not in count_text:
+            match = re.match(r'(\d+/\d+)', all_text)
+            count_text = match.group(1) if match else '0/0'
+        return count_text
+    
     def _extract_resort_from_div(self, div):
         """Extract resort data from div container"""
         try:
@@ -279,30 +377,33 @@ class OnTheSnowScraper:
     def scrape(self):
         """Main scraping method"""
         try:
-            self.setup_driver()
-            html = self.fetch_page()
+            if self.driver_pool is None:
+                self.setup_driver()
+                html = self.fetch_page()
+            else:
+                with self.driver_pool.driver() as driver:
+                    html = self.fetch_page(driver=driver)
             
-            # Save HTML for debugging
-            with open('onthesnow_california_page_rendered.html', 'w', encoding='utf-8') as f:
-                f.write(html)
-            logger.info("Saved rendered HTML to onthesnow_california_page_rendered.html")
+            try:
+                resorts = self.parse_snow_data(html)
+            except Exception as e:
+                DEBUG_PAGES.capture(html, 'california', failed=True, reason=f"{type(e).__name__}: {e}")
+                raise
             
-            resorts = self.parse_snow_data(html)
+            # Keep the page for debugging (always when nothing could be parsed)
+            DEBUG_PAGES.capture(html, 'california', failed=not resorts)
             
             if not resorts:
-                logger.warning("No resort data found! Check HTML file for structure")
+                logger.warning(f"No resort data found! Check the page saved in {DEBUG_PAGES.root}/")
                 return pd.DataFrame()
             
-            # Convert to DataFrame
-            df = pd.DataFrame(resorts)
+            # Convert to a cleaned DataFrame
+            df = self.frame_from_resorts(resorts)
             
             # Add metadata
             df['data_fetched_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             df['source'] = 'OnTheSnow'
             
-            # Clean up data
-            df = self._clean_data(df)
-            
             return df
             
         finally:
@@ -340,11 +441,12 @@ class OnTheSnowScraper:
         return df
     
     def cleanup(self):
-        """Clean up resources"""
+        """Clean up resources (pooled drivers stay warm in their pool)"""
         if self.driver:
             try:
                 self.driver.quit()
                 logger.info("Chrome driver closed")
+                self.driver = None
             except Exception as e:
                 logger.warning(f"Error closing driver: {e}")
 
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Page Readiness Detection
+Waits until the data we parse is present in the page instead of sleeping a fixed time
+Used by both OnTheSnow scrapers after driver.get()
+"""
+
+import time
+import logging
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
+from metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+# The page is ready as soon as ANY locator in the list matches
+NEXT_DATA_READY = [(By.ID, "__NEXT_DATA__")]
+RESORT_TABLE_READY = [(By.CSS_SELECTOR, "table tr td")]
+
+
+def wait_for_ready(driver, locators, timeout=15, poll_frequency=0.1):
+    """
+    Wait until any of the locators is present in the page
+    
+    Args:
+        driver: Selenium WebDriver that has already loaded the page
+        locators: List of (By, value) tuples, any one of which means "ready"
+        timeout: Deadline in seconds before giving up
+        poll_frequency: Seconds between checks
+    
+    Returns:
+        tuple: (ready, seconds) - whether the page became ready and how long it took
+    """
+    start = time.monotonic()
+    
+    def any_present(d):
+        return any(d.find_elements(by, value) for by, value in locators)
+    
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=poll_frequency).until(any_present)
+        ready = True
+    except TimeoutException:
+        ready = False
+    
+    elapsed = time.monotonic() - start
+    METRICS.record_duration('readiness_wait', elapsed, ready=ready)
+    if ready:
+        logger.info(f"Page ready after {elapsed:.2f}s")
+    else:
+        logger.warning(f"Page not ready after {elapsed:.1f}s deadline, using HTML as-is")
+    
+    return ready, elapsed
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Parse Strategy Registry
+The OnTheSnow page can be parsed three ways: the __NEXT_DATA__ JSON (full data),
+the rendered resort tables, or resort-like divs. Each page is fingerprinted cheaply
+(key shape of the resort JSON, column counts of the tables) and parsed first with the
+strategy that last worked for that fingerprint, so a known layout is parsed exactly once
+and a markup change falls back to the next strategy instead of returning zero resorts.
+
+    .parse_strategy_cache.json      # fingerprint -> winning strategy, resorts, last used
+"""
+
+import re
+import json
+import logging
+import pandas as pd
+from datetime import datetime
+from next_data_stream import extract_next_data, iter_resorts
+from fetch_cache import payload_hash, read_json, write_json_atomic
+from metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+PARSE_STRATEGY_FILE = ".parse_strategy_cache.json"
+# Fingerprints not seen for this long are dropped from the cache
+FINGERPRINT_MAX_AGE_DAYS = 90
+
+_FIRST_BODY_ROW = re.compile(r'<tbody[^>]*>\s*<tr\b(.*?)</tr>', re.DOTALL | re.IGNORECASE)
+_CELL = re.compile(r'<t[dh]\b', re.IGNORECASE)
+
+
+def page_shape(html):
+    """
+    Cheap structural summary of a page (no HTML or full JSON parse)
+    
+    Returns:
+        dict: 'json' -> sorted keys of the first resort object (None without
+              __NEXT_DATA__, [] without resorts), 'tables' -> cell count of the first
+              body row of each table
+    """
+    json_shape = None
+    json_text = extract_next_data(html)
+    if json_text is not None:
+        json_shape = []
+        try:
+            for _, resort_json in iter_resorts(json_text):
+                json_shape = sorted(resort_json) if isinstance(resort_json, dict) else []
+                break
+        except (KeyError, ValueError):
+            pass
+    
+    if isinstance(html, bytes):
+        html = html.decode('utf-8', errors='replace')
+    tables = [len(_CELL.findall(row)) for row in _FIRST_BODY_ROW.findall(html)]
+    return {'json': json_shape, 'tables': tables}
+
+
+def fingerprint(shape):
+    """Short stable hash of a page_shape()"""
+    return payload_hash(json.dumps(shape, sort_keys=True))[:16]
+
+
+def parse_json(html):
+    """__NEXT_DATA__ resorts (ids, slugs, trail and lift counts)"""
+    from onthesnow_json_scraper import OnTheSnowJSONScraper
+    return OnTheSnowJSONScraper().parse_json_frame(html)
+
+
+def parse_table(html):
+    """Rendered resort tables (names, snow and open/total counts, no ids)"""
+    from onthesnow_scraper import OnTheSnowScraper
+    scraper = OnTheSnowScraper()
+    return scraper.frame_from_resorts(scraper.parse_tables(html))
+
+
+def parse_div(html):
+    """Resort-like div blocks (last resort: names and rough measurements)"""
+    from onthesnow_scraper import OnTheSnowScraper
+    scraper = OnTheSnowScraper()
+    return scraper.frame_from_resorts(scraper.parse_divs(html))
+
+
+# Default order, best data first
+STRATEGIES = {
+    'json': parse_json,
+    'table': parse_table,
+    'div': parse_div,
+}
+
+
+def applicable_strategies(shape):
+    """Strategies that can find anything on a page of this shape, in default order"""
+    names = []
+    if shape['json']:
+        names.append('json')
+    if shape['tables']:
+        names.append('table')
+    names.append('div')
+    return names
+
+
+class StrategyCache:
+    """Winning parse strategy per page fingerprint, persisted between runs"""
+    
+    def __init__(self, path=PARSE_STRATEGY_FILE):
+        self.path = path
+        self.entries = read_json(path)
+        self.dirty = False
+    
+    def winner(self, key):
+        """Strategy that last parsed pages with this fingerprint, or None"""
+        entry = self.entries.get(key)
+        return entry['strategy'] if entry and entry.get('strategy') in STRATEGIES else None
+    
+    def record(self, key, strategy, resorts, shape):
+        """Remember the strategy that parsed a page"""
+        self.entries[key] = {
+            'strategy': strategy,
+            'resorts': resorts,
+            'shape': shape,
+            'last_used': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        self.dirty = True
+    
+    def save(self):
+        """Write the cache if it changed, dropping fingerprints unused for a long time"""
+        if not self.dirty:
+            return
+        cutoff = (pd.Timestamp.now() - pd.Timedelta(days=FINGERPRINT_MAX_AGE_DAYS)).strftime('%Y-%m-%d %H:%M:%S')
+        entries = {key: entry for key, entry in self.entries.items() if entry.get('last_used', '') >= cutoff}
+        try:
+            write_json_atomic(self.path, entries)
+            self.dirty = False
+        except OSError as e:
+            logger.warning(f"⚠️ Failed to save parse strategy cache: {e}")
+
+
+def parse_page(html, cache=None):
+    """
+    Parse a page with the cached winner for its fingerprint, falling back in order
+    
+    A strategy that finds no resorts counts as a mismatch; the next applicable one is
+    tried. Only mismatches cost a second parse.
+    
+    Args:
+        html: Page source
+        cache: Optional StrategyCache (updated in memory; call save() afterwards)
+    
+    Returns:
+        tuple: (DataFrame, strategy name or None, list of strategies tried)
+    """
+    shape = page_shape(html)
+    key = fingerprint(shape)
+    order = applicable_strategies(shape)
+    
+    cached = cache.winner(key) if cache is not None else None
+    if cached:
+        order = [cached] + [name for name in order if name != cached]
+    elif cache is not None:
+        logger.info(f"New page fingerprint {key} (tables: {shape['tables']}) - trying {', '.join(order)}")
+    
+    tried = []
+    for name in order:
+        tried.append(name)
+        with METRICS.timer('parse_strategy', strategy=name):
+            df = STRATEGIES[name](html)
+        if not df.empty:
+            if len(tried) > 1:
+                logger.warning(f"⚠️ Parsed with '{name}' after {', '.join(tried[:-1])} found no resorts "
+                               f"(fingerprint {key})")
+            if cache is not None:
+                cache.record(key, name, len(df), shape)
+            return df, name, tried
+        METRICS.increment('parse_strategy_misses', strategy=name)
+    
+    logger.error(f"❌ No parse strategy found resorts (fingerprint {key}, tried {', '.join(tried)})")
+    return pd.DataFrame(), None, tried
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Offline Replay / Backfill
+Re-parses saved OnTheSnow pages (CI *_rendered.html artifacts or older archives)
+across a process pool and stores them as timestamped snapshots in the history store,
+without any network access.
+
+Inputs may be directories (searched recursively), .zip files, or .tar/.tar.gz/.tgz
+archives holding .html or .html.gz pages. Each page is timestamped with the
+'@serverUpdate' value in its __NEXT_DATA__, or the file's modification time.
+
+Usage:
+    python replay_archive.py saved_pages/ update-logs-412.zip --workers 8
+    python replay_archive.py pages-2024.tar.gz --history-dir history --dry-run
+"""
+
+import os
+import sys
+import gzip
+import json
+import time
+import logging
+import zipfile
+import tarfile
+import argparse
+import pandas as pd
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from next_data_stream import extract_next_data, find_path
+from snapshot_store import SnapshotStore, HISTORY_DIR
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler("replay_archive.log"),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger(__name__)
+
+PAGE_SUFFIXES = ('.html', '.htm', '.html.gz', '.htm.gz')
+SERVER_UPDATE_PATH = ('props', 'pageProps', '@serverUpdate')
+REGION_PATH = ('props', 'pageProps', 'pathInfo')
+
+_decoder = json.JSONDecoder()
+
+
+def is_page(name):
+    return name.lower().endswith(PAGE_SUFFIXES)
+
+
+def iter_pages(source):
+    """
+    Yield (name, raw bytes, mtime) for every saved page in a directory or archive
+    
+    Archives are read sequentially here so compressed tarballs are decoded once.
+    """
+    if os.path.isdir(source):
+        for root, _, files in os.walk(source):
+            for file_name in sorted(files):
+                if is_page(file_name):
+                    path = os.path.join(root, file_name)
+                    with open(path, 'rb') as f:
+                        yield path, f.read(), os.path.getmtime(path)
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and is_page(info.filename):
+                    yield f"{source}:{info.filename}", archive.read(info), datetime(*info.date_time).timestamp()
+    elif tarfile.is_tarfile(source):
+        with tarfile.open(source, 'r:*') as archive:
+            for member in archive:
+                if member.isfile() and is_page(member.name):
+                    yield f"{source}:{member.name}", archive.extractfile(member).read(), member.mtime
+    elif is_page(source):
+        with open(source, 'rb') as f:
+            yield source, f.read(), os.path.getmtime(source)
+    else:
+        logger.warning(f"⚠️ Skipping {source}: not a directory, archive or HTML page")
+
+
+def _value_at(json_text, path):
+    try:
+        return _decoder.raw_decode(json_text, find_path(json_text, path))[0]
+    except (KeyError, ValueError):
+        return None
+
+
+def snapshot_time(server_update, mtime):
+    """
+    When a saved page was scraped: its '@serverUpdate', else the file mtime
+    
+    Returned as naive local time, like data_fetched_at in live scrapes.
+    """
+    taken_at = pd.to_datetime(server_update, errors='coerce', utc=True) if server_update else pd.NaT
+    if pd.isna(taken_at):
+        taken_at = pd.Timestamp(mtime, unit='s', tz='UTC')
+    return taken_at.tz_convert(datetime.now().astimezone().tzinfo).tz_localize(None)
+
+
+def _init_worker():
+    # Worker processes only report problems; the parent logs progress
+    logging.getLogger().setLevel(logging.WARNING)
+
+
+def parse_page(name, data, mtime):
+    """
+    Parse and enrich one saved page (runs in a worker process)
+    
+    Returns:
+        tuple: (name, snapshot time, DataFrame or None, error message or None)
+    """
+    from onthesnow_json_scraper import OnTheSnowJSONScraper
+    from combined_scraper import add_resort_data
+    
+    try:
+        if data[:2] == b'\x1f\x8b':
+            data = gzip.decompress(data)
+        html = data.decode('utf-8', errors='replace')
+        
+        json_text = extract_next_data(html)
+        if json_text is None:
+            return name, None, None, "no __NEXT_DATA__"
+        
+        taken_at = snapshot_time(_value_at(json_text, SERVER_UPDATE_PATH), mtime)
+        
+        df = OnTheSnowJSONScraper().parse_json_frame(html)
+        if df.empty:
+            return name, taken_at, None, "no resorts in page"
+        
+        path_info = _value_at(json_text, REGION_PATH) or {}
+        df['data_fetched_at'] = taken_at.strftime('%Y-%m-%d %H:%M:%S')
+        df['source'] = 'OnTheSnow'
+        df['report_region'] = path_info.get('slug') or 'unknown'
+        return name, taken_at, add_resort_data(df), None
+    
+    except Exception as e:
+        return name, None, None, f"{type(e).__name__}: {e}"
+
+
+def combine_snapshot(frames):
+    """Combine region frames that share a timestamp the way combine_resort_data does"""
+    from combined_scraper import resort_keys, add_missing_major_resorts
+    
+    df = pd.concat(frames, ignore_index=True)
+    df = df[~resort_keys(df).duplicated(keep='first')]
+    df = add_missing_major_resorts(df)
+    return df.sort_values('name').reset_index(drop=True)
+
+
+def replay(sources, history_dir=HISTORY_DIR, workers=None, dry_run=False):
+    """
+    Parse every saved page in `sources` in parallel and store the snapshots
+    
+    Args:
+        sources: Directories, archives or page files
+        history_dir: SnapshotStore root
+        workers: Worker processes (defaults to the CPU count)
+        dry_run: Parse only, do not write snapshots
+    
+    Returns:
+        dict: counts of pages parsed/failed and snapshots written
+    """
+    workers = workers or os.cpu_count() or 1
+    by_time = {}
+    failed = 0
+    parsed = 0
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        pending = set()
+        # Bound the number of pages held in memory while workers catch up
+        for source in sources:
+            for name, data, mtime in iter_pages(source):
+                pending.add(pool.submit(parse_page, name, data, mtime))
+                if len(pending) >= workers * 4:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        parsed, failed = _collect(future, by_time, parsed, failed)
+        for future in pending:
+            parsed, failed = _collect(future, by_time, parsed, failed)
+    
+    logger.info(f"Parsed {parsed} pages into {len(by_time)} snapshots ({failed} failed)")
+    
+    written = []
+    if by_time and not dry_run:
+        snapshots = [(combine_snapshot(by_time[t]), t) for t in sorted(by_time)]
+        written = SnapshotStore(history_dir).append_many(snapshots)
+    
+    return {'pages': parsed, 'failed': failed, 'snapshots': len(by_time), 'written': len(written)}
+
+
+def _collect(future, by_time, parsed, failed):
+    name, taken_at, df, error = future.result()
+    if error:
+        logger.warning(f"⚠️ {name}: {error}")
+        return parsed, failed + 1
+    by_time.setdefault(taken_at.floor('s'), []).append(df)
+    return parsed + 1, failed
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Backfill the snapshot history from saved OnTheSnow pages")
+    parser.add_argument('sources', nargs='+', help="Directories, .zip or .tar(.gz) archives, or .html files")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--history-dir', default=HISTORY_DIR, help="Snapshot store directory")
+    parser.add_argument('--dry-run', action='store_true', help="Parse the pages but do not store snapshots")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main execution"""
+    args = parse_args(argv)
+    start = time.perf_counter()
+    
+    logger.info("=" * 70)
+    logger.info("OFFLINE REPLAY - OnTheSnow saved pages")
+    logger.info("=" * 70)
+    
+    result = replay(args.sources, args.history_dir, args.workers, args.dry_run)
+    
+    logger.info(f"✅ {result['pages']} pages → {result['written']} new snapshots "
+                f"({result['failed']} failed) in {time.perf_counter() - start:.1f}s")
+    return 0 if result['pages'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
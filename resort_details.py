@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Resort Detail Enrichment
+The region report fills mid_mtn_depth (snow.middle) and surface_conditions
+(surfaceType) for most resorts. For open resorts where either is missing, the
+resort's own ski report page is tried:
+    https://www.onthesnow.com/california/heavenly-mountain-resort/skireport
+
+Detail pages use the same Next.js resort objects (uuid, snow, surfaceType) as the
+region report. They are fetched concurrently over the shared HTTP session
+(DETAIL_WORKERS at a time) and cached per resort, keyed on the resort's updatedAt:
+
+    .resort_details_cache.json      # resort_id -> updated_at, fetched_at, mid_mtn_depth, surface_conditions
+
+A resort whose updatedAt has not changed is never re-fetched while its entry is younger
+than DETAIL_TTL_HOURS. Closed resorts and failed fetches keep the listing values.
+Set FETCH_RESORT_DETAILS=0 to skip the stage.
+"""
+
+import os
+import json
+import logging
+import pandas as pd
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from next_data_stream import extract_next_data
+from fetch_cache import read_json, write_json_atomic
+from onthesnow_json_scraper import get_http_session, surface_label, CM_PER_INCH, HTTP_POOL_SIZE
+from metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+RESORT_DETAILS_CACHE = ".resort_details_cache.json"
+# Upper bound on an entry's age even if the resort's updatedAt never changes
+DETAIL_TTL_HOURS = 7 * 24
+# Concurrent detail fetches, each on its own pooled connection of the shared session
+DETAIL_WORKERS = min(4, HTTP_POOL_SIZE)
+DETAIL_TIMEOUT = 15
+
+
+def detail_url(region, slug):
+    """Ski report URL of one resort, e.g. ('california', 'heavenly-mountain-resort')"""
+    return f"https://www.onthesnow.com/{region}/{slug}/skireport"
+
+
+def _find_resort(node, resort_id):
+    """Depth-first search for the resort object with this uuid and a snow report"""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if str(node.get('uuid')) == resort_id and isinstance(node.get('snow'), dict):
+                return node
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return None
+
+
+def parse_detail_page(html, resort_id):
+    """
+    Pull mid-mountain depth and surface conditions out of a resort's ski report page
+    
+    Args:
+        html: Page source
+        resort_id: OnTheSnow resort ID (uuid)
+    
+    Returns:
+        dict: 'mid_mtn_depth' (inches) and 'surface_conditions', or None if the page
+              has no data for the resort
+    """
+    json_text = extract_next_data(html)
+    if json_text is None:
+        return None
+    try:
+        page_props = json.loads(json_text)['props']['pageProps']
+    except (KeyError, TypeError, ValueError):
+        return None
+    
+    resort_json = _find_resort(page_props, str(resort_id))
+    if resort_json is None:
+        return None
+    
+    middle = resort_json['snow'].get('middle') or 0
+    return {
+        'mid_mtn_depth': int(round(middle / CM_PER_INCH)),
+        'surface_conditions': surface_label(resort_json.get('surfaceType')),
+    }
+
+
+class ResortDetailCache:
+    """Per-resort detail values persisted between runs"""
+    
+    def __init__(self, path=RESORT_DETAILS_CACHE, ttl_hours=DETAIL_TTL_HOURS):
+        self.path = path
+        self.ttl = pd.Timedelta(hours=ttl_hours)
+        self.entries = read_json(path)
+    
+    def get(self, resort_id, updated_at):
+        """Cached details if the resort has not been updated since and the entry is fresh"""
+        entry = self.entries.get(str(resort_id))
+        if not entry or not updated_at or entry.get('updated_at') != updated_at:
+            return None
+        if pd.Timestamp.now() - pd.Timestamp(entry['fetched_at']) > self.ttl:
+            return None
+        return entry
+    
+    def record(self, resort_id, updated_at, details):
+        """Remember freshly fetched details"""
+        self.entries[str(resort_id)] = {
+            'updated_at': updated_at,
+            'fetched_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'mid_mtn_depth': details['mid_mtn_depth'],
+            'surface_conditions': details['surface_conditions'],
+        }
+    
+    def save(self):
+        """Persist the cache atomically, dropping entries past the TTL"""
+        cutoff = pd.Timestamp.now() - self.ttl
+        entries = {key: entry for key, entry in self.entries.items()
+                   if pd.Timestamp(entry.get('fetched_at', '1970-01-01')) >= cutoff}
+        try:
+            write_json_atomic(self.path, entries)
+        except OSError as e:
+            logger.warning(f"⚠️ Failed to save resort detail cache: {e}")
+
+
+def fetch_detail_page(url):
+    """Fetch one detail page over the shared keep-alive session"""
+    response = get_http_session().get(url, timeout=DETAIL_TIMEOUT)
+    response.raise_for_status()
+    return response.text
+
+
+def enrich_resort_details(df, cache=None, fetch=fetch_detail_page, max_workers=DETAIL_WORKERS):
+    """
+    Fill mid_mtn_depth and surface_conditions the region report left empty
+    
+    Args:
+        df: OnTheSnow DataFrame with resort_id, slug, status, updated_at and report_region
+        cache: Optional ResortDetailCache (created and saved here if omitted)
+        fetch: Function url -> HTML (the shared HTTP session by default)
+        max_workers: Detail pages fetched at once
+    
+    Returns:
+        pd.DataFrame: copy of df with the two columns filled
+    """
+    if os.environ.get("FETCH_RESORT_DETAILS", "1") == "0" or df.empty or 'slug' not in df.columns:
+        return df
+    
+    df = df.copy()
+    if 'mid_mtn_depth' not in df.columns:
+        df['mid_mtn_depth'] = 0
+    if 'surface_conditions' not in df.columns:
+        df['surface_conditions'] = ''
+    save_cache = cache is None
+    cache = cache or ResortDetailCache()
+    
+    def fill(index, details):
+        # Only fill gaps; never replace a listing value with an empty one
+        df.at[index, 'mid_mtn_depth'] = df.at[index, 'mid_mtn_depth'] or details['mid_mtn_depth']
+        df.at[index, 'surface_conditions'] = df.at[index, 'surface_conditions'] or details['surface_conditions']
+    
+    pending = {}
+    hits = 0
+    for index, row in df.iterrows():
+        resort_id, slug, updated_at = row.get('resort_id'), row.get('slug'), row.get('updated_at')
+        if pd.isna(resort_id) or pd.isna(slug) or not slug or row.get('status') != 'Open':
+            continue
+        if row['mid_mtn_depth'] and row['surface_conditions']:
+            continue
+        cached = cache.get(resort_id, updated_at)
+        if cached is not None:
+            fill(index, cached)
+            hits += 1
+        else:
+            region = row.get('report_region') or 'california'
+            pending[index] = (str(resort_id), updated_at, detail_url(region, slug))
+    
+    def load(item):
+        resort_id, _, url = item
+        try:
+            return parse_detail_page(fetch(url), resort_id)
+        except Exception as e:
+            logger.warning(f"⚠️ Detail page {url} failed: {e}")
+            return None
+    
+    fetched = failed = 0
+    if pending:
+        with METRICS.timer('resort_details'):
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(load, pending.values()))
+        
+        for (index, (resort_id, updated_at, url)), details in zip(pending.items(), results):
+            if details is None:
+                # Keep the listing values
+                failed += 1
+                continue
+            fill(index, details)
+            cache.record(resort_id, updated_at, details)
+            fetched += 1
+        
+        if save_cache:
+            cache.save()
+    
+    METRICS.increment('resort_detail_cache_hits', hits)
+    METRICS.increment('resort_detail_fetches', fetched)
+    logger.info(f"🔎 Resort details: {hits} cached, {fetched} fetched, {failed} failed")
+    return df
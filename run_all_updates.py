@@ -1,13 +1,25 @@
 #!/usr/bin/env python3
 """
-Master Update Script for Colorado Snow Conditions
+Master Update Script for California Snow Conditions
 Runs all update pipelines and logs results
+
+By default the pipeline runs in-process: the scraped DataFrame is handed to the
+Google Sheets stage in memory and each stage is timed. Use --stage to run a single
+stage, or --subprocess for the old one-interpreter-per-script mode.
+With --daemon the pipeline keeps running and scheduler.py picks the wait between runs.
 """
 
+import argparse
+import os
+import signal
 import subprocess
 import sys
+import threading
+import time
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
+from fetch_cache import read_run_state
+from metrics import METRICS
 
 # Setup logging
 logging.basicConfig(
@@ -26,7 +38,7 @@ def run_script(script_name, description):
     Args:
         script_name: Name of Python script to run
         description: Human-readable description for logging
-        
+    
     Returns:
         bool: True if successful, False otherwise
     """
@@ -46,7 +58,7 @@ def run_script(script_name, description):
             logging.error(f"❌ {description} failed")
             logging.error(f"Error output:\n{result.stderr}")
             return False
-            
+    
     except subprocess.TimeoutExpired:
         logging.error(f"❌ {description} timed out (>5 minutes)")
         return False
@@ -55,31 +67,228 @@ def run_script(script_name, description):
         return False
 
 
-def main():
-    """Main orchestration function"""
-    start_time = datetime.now()
+def run_stage(description, func, *args):
+    """
+    Run one in-process pipeline stage and time it
     
-    logging.info("🎿" * 30)
-    logging.info("COLORADO SNOW CONDITIONS - UPDATE PIPELINE")
-    logging.info("🎿" * 30)
-    logging.info(f"Started at: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
+    Args:
+        description: Human-readable description for logging
+        func: Stage function to call
+        *args: Arguments passed to func
     
-    # Define all update scripts
+    Returns:
+        tuple: (success, result, seconds)
+    """
+    logging.info(f"Starting {description}...")
+    start = time.perf_counter()
+    try:
+        result = func(*args)
+        seconds = time.perf_counter() - start
+        METRICS.record_duration('pipeline_stage', seconds, step=description, status='ok')
+        logging.info(f"✅ {description} completed in {seconds:.2f}s")
+        return True, result, seconds
+    except Exception as e:
+        seconds = time.perf_counter() - start
+        METRICS.record_duration('pipeline_stage', seconds, step=description, status='error')
+        logging.error(f"❌ {description} failed after {seconds:.2f}s: {e}")
+        return False, None, seconds
+
+
+def scrape_stage(driver_pool=None, api_server=None, regions=None):
+    """
+    Scrape and enrich resort data; returns the combined DataFrame (also published to api_server)
+    
+    Args:
+        regions: Optional OnTheSnow region slugs or report URLs (default: California)
+    """
+    # Imported here so an upload-only run never loads selenium
+    from combined_scraper import combine_resort_data, save_combined_data
+    from fetch_cache import FetchCache, write_run_state
+    from onthesnow_json_scraper import report_urls
+    
+    fetch_cache = None if os.environ.get("FORCE_REFRESH") == "1" else FetchCache()
+    region_urls = report_urls(regions) if regions else None
+    df = combine_resort_data(region_urls=region_urls, driver_pool=driver_pool, fetch_cache=fetch_cache)
+    
+    if df.attrs.get('cache_hit'):
+        write_run_state(cache_hit=True)
+        return df
+    if df.empty:
+        raise RuntimeError("No resort data collected")
+    
+    # The CSV is still written for CI artifacts and standalone uploads
+    save_combined_data(df)
+    if api_server is not None:
+        publish_to_api(api_server, df)
+    return df
+
+
+def publish_to_api(api_server, df):
+    """Hand fresh data to the conditions API; a failure never fails the pipeline"""
+    try:
+        api_server.publish(df)
+    except Exception as e:
+        logging.warning(f"⚠️ Failed to publish data to the conditions API: {e}")
+
+
+def upload_stage(data):
+    """Upload a DataFrame (or the combined CSV path) to Google Sheets"""
+    from google_sheets_updater import upload_resort_data
+    upload_resort_data(data)
+
+
+def run_in_process(stage, driver_pool=None, api_server=None, regions=None):
+    """
+    Run the pipeline stages in this interpreter
+    
+    Args:
+        stage: 'all', 'scrape' or 'upload'
+        driver_pool: Optional DriverPool kept warm between daemon runs
+        api_server: Optional ConditionsServer that gets each scraped DataFrame
+        regions: Optional OnTheSnow regions to scrape (see scrape_stage)
+    
+    Returns:
+        tuple: (results dict of description -> (success, seconds), cache_hit)
+    """
+    results = {}
+    df = None
+    cache_hit = False
+    
+    if stage in ('all', 'scrape'):
+        success, df, seconds = run_stage("Combined Resort Data Scraper", scrape_stage, driver_pool, api_server,
+                                         regions)
+        results["Combined Resort Data Scraper"] = (success, seconds)
+        if not success:
+            return results, cache_hit
+        cache_hit = bool(df.attrs.get('cache_hit'))
+    
+    if stage in ('all', 'upload'):
+        if stage == 'upload':
+            from combined_scraper import OUTPUT_FILE
+            cache_hit = bool(read_run_state().get('cache_hit'))
+            df = OUTPUT_FILE
+        
+        if cache_hit:
+            logging.info("♻️ OnTheSnow unchanged since last published run - skipping Google Sheets Update")
+        else:
+            success, _, seconds = run_stage("Google Sheets Update", upload_stage, df)
+            results["Google Sheets Update"] = (success, seconds)
+    
+    return results, cache_hit
+
+
+def run_subprocesses():
+    """Run each stage as its own script (legacy mode)"""
     # Order: Scrape data → Update Google Sheets → Datawrapper reads from Sheets
     scripts = [
         ("combined_scraper.py", "Combined Resort Data Scraper"),
         ("google_sheets_updater.py", "Google Sheets Update"),
     ]
     
-    # Run each script and track results
+    started_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     results = {}
     for script, description in scripts:
-        results[description] = run_script(script, description)
+        start = time.perf_counter()
+        success = run_script(script, description)
+        results[description] = (success, time.perf_counter() - start)
+    
+    # Ignore a run state left over from an earlier run
+    state = read_run_state()
+    return results, bool(state.get('cache_hit')) and state.get('finished_at', '') >= started_at
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the California snow conditions update pipeline")
+    parser.add_argument('--stage', choices=['all', 'scrape', 'upload'], default='all',
+                        help="Run only one stage (upload reads california_resorts_combined.csv)")
+    parser.add_argument('--subprocess', action='store_true',
+                        help="Run each stage as a separate Python script (legacy mode)")
+    parser.add_argument('--daemon', action='store_true',
+                        help="Keep running, waiting between runs as planned by scheduler.py")
+    parser.add_argument('--api-port', type=int,
+                        help="With --daemon, also serve the latest data on this port (conditions_api.py)")
+    parser.add_argument('--regions', nargs='+', metavar='REGION',
+                        help="OnTheSnow region slugs or report URLs to scrape, e.g. california nevada "
+                             "(default: $ONTHESNOW_REGIONS, else california)")
+    return parser.parse_args(argv)
+
+
+def run_daemon(args):
+    """
+    Run the pipeline repeatedly until SIGTERM/SIGINT, adapting the wait between runs
+    
+    One process keeps the Chrome pool warm across runs; the scheduler picks each
+    wait from the season, time of day, storms and recent snapshot changes.
+    """
+    from scheduler import AdaptiveScheduler
+    
+    stop = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stop.set())
+    
+    scheduler = AdaptiveScheduler()
+    api_server = None
+    if args.api_port:
+        from conditions_api import start_server, load_csv
+        from combined_scraper import OUTPUT_FILE
+        # Runs publish their DataFrame directly; the CSV only seeds the first responses
+        api_server = start_server(args.api_port, csv_path=None)
+        if os.path.exists(OUTPUT_FILE):
+            publish_to_api(api_server, load_csv(OUTPUT_FILE))
+    
+    driver_pool = None
+    if not args.subprocess:
+        from driver_pool import DriverPool
+        driver_pool = DriverPool(size=1)
+    
+    logging.info("🔁 Daemon mode - adaptive schedule (stop with Ctrl+C or SIGTERM)")
+    try:
+        while not stop.is_set():
+            run_pipeline(args, driver_pool, api_server)
+            
+            seconds, reason = scheduler.plan()
+            next_run = datetime.now() + timedelta(seconds=seconds)
+            logging.info(f"⏰ Next run at {next_run.strftime('%Y-%m-%d %H:%M')} "
+                         f"(in {seconds / 60:.0f} min: {reason})")
+            stop.wait(seconds)
+    finally:
+        if driver_pool is not None:
+            driver_pool.close()
+        if api_server is not None:
+            api_server.shutdown()
+    
+    logging.info("Daemon stopped")
+    return 0
+
+
+def run_pipeline(args, driver_pool=None, api_server=None):
+    """Run the pipeline once and log a summary; returns the exit code"""
+    start_time = datetime.now()
+    METRICS.reset()
+    
+    logging.info("🎿" * 30)
+    logging.info("CALIFORNIA SNOW CONDITIONS - UPDATE PIPELINE")
+    logging.info("🎿" * 30)
+    logging.info(f"Started at: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
+    
+    if args.subprocess:
+        if args.regions:
+            # combined_scraper.py reads the regions from the environment it inherits
+            os.environ["ONTHESNOW_REGIONS"] = ",".join(args.regions)
+        results, cache_hit = run_subprocesses()
+        scraped = results.get("Combined Resort Data Scraper", (False, 0))[0]
+        if api_server is not None and scraped and not cache_hit:
+            # The scrape ran in a child process, so its CSV is the only copy of the data
+            from conditions_api import load_csv
+            from combined_scraper import OUTPUT_FILE
+            publish_to_api(api_server, load_csv(OUTPUT_FILE))
+    else:
+        results, cache_hit = run_in_process(args.stage, driver_pool, api_server, args.regions)
     
     # Calculate summary
     end_time = datetime.now()
     duration = end_time - start_time
-    successful = sum(results.values())
+    successful = sum(success for success, _ in results.values())
     total = len(results)
     
     # Print summary
@@ -87,9 +296,11 @@ def main():
     logging.info("UPDATE SUMMARY")
     logging.info("=" * 70)
     
-    for description, success in results.items():
+    for description, (success, seconds) in results.items():
         status = "✅ SUCCESS" if success else "❌ FAILED"
-        logging.info(f"{description}: {status}")
+        logging.info(f"{description}: {status} ({seconds:.2f}s)")
+    
+    logging.info(f"Cache hit: {'yes (OnTheSnow unchanged, upload skipped)' if cache_hit else 'no'}")
     
     logging.info("-" * 70)
     logging.info(f"Completed: {successful}/{total} updates successful")
@@ -97,11 +308,24 @@ def main():
     logging.info(f"Finished at: {end_time.strftime('%Y-%m-%d %H:%M:%S')}")
     logging.info("=" * 70)
     
+    # Per-stage timings and counters (subprocess mode: each script writes its own)
+    METRICS.record_duration('pipeline_total', duration.total_seconds(), mode='subprocess' if args.subprocess else 'in-process')
+    METRICS.observe('cache_hit', int(cache_hit))
+    METRICS.observe('stages_failed', total - successful)
+    METRICS.write('pipeline')
+    
     # Return exit code (0 = success, 1 = failure)
     return 0 if successful == total else 1
 
 
+def main(argv=None):
+    """Main orchestration function"""
+    args = parse_args(argv)
+    if args.daemon:
+        return run_daemon(args)
+    return run_pipeline(args)
+
+
 if __name__ == "__main__":
     exit_code = main()
     sys.exit(exit_code)
-
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Adaptive Update Scheduler
+Decides how long the pipeline daemon (run_all_updates.py --daemon) waits before the
+next run, instead of polling on a fixed cron.
+
+The wait is picked from the current regime, then tuned by how often the data has
+actually been changing according to the stored snapshot history:
+    storm     any resort reports STORM_SNOW_24H+ inches in 24h   15-30 min
+    morning   resorts open, local morning report window           20-60 min
+    open      resorts open, rest of the day                       30-180 min
+    closed    every resort closed (off-season)                    6-12 h
+Within a regime the wait is about the average time between observed changes,
+so quiet days poll less and busy ones more.
+"""
+
+import logging
+import pandas as pd
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from snapshot_store import SnapshotStore, SNAPSHOT_TIME_COLUMN
+
+logger = logging.getLogger(__name__)
+
+# OnTheSnow morning reports land between 5 and 10am Pacific
+REPORT_TZ = ZoneInfo('America/Los_Angeles')
+MORNING_WINDOW = (5, 10)
+STORM_SNOW_24H = 6
+# Months treated as the season when there is no snapshot history yet
+SEASON_MONTHS = (11, 12, 1, 2, 3, 4)
+CHANGE_WINDOW_HOURS = 48
+
+# Regime -> (min, default, max) minutes between runs
+INTERVALS = {
+    'storm': (15, 20, 30),
+    'morning': (20, 30, 60),
+    'open': (30, 120, 180),
+    'closed': (360, 720, 720),
+}
+
+# Fields whose change counts as new data
+TRACKED_COLUMNS = ['name', 'status', 'new_snow_24h', 'base_depth', 'open_trails', 'open_lifts']
+
+
+def count_changes(history):
+    """
+    Number of snapshots in a window that brought new data
+    
+    A snapshot is only stored when the scrape was not a fetch-cache hit, so the first
+    one in the window counts as a change; each later one counts if any resort's tracked
+    fields differ from the snapshot before it.
+    
+    Args:
+        history: Rows of the window's snapshots with a snapshot_at column
+    """
+    if history.empty:
+        return 0
+    columns = [c for c in TRACKED_COLUMNS if c in history.columns]
+    snapshots = [frame.drop(columns=SNAPSHOT_TIME_COLUMN).set_index('name').sort_index()
+                 for _, frame in history[columns + [SNAPSHOT_TIME_COLUMN]].groupby(SNAPSHOT_TIME_COLUMN)]
+    return 1 + sum(not current.equals(previous) for previous, current in zip(snapshots, snapshots[1:]))
+
+
+def classify(now, latest):
+    """
+    Scheduling regime for the current time and latest snapshot
+    
+    Args:
+        now: Current time (timezone-aware)
+        latest: Latest stored snapshot rows (any age), or an empty DataFrame without history
+    """
+    if latest.empty:
+        is_open = now.astimezone(REPORT_TZ).month in SEASON_MONTHS
+    else:
+        is_open = (latest['status'] == 'Open').any()
+        if 'new_snow_24h' in latest.columns and \
+                pd.to_numeric(latest['new_snow_24h'], errors='coerce').max() >= STORM_SNOW_24H:
+            return 'storm'
+    
+    if not is_open:
+        return 'closed'
+    local_hour = now.astimezone(REPORT_TZ).hour
+    if MORNING_WINDOW[0] <= local_hour < MORNING_WINDOW[1]:
+        return 'morning'
+    return 'open'
+
+
+def next_interval(regime, changes=None, window_hours=CHANGE_WINDOW_HOURS):
+    """
+    Minutes until the next run
+    
+    Args:
+        regime: Key of INTERVALS
+        changes: Snapshots with new data in the window, or None without any history
+        window_hours: Length of the window the changes were counted in
+    """
+    low, default, high = INTERVALS[regime]
+    if changes is None:
+        return default
+    if changes == 0:
+        return high
+    # Poll about as often as the data has been changing
+    return max(low, min(high, window_hours * 60 / changes))
+
+
+class AdaptiveScheduler:
+    """Plans the daemon's next run from the snapshot history"""
+    
+    def __init__(self, store=None, window_hours=CHANGE_WINDOW_HOURS):
+        self.store = store or SnapshotStore()
+        self.window_hours = window_hours
+    
+    def plan(self, now=None):
+        """
+        Decide when to run next
+        
+        Returns:
+            tuple: (seconds to wait, human-readable reason)
+        """
+        now = now or datetime.now().astimezone()
+        since = now.astimezone().replace(tzinfo=None) - pd.Timedelta(hours=self.window_hours)
+        try:
+            # Quiet days store no snapshots, so the regime comes from the latest one of any age
+            latest = self.store.latest_snapshot(columns=TRACKED_COLUMNS)
+            history = self.store.snapshots_since(since, columns=TRACKED_COLUMNS) if not latest.empty else latest
+        except Exception as e:
+            logger.warning(f"⚠️ Could not read snapshot history: {e}")
+            latest = history = pd.DataFrame()
+        
+        changes = None if latest.empty else count_changes(history)
+        
+        regime = classify(now, latest)
+        minutes = next_interval(regime, changes, self.window_hours)
+        observed = "no history" if changes is None else f"{changes} changes in {self.window_hours}h"
+        return minutes * 60, f"{regime}, {observed}"
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Google Sheets Client
+Builds the Sheets v4 service without a network round trip for the discovery document,
+reuses service-account access tokens until they expire, and retries rate-limited or
+failed API calls with exponential backoff (full jitter, honouring Retry-After).
+
+Set SHEETS_API_ENDPOINT to point the client at a local fake server for testing.
+"""
+
+import os
+import json
+import time
+import random
+import logging
+import threading
+import httplib2
+from datetime import datetime, timedelta, timezone
+from googleapiclient.discovery import build_from_document
+from googleapiclient.errors import HttpError
+from metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+DISCOVERY_URL = "https://sheets.googleapis.com/$discovery/rest?version=v4"
+DISCOVERY_CACHE_FILE = ".sheets_discovery_v4.json"
+SHEETS_API_ENDPOINT = os.environ.get("SHEETS_API_ENDPOINT")
+# Optional on-disk token cache (written 0600); off unless the variable is set
+TOKEN_CACHE_FILE = os.environ.get("SHEETS_TOKEN_CACHE")
+
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+
+# Credentials by (client_email, scopes), so every updater in a process shares one token
+_credentials = {}
+_credentials_lock = threading.Lock()
+
+
+def load_discovery_document(cache_file=DISCOVERY_CACHE_FILE):
+    """
+    Return the Sheets v4 discovery document as a JSON string
+    
+    Looks in the on-disk cache, then the copy bundled with google-api-python-client,
+    and only downloads it when neither is available (saving it for next time).
+    """
+    try:
+        with open(cache_file, encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+    
+    try:
+        from googleapiclient.discovery_cache import get_static_doc
+        doc = get_static_doc('sheets', 'v4')
+    except ImportError:
+        doc = None
+    if doc:
+        return doc
+    
+    import requests
+    logger.info("Downloading Sheets discovery document...")
+    response = requests.get(DISCOVERY_URL, timeout=20)
+    response.raise_for_status()
+    doc = response.text
+    
+    tmp_path = f"{cache_file}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(doc)
+    os.replace(tmp_path, cache_file)
+    return doc
+
+
+def _utcnow():
+    """Current UTC time as a naive datetime, the way google-auth stores credentials.expiry"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _load_cached_token(credentials, token_cache):
+    try:
+        with open(token_cache, encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return
+    
+    if cached.get('client_email') != credentials.service_account_email:
+        return
+    expiry = datetime.fromisoformat(cached['expiry'])
+    if expiry.tzinfo is not None:
+        expiry = expiry.astimezone(timezone.utc).replace(tzinfo=None)
+    # Leave headroom so the token does not expire in the middle of a run
+    if expiry - timedelta(minutes=5) > _utcnow():
+        credentials.token = cached['token']
+        credentials.expiry = expiry
+        logger.info("Reusing cached Sheets access token")
+
+
+def save_token(credentials, token_cache=None):
+    """Write the current access token to the token cache file (mode 0600), if enabled"""
+    token_cache = token_cache or TOKEN_CACHE_FILE
+    if not token_cache or not credentials.token or not credentials.expiry:
+        return
+    
+    tmp_path = f"{token_cache}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump({
+            'client_email': credentials.service_account_email,
+            'token': credentials.token,
+            'expiry': credentials.expiry.isoformat(),
+        }, f)
+    os.replace(tmp_path, token_cache)
+
+
+def get_credentials(credentials_info, scopes, token_cache=None):
+    """
+    Return service-account credentials, shared across calls in this process
+    
+    google-auth only refreshes a token once it has expired, so reusing the object
+    reuses the token. With a token cache file a fresh process can reuse it too.
+    """
+    from google.oauth2 import service_account
+    
+    key = (credentials_info.get('client_email'), tuple(scopes))
+    with _credentials_lock:
+        credentials = _credentials.get(key)
+        if credentials is None:
+            credentials = service_account.Credentials.from_service_account_info(
+                credentials_info,
+                scopes=scopes
+            )
+            token_cache = token_cache or TOKEN_CACHE_FILE
+            if token_cache:
+                _load_cached_token(credentials, token_cache)
+            _credentials[key] = credentials
+    return credentials
+
+
+def build_sheets_service(credentials=None, api_endpoint=None, http=None):
+    """
+    Build the Sheets v4 service from the cached discovery document
+    
+    Args:
+        credentials: google-auth credentials (omit when passing an http object)
+        api_endpoint: Base URL override, e.g. http://127.0.0.1:8080/ for a fake server
+        http: Pre-built httplib2.Http, mainly for tests
+    
+    Returns:
+        Resource: the Sheets service
+    """
+    api_endpoint = api_endpoint or SHEETS_API_ENDPOINT
+    client_options = {'api_endpoint': api_endpoint} if api_endpoint else None
+    
+    return build_from_document(
+        load_discovery_document(),
+        credentials=credentials,
+        http=http,
+        client_options=client_options
+    )
+
+
+def _retry_after(error):
+    """Seconds from a Retry-After header on an HttpError, or None"""
+    value = getattr(error, 'resp', None) and error.resp.get('retry-after')
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
+
+
+def execute_with_backoff(request, max_retries=5, base_delay=1.0, max_delay=32.0, sleep=time.sleep):
+    """
+    Execute an API request, retrying 429/5xx responses and connection errors
+    
+    Args:
+        request: googleapiclient HttpRequest (anything with execute())
+        max_retries: Retries after the first attempt
+        base_delay: Backoff for the first retry in seconds, doubled each attempt
+        max_delay: Cap on the backoff window
+        sleep: Sleep function (replaceable in tests)
+    
+    Returns:
+        dict: the API response
+    """
+    method = getattr(request, 'methodId', None) or 'unknown'
+    for attempt in range(max_retries + 1):
+        try:
+            with METRICS.timer('sheets_api', method=method):
+                return request.execute()
+        except HttpError as e:
+            status = e.resp.status if e.resp is not None else None
+            if status not in RETRYABLE_STATUS or attempt == max_retries:
+                raise
+            reason = f"HTTP {status}"
+            retry_after = _retry_after(e)
+        except (httplib2.HttpLib2Error, OSError) as e:
+            # Transport failures (refused/reset connections, socket timeouts, DNS)
+            if attempt == max_retries:
+                raise
+            reason = type(e).__name__
+            retry_after = None
+        
+        # Full jitter, but never sooner than the server asked for
+        delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        METRICS.increment('sheets_api_retries', method=method)
+        logger.warning(f"Sheets API {reason}, retry {attempt + 1}/{max_retries} in {delay:.1f}s")
+        sleep(delay)
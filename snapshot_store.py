@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Historical Snapshot Store
+Appends every combined scrape to a local Parquet time series instead of only
+overwriting california_resorts_combined.csv.
+
+Layout (one directory per ski season, July to June):
+    history/season=2025-26/date=2025-11-26/snapshot-20251126T012957.parquet
+    history/season=2025-26/resorts/227.parquet      # Mammoth, every snapshot this season
+    history/season=2025-26/resort_index.json        # resort key -> name, slug, rows, first/last seen
+
+Date partitions answer "all resorts on a date" by reading one directory, and the
+per-resort series files answer "this resort over the season" by reading one file,
+so query cost does not grow with the number of snapshots stored.
+"""
+
+import os
+import re
+import glob
+import json
+import logging
+import pandas as pd
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+HISTORY_DIR = "history"
+SNAPSHOT_TIME_COLUMN = "snapshot_at"
+
+
+def season_for(timestamp):
+    """Ski season label for a timestamp, e.g. 2025-11-26 -> '2025-26', 2026-03-01 -> '2025-26'"""
+    year = timestamp.year if timestamp.month >= 7 else timestamp.year - 1
+    return f"{year}-{(year + 1) % 100:02d}"
+
+
+def resort_key(resort_id, name):
+    """Series file key: the OnTheSnow ID, or a slug of the name for resorts without one"""
+    if resort_id is not None and not pd.isna(resort_id):
+        return str(int(resort_id))
+    return "name-" + re.sub(r'[^a-z0-9]+', '-', str(name).lower()).strip('-')
+
+
+def _write_parquet_atomic(df, path):
+    tmp_path = f"{path}.tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+class SnapshotStore:
+    """Append-only Parquet history of combined resort data, partitioned by season and date"""
+    
+    def __init__(self, root=HISTORY_DIR):
+        self.root = root
+    
+    def _season_dir(self, season):
+        return os.path.join(self.root, f"season={season}")
+    
+    def _index_path(self, season):
+        return os.path.join(self._season_dir(season), "resort_index.json")
+    
+    def _series_path(self, season, key):
+        return os.path.join(self._season_dir(season), "resorts", f"{key}.parquet")
+    
+    def load_index(self, season):
+        """Return the per-resort index for a season ({} if the season has no data)"""
+        try:
+            with open(self._index_path(season), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+    
+    def seasons(self):
+        """Seasons with stored snapshots, oldest first"""
+        dirs = glob.glob(os.path.join(self.root, "season=*"))
+        return sorted(os.path.basename(d).split('=', 1)[1] for d in dirs)
+    
+    @staticmethod
+    def _normalize(df):
+        """Give mixed object columns a single Parquet-friendly type"""
+        df = df.copy()
+        if 'resort_id' in df.columns:
+            df['resort_id'] = pd.to_numeric(df['resort_id'], errors='coerce').astype('Int64')
+        for column in df.columns:
+            if df[column].dtype == object:
+                df[column] = df[column].astype('string')
+        return df
+    
+    def append(self, df, taken_at=None):
+        """
+        Store one combined snapshot and extend each resort's season series
+        
+        Args:
+            df: Combined resort DataFrame (one row per resort)
+            taken_at: Snapshot time (defaults to data_fetched_at, else now)
+        
+        Returns:
+            str: path of the snapshot file, or None if this snapshot was already stored
+        """
+        written = self.append_many([(df, taken_at)])
+        return written[0] if written else None
+    
+    def append_many(self, snapshots):
+        """
+        Store several snapshots, rewriting each resort's series file once per season
+        
+        Used for backfills, where appending one snapshot at a time would rewrite every
+        series file once per snapshot. Snapshots already stored are skipped.
+        
+        Args:
+            snapshots: Iterable of (df, taken_at) pairs, taken_at as in append()
+        
+        Returns:
+            list: paths of the snapshot files written
+        """
+        written = []
+        new_rows = {}
+        for df, taken_at in snapshots:
+            if df.empty:
+                continue
+            
+            if taken_at is None and 'data_fetched_at' in df.columns:
+                taken_at = pd.to_datetime(df['data_fetched_at'], errors='coerce').max()
+            taken_at = pd.Timestamp(taken_at if taken_at is not None and not pd.isna(taken_at) else datetime.now())
+            taken_at = taken_at.floor('s')
+            
+            season = season_for(taken_at)
+            date_dir = os.path.join(self._season_dir(season), f"date={taken_at.strftime('%Y-%m-%d')}")
+            snapshot_path = os.path.join(date_dir, f"snapshot-{taken_at.strftime('%Y%m%dT%H%M%S')}.parquet")
+            if os.path.exists(snapshot_path):
+                logger.info(f"Snapshot {snapshot_path} already stored")
+                continue
+            
+            snapshot = self._normalize(df)
+            snapshot[SNAPSHOT_TIME_COLUMN] = taken_at
+            
+            os.makedirs(date_dir, exist_ok=True)
+            _write_parquet_atomic(snapshot, snapshot_path)
+            logger.info(f"Stored snapshot of {len(snapshot)} resorts in {snapshot_path}")
+            
+            new_rows.setdefault(season, []).append(snapshot)
+            written.append(snapshot_path)
+        
+        for season, frames in new_rows.items():
+            self._extend_series(season, pd.concat(frames, ignore_index=True))
+        
+        return written
+    
+    def _extend_series(self, season, rows):
+        """Merge new snapshot rows into each resort's series file and the season index"""
+        os.makedirs(os.path.join(self._season_dir(season), "resorts"), exist_ok=True)
+        resort_ids = rows['resort_id'] if 'resort_id' in rows.columns else [None] * len(rows)
+        keys = pd.Series([resort_key(rid, name) for rid, name in zip(resort_ids, rows['name'])], index=rows.index)
+        
+        # Per-resort series: rewriting a small file per resort keeps reads to one file
+        index = self.load_index(season)
+        for key, series in rows.groupby(keys, sort=False):
+            path = self._series_path(season, key)
+            if os.path.exists(path):
+                series = pd.concat([pd.read_parquet(path), series], ignore_index=True)
+            # Backfilled snapshots may be older than ones already stored
+            series = series.sort_values(SNAPSHOT_TIME_COLUMN, kind='stable', ignore_index=True)
+            _write_parquet_atomic(series, path)
+            
+            latest = series.iloc[-1]
+            index[key] = {
+                'name': str(latest['name']),
+                'resort_id': None if pd.isna(latest.get('resort_id')) else int(latest['resort_id']),
+                'slug': None if pd.isna(latest.get('slug')) else str(latest['slug']),
+                'rows': len(series),
+                'first_seen': series[SNAPSHOT_TIME_COLUMN].iloc[0].strftime('%Y-%m-%d %H:%M:%S'),
+                'last_seen': latest[SNAPSHOT_TIME_COLUMN].strftime('%Y-%m-%d %H:%M:%S'),
+            }
+        
+        tmp_path = f"{self._index_path(season)}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self._index_path(season))
+    
+    def find_resort(self, resort, season):
+        """Resolve an OnTheSnow ID, slug or resort name to its series key for a season"""
+        index = self.load_index(season)
+        wanted = str(resort).strip().lower()
+        if wanted in index:
+            return wanted
+        for key, entry in index.items():
+            if wanted in (str(entry.get('resort_id')), str(entry.get('slug')).lower(), entry['name'].lower()):
+                return key
+        return None
+    
+    def resort_history(self, resort, season=None, columns=None):
+        """
+        Every stored snapshot of one resort, oldest first
+        
+        Args:
+            resort: OnTheSnow resort ID, slug or name (e.g. 'Kirkwood')
+            season: Season label like '2025-26' (defaults to the latest stored season)
+            columns: Optional list of columns to read (snapshot_at is always included)
+        
+        Returns:
+            pd.DataFrame: the resort's rows (empty if unknown)
+        """
+        season = season or (self.seasons() or [None])[-1]
+        key = self.find_resort(resort, season) if season else None
+        if key is None:
+            return pd.DataFrame()
+        
+        if columns is not None:
+            columns = [SNAPSHOT_TIME_COLUMN] + [c for c in columns if c != SNAPSHOT_TIME_COLUMN]
+        return pd.read_parquet(self._series_path(season, key), columns=columns)
+    
+    def snapshot_on(self, date, latest_only=False, columns=None):
+        """
+        All resorts' rows stored on a calendar date
+        
+        Args:
+            date: Date or 'YYYY-MM-DD' string
+            latest_only: Return only the last snapshot of that day
+            columns: Optional list of columns to read
+        
+        Returns:
+            pd.DataFrame: rows of every snapshot that day (empty if none)
+        """
+        date = pd.Timestamp(date)
+        pattern = os.path.join(self._season_dir(season_for(date)),
+                               f"date={date.strftime('%Y-%m-%d')}", "snapshot-*.parquet")
+        paths = sorted(glob.glob(pattern))
+        if latest_only:
+            paths = paths[-1:]
+        if not paths:
+            return pd.DataFrame()
+        return pd.concat([pd.read_parquet(path, columns=columns) for path in paths], ignore_index=True)
+    
+    def snapshots_since(self, since, columns=None):
+        """
+        Rows of every snapshot taken at or after `since`, oldest first
+        
+        Args:
+            since: Timestamp (naive local time, like snapshot_at)
+            columns: Optional list of columns to read (snapshot_at is always included)
+        
+        Returns:
+            pd.DataFrame: rows of the matching snapshots (empty if none)
+        """
+        since = pd.Timestamp(since).floor('s')
+        if columns is not None:
+            columns = [SNAPSHOT_TIME_COLUMN] + [c for c in columns if c != SNAPSHOT_TIME_COLUMN]
+        
+        paths = []
+        for date in pd.date_range(since.normalize(), pd.Timestamp.now().normalize(), freq='D'):
+            pattern = os.path.join(self._season_dir(season_for(date)),
+                                   f"date={date.strftime('%Y-%m-%d')}", "snapshot-*.parquet")
+            for path in sorted(glob.glob(pattern)):
+                stamp = os.path.basename(path)[len("snapshot-"):-len(".parquet")]
+                if pd.Timestamp(datetime.strptime(stamp, '%Y%m%dT%H%M%S')) >= since:
+                    paths.append(path)
+        if not paths:
+            return pd.DataFrame()
+        return pd.concat([pd.read_parquet(path, columns=columns) for path in paths], ignore_index=True)
+    
+    def latest_snapshot(self, columns=None):
+        """
+        Rows of the most recent stored snapshot, however old
+        
+        Args:
+            columns: Optional list of columns to read
+        
+        Returns:
+            pd.DataFrame: the snapshot's rows (empty if nothing is stored)
+        """
+        for season in reversed(self.seasons()):
+            paths = sorted(glob.glob(os.path.join(self._season_dir(season), "date=*", "snapshot-*.parquet")))
+            if paths:
+                return pd.read_parquet(paths[-1], columns=columns)
+        return pd.DataFrame()
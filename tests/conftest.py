@@ -0,0 +1,75 @@
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The modules live flat at the repository root
+sys.path.insert(0, ROOT)
+
+# Saved OnTheSnow California ski report (rendered, with __NEXT_DATA__)
+FIXTURE_PAGE = os.path.join(ROOT, "onthesnow_california_page_rendered.html")
+
+
+@pytest.fixture(scope="session")
+def california_page():
+    with open(FIXTURE_PAGE, encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.fixture
+def with_next_data(california_page):
+    """Build a copy of the saved page with its __NEXT_DATA__ contents replaced"""
+    tag = '<script id="__NEXT_DATA__" type="application/json">'
+    start = california_page.index(tag) + len(tag)
+    end = california_page.index('</script>', start)
+    return lambda payload: california_page[:start] + payload + california_page[end:]
+
+
+class StaticHandler(BaseHTTPRequestHandler):
+    """
+    Serves server.pages and records each request
+    
+    Maps a path (without query) to (status, content type, body[, extra headers]), or to
+    a list of those served in turn, the last one repeating.
+    """
+    
+    def do_GET(self):
+        self.server.requests.append((self.command, self.path, dict(self.headers)))
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        path = self.path.split('?', 1)[0]
+        response = self.server.pages.get(path, (404, 'text/plain', b'not found'))
+        if isinstance(response, list):
+            response = response.pop(0) if len(response) > 1 else response[0]
+        status, content_type, body, *extra = response
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (extra[0] if extra else {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    do_POST = do_GET
+    
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def local_server(monkeypatch):
+    """Local stand-in for a remote site: set server.pages, use server.base_url"""
+    monkeypatch.setenv('NO_PROXY', '127.0.0.1')
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StaticHandler)
+    server.pages = {}
+    server.requests = []
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,126 @@
+import gzip
+import http.client
+import json
+
+import pandas as pd
+import pytest
+
+from conditions_api import start_server
+
+
+def resorts_frame(base=40):
+    rows = []
+    for i in range(12):
+        rows.append({
+            'resort_id': str(100 + i),
+            'slug': f'resort-{i}',
+            'name': f'Resort {i}',
+            'status': 'Open' if i % 3 else 'Closed',
+            'region': 'Tahoe North' if i < 6 else 'Eastern Sierra',
+            'base_depth': base + i,
+            'data_fetched_at': '2026-01-10 06:00',
+        })
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture
+def api():
+    server = start_server(port=0, csv_path=None)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def get(server, path, headers=None, method='GET'):
+    connection = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=5)
+    try:
+        connection.request(method, path, headers=headers or {})
+        response = connection.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        connection.close()
+
+
+def test_no_data_yet_is_503(api):
+    status, _, body = get(api, '/resorts')
+    assert status == 503
+    assert 'error' in json.loads(body)
+
+
+def test_etag_gives_304_until_the_data_changes(api):
+    api.publish(resorts_frame())
+    status, headers, body = get(api, '/resorts')
+    assert status == 200
+    assert json.loads(body)['count'] == 12
+    etag = headers['ETag']
+    
+    status, headers, body = get(api, '/resorts', {'If-None-Match': etag})
+    assert status == 304
+    assert body == b''
+    assert headers['ETag'] == etag
+    assert get(api, '/resorts', {'If-None-Match': f'"other", W/{etag}'})[0] == 304
+    
+    api.publish(resorts_frame(base=50))
+    status, headers, body = get(api, '/resorts', {'If-None-Match': etag})
+    assert status == 200
+    assert headers['ETag'] != etag
+    assert json.loads(body)['resorts'][0]['base_depth'] == 50
+
+
+def test_gzip_only_when_accepted_and_worthwhile(api):
+    api.publish(resorts_frame())
+    _, _, plain = get(api, '/resorts')
+    
+    status, headers, body = get(api, '/resorts', {'Accept-Encoding': 'gzip, br'})
+    assert status == 200
+    assert headers['Content-Encoding'] == 'gzip'
+    assert headers['Vary'] == 'Accept-Encoding'
+    assert int(headers['Content-Length']) == len(body) < len(plain)
+    assert gzip.decompress(body) == plain
+    
+    # A single resort is below GZIP_MIN_BYTES
+    _, headers, body = get(api, '/resorts/100', {'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in headers
+    assert json.loads(body)['resort']['slug'] == 'resort-0'
+
+
+def test_status_filter(api):
+    api.publish(resorts_frame())
+    
+    open_resorts = json.loads(get(api, '/resorts?status=open')[2])
+    closed = json.loads(get(api, '/resorts?status=CLOSED')[2])
+    assert open_resorts['count'] == 8
+    assert closed['count'] == 4
+    assert {r['status'] for r in open_resorts['resorts']} == {'Open'}
+    
+    region = json.loads(get(api, '/regions/tahoe-north?status=closed')[2])
+    assert [r['slug'] for r in region['resorts']] == ['resort-0', 'resort-3']
+    
+    # A single resort ignores the filter
+    status, _, body = get(api, '/resorts/resort-1?status=closed')
+    assert status == 200
+    assert json.loads(body)['resort']['status'] == 'Open'
+
+
+def test_unknown_status_is_400_and_unknown_route_404(api):
+    api.publish(resorts_frame())
+    
+    status, _, body = get(api, '/resorts?status=powder')
+    assert status == 400
+    assert 'powder' in json.loads(body)['error']
+    
+    assert get(api, '/regions/nowhere')[0] == 404
+    assert get(api, '/regions/nowhere?status=open')[0] == 404
+    assert get(api, '/resorts/999')[0] == 404
+
+
+def test_head_sends_headers_only(api):
+    api.publish(resorts_frame())
+    _, get_headers, body = get(api, '/resorts')
+    
+    status, headers, head_body = get(api, '/resorts', method='HEAD')
+    
+    assert status == 200
+    assert head_body == b''
+    assert headers['ETag'] == get_headers['ETag']
+    assert int(headers['Content-Length']) == len(body)
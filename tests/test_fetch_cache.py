@@ -0,0 +1,34 @@
+import pytest
+
+from fetch_cache import FetchCache
+from onthesnow_json_scraper import OnTheSnowJSONScraper, resorts_digest
+
+URL = "https://www.onthesnow.com/california/skireport.html"
+
+
+@pytest.fixture
+def published_cache(tmp_path, california_page):
+    """Fetch cache holding the California page as published"""
+    cache = FetchCache(path=str(tmp_path / "fetch_cache.json"))
+    cache.record(URL, resorts_digest(california_page))
+    cache.mark_published()
+    return cache
+
+
+def test_unchanged_page_is_a_cache_hit(published_cache, california_page):
+    scraper = OnTheSnowJSONScraper(fetch_cache=published_cache)
+    assert scraper._check_fetch_cache({URL: california_page}) is None
+
+
+@pytest.mark.parametrize('payload', ['', '{"props": {"pageProps": {"resorts": {"1": {"data": [{"uuid"',
+                                     'not json at all'])
+def test_undecodable_payload_is_a_cache_miss(published_cache, with_next_data, payload):
+    page = with_next_data(payload)
+    assert resorts_digest(page) is None
+    
+    scraper = OnTheSnowJSONScraper(fetch_cache=published_cache)
+    pages = scraper._check_fetch_cache({URL: page})
+    
+    assert pages == {URL: page}
+    assert published_cache.entries[URL]['payload_hash'] is None
+    assert not published_cache.entries[URL]['published']
@@ -0,0 +1,69 @@
+import pytest
+
+from onthesnow_json_scraper import OnTheSnowJSONScraper, has_next_data
+
+BARE_PAGE = b'<html><body><div id="__next"></div></body></html>'
+
+
+@pytest.fixture
+def scraper():
+    """Scraper whose Chrome fallback is recorded instead of launching a browser"""
+    scraper = OnTheSnowJSONScraper()
+    scraper.browser_urls = []
+    
+    def fetch_browser(url):
+        scraper.browser_urls.append(url)
+        return f"<html>rendered {url}</html>"
+    
+    scraper._fetch_browser = fetch_browser
+    return scraper
+
+
+@pytest.fixture
+def site(local_server, california_page):
+    local_server.pages = {
+        '/california/skireport.html': (200, 'text/html; charset=utf-8', california_page.encode('utf-8')),
+        '/nevada/skireport.html': (200, 'text/html', BARE_PAGE),
+    }
+    return local_server
+
+
+def test_http_page_with_next_data_is_used_directly(scraper, site, california_page):
+    url = f"{site.base_url}/california/skireport.html"
+    html = scraper.fetch_html(url)
+    
+    assert html == california_page
+    assert has_next_data(html)
+    assert scraper.fetch_modes[url] == 'http'
+    assert scraper.browser_urls == []
+
+
+def test_page_without_next_data_falls_back_to_chrome(scraper, site):
+    url = f"{site.base_url}/nevada/skireport.html"
+    assert not has_next_data(BARE_PAGE.decode())
+    
+    html = scraper.fetch_html(url)
+    
+    assert html == f"<html>rendered {url}</html>"
+    assert scraper.fetch_modes[url] == 'selenium'
+    assert scraper.browser_urls == [url]
+    assert [path for _, path, _ in site.requests] == ['/nevada/skireport.html']
+
+
+def test_http_error_falls_back_to_chrome(scraper, site):
+    url = f"{site.base_url}/missing/skireport.html"
+    scraper.fetch_html(url)
+    assert scraper.browser_urls == [url]
+
+
+def test_fetch_all_only_sends_failing_regions_to_chrome(scraper, site, california_page):
+    good = f"{site.base_url}/california/skireport.html"
+    bare = f"{site.base_url}/nevada/skireport.html"
+    scraper.urls = [good, bare]
+    
+    pages = scraper.fetch_all()
+    
+    assert list(pages) == [good, bare]
+    assert pages[good] == california_page
+    assert scraper.fetch_modes == {good: 'http', bare: 'selenium'}
+    assert scraper.browser_urls == [bare]
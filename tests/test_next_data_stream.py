@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+from next_data_stream import extract_next_data, find_path, iter_resorts, resorts_payload
+
+
+@pytest.fixture(scope="module")
+def next_data(california_page):
+    return extract_next_data(california_page)
+
+
+def test_streamed_resorts_match_json_loads(next_data):
+    resorts = json.loads(next_data)['props']['pageProps']['resorts']
+    expected = [(category, resort) for category, group in resorts.items()
+                if isinstance(group, dict) for resort in group.get('data', [])]
+    
+    assert expected
+    assert list(iter_resorts(next_data)) == expected
+    assert json.loads(resorts_payload(next_data)) == resorts
+
+
+def test_bytes_page_gives_the_same_payload(california_page, next_data):
+    assert extract_next_data(california_page.encode('utf-8')) == next_data
+
+
+@pytest.mark.parametrize('payload', ['', '   ', '{', '{"props"', '{"props": {"pageProps": {"resorts": '])
+def test_empty_or_cut_off_payload_raises_value_error(payload):
+    with pytest.raises(ValueError):
+        list(iter_resorts(payload))
+    with pytest.raises(ValueError):
+        resorts_payload(payload)
+
+
+def test_payload_truncated_inside_resorts_raises_value_error(next_data):
+    start = find_path(next_data)
+    end = start + len(resorts_payload(next_data))
+    for cut in (start + 1, (start + end) // 2, end - 1):
+        with pytest.raises(ValueError):
+            list(iter_resorts(next_data[:cut]))
+        with pytest.raises(ValueError):
+            resorts_payload(next_data[:cut])
+
+
+def test_missing_resorts_raises_key_error():
+    with pytest.raises(KeyError):
+        find_path('{"props": {"pageProps": {}}}')
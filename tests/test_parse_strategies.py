@@ -0,0 +1,32 @@
+import pytest
+
+from parse_strategies import StrategyCache, fingerprint, page_shape, parse_page
+
+
+def test_json_strategy_parses_the_saved_page(california_page):
+    df, strategy, tried = parse_page(california_page)
+    assert strategy == 'json'
+    assert tried == ['json']
+    assert not df.empty
+
+
+@pytest.mark.parametrize('payload', ['', '{"props": {"pageProps": {"resorts": {"1": {"data": [{"uuid"'])
+def test_empty_or_truncated_next_data_falls_back_to_table(with_next_data, payload):
+    page = with_next_data(payload)
+    assert page_shape(page)['json'] == []
+    
+    df, strategy, tried = parse_page(page)
+    
+    assert strategy == 'table'
+    assert tried == ['table']
+    assert not df.empty
+
+
+def test_winner_is_remembered_between_runs(tmp_path, california_page):
+    path = str(tmp_path / "strategies.json")
+    cache = StrategyCache(path=path)
+    parse_page(california_page, cache=cache)
+    cache.save()
+    
+    key = fingerprint(page_shape(california_page))
+    assert StrategyCache(path=path).winner(key) == 'json'
@@ -0,0 +1,78 @@
+import lxml.html
+import pytest
+
+from onthesnow_json_scraper import OnTheSnowJSONScraper
+from resort_details import ResortDetailCache, enrich_resort_details, parse_detail_page
+
+
+@pytest.fixture
+def listing(california_page):
+    df = OnTheSnowJSONScraper().parse_json_frame(california_page)
+    df['report_region'] = 'california'
+    return df
+
+
+def rendered_surfaces(html):
+    """Resort name -> surface text shown under the base depth in the report table"""
+    surfaces = {}
+    for row in lxml.html.fromstring(html).xpath('//table//tbody/tr'):
+        name = row.xpath('string(.//a//span[1])').strip()
+        small = [''.join(div.itertext()).strip()
+                 for div in row.xpath('.//div[contains(@class, "styles_small")]')]
+        if len(small) > 2 and small[2] != '-':
+            surfaces[name] = small[2]
+    return surfaces
+
+
+def test_listing_surface_matches_rendered_table(california_page, listing):
+    surfaces = rendered_surfaces(california_page)
+    assert surfaces  # the saved page shows surfaces for its open resorts
+    by_name = dict(zip(listing['name'], listing['surface_conditions']))
+    for name, text in surfaces.items():
+        assert by_name[name] == text
+
+
+def test_parse_detail_page_reads_resort_object(california_page):
+    assert parse_detail_page(california_page, '169') == {
+        'mid_mtn_depth': 17,
+        'surface_conditions': 'Variable Conditions',
+    }
+    assert parse_detail_page(california_page, '999999') is None
+    assert parse_detail_page('<html></html>', '169') is None
+
+
+def test_enrich_fetches_only_gaps_and_caches(california_page, listing, tmp_path):
+    fetched = []
+    
+    def fetch(url):
+        fetched.append(url)
+        return california_page
+    
+    cache = ResortDetailCache(str(tmp_path / 'details.json'))
+    missing = listing[(listing['status'] == 'Open') &
+                      ((listing['mid_mtn_depth'] == 0) | (listing['surface_conditions'] == ''))]
+    
+    enriched = enrich_resort_details(listing, cache, fetch)
+    assert sorted(fetched) == sorted(
+        f"https://www.onthesnow.com/california/{slug}/skireport" for slug in missing['slug'])
+    assert enriched.loc[0, 'surface_conditions'] == 'Variable Conditions'
+    
+    # Unchanged resorts come from the cache
+    fetched.clear()
+    enrich_resort_details(listing, cache, fetch)
+    assert fetched == []
+    
+    # A new updatedAt invalidates the entry
+    changed = listing.copy()
+    index = missing.index[0]
+    changed.loc[index, 'updated_at'] = '2030-01-01T00:00:00+00:00'
+    enrich_resort_details(changed, cache, fetch)
+    assert len(fetched) == 1
+
+
+def test_enrich_keeps_listing_values_when_fetch_fails(listing, tmp_path):
+    def fetch(url):
+        raise IOError("offline")
+    
+    enriched = enrich_resort_details(listing, ResortDetailCache(str(tmp_path / 'details.json')), fetch)
+    assert enriched[['mid_mtn_depth', 'surface_conditions']].equals(listing[['mid_mtn_depth', 'surface_conditions']])
@@ -0,0 +1,102 @@
+import random
+
+import pytest
+
+from google_sheets_updater import diff_grid, update_cells_request
+
+SHEET_ID = 7
+
+
+def apply_requests(cells, requests):
+    """Apply updateCells requests to {(row, col): value} the way the Sheets API does"""
+    for request in requests:
+        update = request['updateCells']
+        grid_range = update['range']
+        assert grid_range['sheetId'] == SHEET_ID
+        assert update['fields'] == 'userEnteredValue'
+        start_row, start_col = grid_range['startRowIndex'], grid_range['startColumnIndex']
+        end_col = grid_range['endColumnIndex']
+        # No endRowIndex means the range runs to the bottom of the sheet
+        end_row = grid_range.get('endRowIndex', max([r + 1 for r, _ in cells] + [start_row + len(update['rows'])]))
+        
+        for r in range(start_row, end_row):
+            for c in range(start_col, end_col):
+                cells.pop((r, c), None)
+        for r, row in enumerate(update['rows'], start_row):
+            for c, value in enumerate(row['values'], start_col):
+                assert r < end_row and c < end_col
+                if value:
+                    (cells[(r, c)],) = value['userEnteredValue'].values()
+    return cells
+
+
+def to_cells(grid):
+    return {(r, c): value for r, row in enumerate(grid) for c, value in enumerate(row) if value != ''}
+
+
+def diff_requests(old, new):
+    return [update_cells_request(SHEET_ID, row, col, rows, end_row=row + len(rows))
+            for row, col, rows in diff_grid(old, new)]
+
+
+OLD = [
+    ['Resort', 'Status', 'Base'],
+    ['Heavenly', 'Open', 40],
+    ['Kirkwood', 'Open', 55],
+    ['Palisades', 'Closed', 0],
+]
+
+
+@pytest.mark.parametrize('new', [
+    pytest.param([row[:2] for row in OLD[:2]], id='shrink'),
+    pytest.param(OLD + [['Northstar', 'Open', 38, 'x']], id='grow'),
+    pytest.param([[*row, 'Trails'] for row in OLD], id='grow-columns'),
+    pytest.param([OLD[0], OLD[2], OLD[1], OLD[3]], id='reorder'),
+    pytest.param([], id='empty'),
+])
+def test_diff_requests_reproduce_the_new_grid(new):
+    cells = apply_requests(to_cells(OLD), diff_requests(OLD, new))
+    assert cells == to_cells(new)
+
+
+def test_single_changed_cell_is_one_one_cell_request():
+    new = [list(row) for row in OLD]
+    new[2][2] = 61
+    
+    requests = diff_requests(OLD, new)
+    
+    assert requests == [update_cells_request(SHEET_ID, 2, 2, [[61]], end_row=3)]
+    assert requests[0]['updateCells']['range'] == {
+        'sheetId': SHEET_ID, 'startRowIndex': 2, 'startColumnIndex': 2, 'endColumnIndex': 3, 'endRowIndex': 3}
+    assert apply_requests(to_cells(OLD), requests) == to_cells(new)
+
+
+def test_unchanged_grid_sends_nothing():
+    assert diff_grid(OLD, [list(row) for row in OLD]) == []
+
+
+def test_column_changes_in_consecutive_rows_merge_into_one_block():
+    new = [OLD[0], ['Heavenly', 'Closed', 0], ['Kirkwood', 'Closed', 0], OLD[3]]
+    assert diff_grid(OLD, new) == [(1, 1, [['Closed', 0], ['Closed', 0]])]
+
+
+def test_full_write_clears_everything_below_and_right():
+    stale = to_cells(OLD + [['Old row', 1, 2, 3]])
+    new = [row[:2] for row in OLD[:2]]
+    
+    cells = apply_requests(stale, [update_cells_request(SHEET_ID, 0, 0, new, end_col=26)])
+    
+    assert cells == to_cells(new)
+
+
+def test_random_grids_round_trip():
+    rng = random.Random(20241117)
+    values = ['', 'Open', 'Closed', 0, 1, 2.5]
+    
+    def grid():
+        width = rng.randint(0, 5)
+        return [[rng.choice(values) for _ in range(width)] for _ in range(rng.randint(0, 6))]
+    
+    for _ in range(500):
+        old, new = grid(), grid()
+        assert apply_requests(to_cells(old), diff_requests(old, new)) == to_cells(new)
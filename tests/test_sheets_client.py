@@ -0,0 +1,210 @@
+import json
+import os
+import socket
+
+import httplib2
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from googleapiclient import discovery_cache
+
+import sheets_client
+from sheets_client import build_sheets_service, execute_with_backoff
+
+SPREADSHEET_ID = 'test-spreadsheet'
+
+
+@pytest.fixture
+def fake_sheets(local_server):
+    """Local server standing in for sheets.googleapis.com"""
+    local_server.pages = {
+        f'/v4/spreadsheets/{SPREADSHEET_ID}:batchUpdate': (
+            200, 'application/json', json.dumps({'spreadsheetId': SPREADSHEET_ID, 'replies': [{}]}).encode()),
+        f'/v4/spreadsheets/{SPREADSHEET_ID}': (
+            200, 'application/json',
+            json.dumps({'sheets': [{'properties': {'sheetId': 7, 'title': 'Sheet1'}}]}).encode()),
+    }
+    return local_server
+
+
+def test_api_endpoint_argument_points_at_local_server(fake_sheets):
+    service = build_sheets_service(api_endpoint=f"{fake_sheets.base_url}/", http=httplib2.Http())
+    
+    body = {'requests': [{'updateCells': {'range': {'sheetId': 7}, 'fields': 'userEnteredValue'}}]}
+    result = execute_with_backoff(service.spreadsheets().batchUpdate(spreadsheetId=SPREADSHEET_ID, body=body))
+    
+    assert result == {'spreadsheetId': SPREADSHEET_ID, 'replies': [{}]}
+    method, path, _ = fake_sheets.requests[-1]
+    assert method == 'POST'
+    assert path.split('?')[0] == f'/v4/spreadsheets/{SPREADSHEET_ID}:batchUpdate'
+
+
+def test_sheets_api_endpoint_setting_is_the_default(fake_sheets, monkeypatch):
+    monkeypatch.setattr(sheets_client, 'SHEETS_API_ENDPOINT', f"{fake_sheets.base_url}/")
+    service = build_sheets_service(http=httplib2.Http())
+    
+    result = execute_with_backoff(service.spreadsheets().get(
+        spreadsheetId=SPREADSHEET_ID, fields='sheets.properties(sheetId,title)'))
+    
+    assert result['sheets'][0]['properties'] == {'sheetId': 7, 'title': 'Sheet1'}
+    method, path, _ = fake_sheets.requests[-1]
+    assert method == 'GET'
+    assert 'fields=sheets.properties' in path
+
+
+def test_errors_from_local_server_are_raised(fake_sheets):
+    service = build_sheets_service(api_endpoint=f"{fake_sheets.base_url}/", http=httplib2.Http())
+    with pytest.raises(sheets_client.HttpError):
+        execute_with_backoff(service.spreadsheets().batchUpdate(spreadsheetId='unknown', body={}))
+
+
+def error_response(status, headers=None):
+    body = json.dumps({'error': {'code': status, 'message': 'try again'}}).encode()
+    return (status, 'application/json', body, headers or {})
+
+
+def test_rate_limits_back_off_honouring_retry_after(fake_sheets):
+    ok = fake_sheets.pages[f'/v4/spreadsheets/{SPREADSHEET_ID}']
+    fake_sheets.pages[f'/v4/spreadsheets/{SPREADSHEET_ID}'] = [
+        error_response(429, {'Retry-After': '7'}),
+        error_response(503, {'Retry-After': '3'}),
+        ok,
+    ]
+    service = build_sheets_service(api_endpoint=f"{fake_sheets.base_url}/", http=httplib2.Http())
+    sleeps = []
+    
+    result = execute_with_backoff(service.spreadsheets().get(spreadsheetId=SPREADSHEET_ID),
+                                  base_delay=0.01, sleep=sleeps.append)
+    
+    assert result['sheets'][0]['properties']['sheetId'] == 7
+    assert len(fake_sheets.requests) == 3
+    assert len(sleeps) == 2
+    assert 7 <= sleeps[0] < 7.1
+    assert 3 <= sleeps[1] < 3.1
+
+
+def test_backoff_gives_up_after_max_retries(fake_sheets):
+    fake_sheets.pages[f'/v4/spreadsheets/{SPREADSHEET_ID}'] = [error_response(503)]
+    service = build_sheets_service(api_endpoint=f"{fake_sheets.base_url}/", http=httplib2.Http())
+    sleeps = []
+    
+    with pytest.raises(sheets_client.HttpError):
+        execute_with_backoff(service.spreadsheets().get(spreadsheetId=SPREADSHEET_ID),
+                             max_retries=2, base_delay=0.01, sleep=sleeps.append)
+    
+    assert len(fake_sheets.requests) == 3
+    assert len(sleeps) == 2
+
+
+def test_connection_errors_are_retried():
+    # Grab a free port and close it, so connections to it are refused
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    service = build_sheets_service(api_endpoint=f"http://127.0.0.1:{port}/", http=httplib2.Http())
+    sleeps = []
+    
+    with pytest.raises(OSError):
+        execute_with_backoff(service.spreadsheets().get(spreadsheetId=SPREADSHEET_ID),
+                             max_retries=2, base_delay=0.01, sleep=sleeps.append)
+    assert len(sleeps) == 2
+
+
+def test_httplib2_transport_errors_are_retried():
+    class FlakyRequest:
+        def __init__(self):
+            self.errors = [httplib2.ServerNotFoundError('no DNS'), socket.timeout('timed out')]
+        
+        def execute(self):
+            if self.errors:
+                raise self.errors.pop(0)
+            return {'ok': True}
+    
+    sleeps = []
+    assert execute_with_backoff(FlakyRequest(), base_delay=0.01, sleep=sleeps.append) == {'ok': True}
+    assert len(sleeps) == 2
+
+
+@pytest.fixture
+def service_account_info(local_server):
+    """Service-account key whose token endpoint is the local server"""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                            serialization.NoEncryption()).decode()
+    local_server.pages['/token'] = (
+        200, 'application/json', json.dumps({'access_token': 'token-1', 'expires_in': 3600}).encode())
+    return {
+        'type': 'service_account',
+        'client_email': 'updater@test-project.iam.gserviceaccount.com',
+        'private_key_id': 'test-key',
+        'private_key': pem,
+        'token_uri': f"{local_server.base_url}/token",
+    }
+
+
+@pytest.fixture
+def fresh_credentials(monkeypatch):
+    """Forget credentials shared by earlier tests in this process"""
+    monkeypatch.setattr(sheets_client, '_credentials', {})
+
+
+def token_requests(server):
+    return [path for _, path, _ in server.requests if path == '/token']
+
+
+def test_token_is_reused_across_get_credentials_calls(fake_sheets, service_account_info, fresh_credentials):
+    scopes = ['https://www.googleapis.com/auth/spreadsheets']
+    for _ in range(3):
+        credentials = sheets_client.get_credentials(service_account_info, scopes)
+        service = build_sheets_service(credentials=credentials, api_endpoint=f"{fake_sheets.base_url}/")
+        execute_with_backoff(service.spreadsheets().get(spreadsheetId=SPREADSHEET_ID))
+    
+    assert sheets_client.get_credentials(service_account_info, scopes) is credentials
+    assert len(token_requests(fake_sheets)) == 1
+    api_headers = [headers for _, path, headers in fake_sheets.requests if path != '/token']
+    assert len(api_headers) == 3
+    assert all(headers['authorization'] == 'Bearer token-1' for headers in api_headers)
+
+
+def test_token_cache_file_is_reused_by_a_new_process(fake_sheets, service_account_info, fresh_credentials,
+                                                     tmp_path, monkeypatch):
+    scopes = ['https://www.googleapis.com/auth/spreadsheets']
+    token_cache = str(tmp_path / "token.json")
+    credentials = sheets_client.get_credentials(service_account_info, scopes, token_cache=token_cache)
+    service = build_sheets_service(credentials=credentials, api_endpoint=f"{fake_sheets.base_url}/")
+    execute_with_backoff(service.spreadsheets().get(spreadsheetId=SPREADSHEET_ID))
+    sheets_client.save_token(credentials, token_cache)
+    assert os.stat(token_cache).st_mode & 0o777 == 0o600
+    
+    # A new process starts without shared credentials
+    monkeypatch.setattr(sheets_client, '_credentials', {})
+    credentials = sheets_client.get_credentials(service_account_info, scopes, token_cache=token_cache)
+    
+    assert credentials.token == 'token-1'
+    assert credentials.valid
+    assert len(token_requests(fake_sheets)) == 1
+
+
+def test_discovery_document_is_downloaded_once_and_cached(local_server, tmp_path, monkeypatch):
+    doc = json.dumps({'name': 'sheets', 'version': 'v4'})
+    local_server.pages['/$discovery/rest'] = (200, 'application/json', doc.encode())
+    monkeypatch.setattr(sheets_client, 'DISCOVERY_URL', f"{local_server.base_url}/$discovery/rest?version=v4")
+    # Pretend google-api-python-client ships no copy
+    monkeypatch.setattr(discovery_cache, 'get_static_doc', lambda name, version: None)
+    cache_file = str(tmp_path / "discovery.json")
+    
+    assert sheets_client.load_discovery_document(cache_file) == doc
+    assert sheets_client.load_discovery_document(cache_file) == doc
+    
+    assert len(local_server.requests) == 1
+    with open(cache_file, encoding='utf-8') as f:
+        assert f.read() == doc
+
+
+def test_bundled_discovery_document_needs_no_request(local_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(sheets_client, 'DISCOVERY_URL', f"{local_server.base_url}/$discovery/rest?version=v4")
+    
+    doc = sheets_client.load_discovery_document(str(tmp_path / "discovery.json"))
+    
+    assert json.loads(doc)['name'] == 'sheets'
+    assert local_server.requests == []